@@ -0,0 +1,38 @@
+import argparse
+import logging
+import sys
+from typing import List, Dict
+
+from benchmark.model import BenchmarkResult
+from benchmark.runner import CASES, DEFAULT_BASELINES_PATH, DEFAULT_TOLERANCE, run_benchmarks, load_baselines, \
+    save_baselines, find_regressions, format_results
+
+
+# python -m benchmark [--cases engine/ micro/risk] [--sizes 20000] [--save]
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Engine throughput benchmarks')
+    parser.add_argument('--cases', nargs='*', default=[], help='case names or prefixes, all cases by default')
+    parser.add_argument('--sizes', nargs='*', type=int, help='sizes to run instead of the default ones of each case')
+    parser.add_argument('--baselines', default=DEFAULT_BASELINES_PATH)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--save', action='store_true', help='store the results as the new baselines')
+    parser.add_argument('--in-process', action='store_true', help='run every case in this process')
+    args: argparse.Namespace = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    names: List[str] = [name for name in CASES if not args.cases or any(name.startswith(case) for case in args.cases)]
+    results: List[BenchmarkResult] = run_benchmarks(names=names, sizes=args.sizes, isolated=not args.in_process)
+    baselines: Dict[str, Dict] = load_baselines(path=args.baselines)
+    print(format_results(results=results, baselines=baselines))
+    if args.save:
+        save_baselines(path=args.baselines, results=results)
+        return 0
+
+    regressions: List[str] = find_regressions(results=results, baselines=baselines, tolerance=args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Tuple, Type, Optional
+
+import numpy as np
+
+from benchmark.model import BenchmarkResult
+from benchmark.strategies import SYMBOL_ID, IdleStrategy, MacdCrossoverStrategy, GridStrategy, ChurnStrategy
+from data.model import TestConfig
+from data.service.impl.synthetic_market_data_service import SyntheticMarketDataService
+from data.store.synthetic_bar_data import MINUTES_PER_DAY
+from strategy.base_strategy import BaseStrategy
+from test_engine.model import TestResult
+from test_engine.service.impl.general_test_engine_service import GeneralTestEngineService
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+START_DATE: datetime = datetime(2020, 1, 6)
+INITIAL_EQUITY: float = 10_000_000.0
+# Strategy and the timeframe it is run on.
+STRATEGIES: Dict[str, Tuple[Type[BaseStrategy], str]] = {
+    'idle': (IdleStrategy, '15m'),
+    'macd': (MacdCrossoverStrategy, '15m'),
+    'grid': (GridStrategy, '15m'),
+    'churn': (ChurnStrategy, '1m'),
+}
+
+
+# Synthetic bars are generated on weekdays only, the range covers at least bar_count 1m bars.
+def get_test_config(timeframe: str, bar_count: int) -> TestConfig:
+    day_count: int = -(-bar_count // MINUTES_PER_DAY)
+    end_day: np.datetime64 = np.busday_offset(np.datetime64(START_DATE.date()), day_count - 1, roll='forward')
+    end_date: datetime = datetime.fromisoformat(str(end_day)) + timedelta(days=1) - timedelta(minutes=1)
+    return TestConfig(token='', symbol_id=SYMBOL_ID, start_date=START_DATE, end_date=end_date, timeframe=timeframe,
+                      initial_equity=INITIAL_EQUITY, cache_dir=None)
+
+
+# Times run_test alone, the bar data is generated before the clock starts.
+def run_engine_benchmark(strategy_name: str, bar_count: int, seed: int = 0) -> BenchmarkResult:
+    strategy_constructor, timeframe = STRATEGIES[strategy_name]
+    test_config: TestConfig = get_test_config(timeframe=timeframe, bar_count=bar_count)
+    market_data_service: SyntheticMarketDataService = SyntheticMarketDataService(seed=seed)
+    for data_timeframe in {'1m', timeframe}:
+        market_data_service.get_bar_data(symbol_id=SYMBOL_ID, timeframe=data_timeframe,
+                                         start_date=test_config.start_date, end_date=test_config.end_date)
+
+    engine: GeneralTestEngineService = GeneralTestEngineService(market_data_service=market_data_service)
+    start: float = time.perf_counter()
+    result: TestResult = engine.run_test(test_config=test_config, strategy_constructor=strategy_constructor)
+    seconds: float = time.perf_counter() - start
+    replayed_bar_count: int = len(engine.repository_container.data_repository.get_clock())
+    return BenchmarkResult(name=f'engine/{strategy_name}', size=bar_count, seconds=seconds,
+                           bars_per_second=replayed_bar_count / seconds,
+                           orders_per_second=len(result.order_history) / seconds, peak_rss_mb=get_peak_rss_mb())
+
+
+# Peak resident set size of this process so far.
+def get_peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / 1024 / 1024 if sys.platform == 'darwin' else peak_rss / 1024
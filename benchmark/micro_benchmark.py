@@ -0,0 +1,111 @@
+import time
+from typing import List
+
+import numpy as np
+
+from benchmark.engine_benchmark import get_test_config, get_peak_rss_mb
+from benchmark.model import BenchmarkResult
+from benchmark.strategies import SYMBOL_ID
+from broker.enums import OrderDirection, OrderType
+from broker.model import Order
+from data.data_api import DataApi
+from data.model import MacdParams
+from data.repository.data_repository import DataRepository
+from data.service.impl.synthetic_market_data_service import SyntheticMarketDataService
+from test_engine.service.impl.general_test_engine_service import GeneralTestEngineService
+
+RESTING_ORDER_COUNT: int = 500
+RISK_BAR_COUNT: int = 1440
+
+
+# An engine wired up over bar_count synthetic 1m bars, positioned on the first bar, with no strategy attached.
+def init_engine(bar_count: int, seed: int = 0) -> GeneralTestEngineService:
+    engine: GeneralTestEngineService = GeneralTestEngineService(market_data_service=SyntheticMarketDataService(
+        seed=seed))
+    engine.test_config = get_test_config(timeframe='15m', bar_count=bar_count)
+    engine._init_containers()
+    return engine
+
+
+# Triggered order lookups with RESTING_ORDER_COUNT orders resting on both sides of the price, one per bar.
+def run_match_benchmark(bar_count: int) -> BenchmarkResult:
+    engine: GeneralTestEngineService = init_engine(bar_count=bar_count)
+    data_repository: DataRepository = engine.repository_container.data_repository
+    _create_resting_orders(engine=engine)
+
+    triggered_count: int = 0
+    start: float = time.perf_counter()
+    for bar_index in range(bar_count):
+        data_repository.set_bar_count(bar_count=bar_index)
+        triggered_count += len(engine.service_container.match_service.get_triggered_orders())
+    seconds: float = time.perf_counter() - start
+    return BenchmarkResult(name='micro/match', size=bar_count, seconds=seconds, bars_per_second=bar_count / seconds,
+                           orders_per_second=triggered_count / seconds, peak_rss_mb=get_peak_rss_mb())
+
+
+# Clearing of one crossing order per bar, alternating sides so the position keeps opening and closing.
+def run_clearing_benchmark(bar_count: int) -> BenchmarkResult:
+    engine: GeneralTestEngineService = init_engine(bar_count=bar_count)
+    data_repository: DataRepository = engine.repository_container.data_repository
+    close: np.ndarray = data_repository.get_all_data(name='close', timeframe='1m')
+
+    cleared_count: int = 0
+    seconds: float = 0.0
+    for bar_index in range(bar_count):
+        data_repository.set_bar_count(bar_count=bar_index)
+        direction: OrderDirection = OrderDirection.BUY if bar_index % 2 == 0 else OrderDirection.SELL
+        price: float = round(float(close[bar_index]) * (1.01 if direction == OrderDirection.BUY else 0.99), 2)
+        order: Order = engine.service_container.order_service.create_order(
+            symbol_id=SYMBOL_ID, price=price, amount=1, direction=direction, order_type=OrderType.LMT)
+        filled_orders: List[Order] = engine.service_container.match_service.match_orders(orders=[order])
+        start: float = time.perf_counter()
+        engine.service_container.clearing_service.clear_orders(orders=filled_orders)
+        seconds += time.perf_counter() - start
+        cleared_count += len(filled_orders)
+    return BenchmarkResult(name='micro/clearing', size=bar_count, seconds=seconds, bars_per_second=None,
+                           orders_per_second=cleared_count / seconds, peak_rss_mb=get_peak_rss_mb())
+
+
+# New order margin checks against RESTING_ORDER_COUNT resting orders.
+def run_risk_benchmark(check_count: int) -> BenchmarkResult:
+    engine: GeneralTestEngineService = init_engine(bar_count=RISK_BAR_COUNT)
+    _create_resting_orders(engine=engine)
+    close: float = float(engine.repository_container.data_repository.get_current_bar_data(name='close',
+                                                                                          timeframe='1m'))
+
+    start: float = time.perf_counter()
+    for index in range(check_count):
+        direction: OrderDirection = OrderDirection.BUY if index % 2 == 0 else OrderDirection.SELL
+        engine.service_container.risk_service.validate_new_order_risk(symbol_id=SYMBOL_ID, price=close,
+                                                                      amount=1 + index % 3, direction=direction)
+    seconds: float = time.perf_counter() - start
+    return BenchmarkResult(name='micro/risk', size=check_count, seconds=seconds, bars_per_second=None,
+                           orders_per_second=check_count / seconds, peak_rss_mb=get_peak_rss_mb())
+
+
+# Bar data and MACD handlers on both timeframes updated on every bar.
+def run_handler_benchmark(bar_count: int) -> BenchmarkResult:
+    engine: GeneralTestEngineService = init_engine(bar_count=bar_count)
+    data_api: DataApi = engine.api_container.data_api
+    for timeframe in ('1m', '15m'):
+        data_api.get_bar_data_handler(name='close', timeframe=timeframe, size=100)
+        data_api.get_indicator_handler(name='macd', timeframe=timeframe, size=100,
+                                       params=MacdParams(fast_period=12, slow_period=26, signal_period=9))
+
+    start: float = time.perf_counter()
+    for _ in range(bar_count):
+        data_api.update_on_bar()
+    seconds: float = time.perf_counter() - start
+    return BenchmarkResult(name='micro/handlers', size=bar_count, seconds=seconds,
+                           bars_per_second=bar_count / seconds, orders_per_second=None,
+                           peak_rss_mb=get_peak_rss_mb())
+
+
+def _create_resting_orders(engine: GeneralTestEngineService) -> None:
+    close: float = float(engine.repository_container.data_repository.get_current_bar_data(name='close',
+                                                                                          timeframe='1m'))
+    for level in range(1, RESTING_ORDER_COUNT // 2 + 1):
+        for direction, price in ((OrderDirection.BUY, close * (1 - 0.0005 * level)),
+                                 (OrderDirection.SELL, close * (1 + 0.0005 * level))):
+            engine.service_container.order_service.create_order(symbol_id=SYMBOL_ID, price=round(price, 2), amount=1,
+                                                                direction=direction, order_type=OrderType.LMT)
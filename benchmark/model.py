@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+# Throughputs are None when a case does not replay bars or handle orders.
+@dataclass
+class BenchmarkResult:
+    name: str
+    size: int
+    seconds: float
+    bars_per_second: Optional[float]
+    orders_per_second: Optional[float]
+    peak_rss_mb: Optional[float] = None
+
+    @property
+    def key(self) -> str:
+        return f'{self.name}[{self.size}]'
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import platform
+from dataclasses import asdict
+from functools import partial
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmark.engine_benchmark import run_engine_benchmark
+from benchmark.micro_benchmark import run_match_benchmark, run_clearing_benchmark, run_risk_benchmark, \
+    run_handler_benchmark
+from benchmark.model import BenchmarkResult
+
+DEFAULT_BASELINES_PATH: str = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_TOLERANCE: float = 0.25
+CASES: Dict[str, Callable[[int], BenchmarkResult]] = {
+    'engine/idle': partial(run_engine_benchmark, 'idle'),
+    'engine/macd': partial(run_engine_benchmark, 'macd'),
+    'engine/grid': partial(run_engine_benchmark, 'grid'),
+    'engine/churn': partial(run_engine_benchmark, 'churn'),
+    'micro/match': run_match_benchmark,
+    'micro/clearing': run_clearing_benchmark,
+    'micro/risk': run_risk_benchmark,
+    'micro/handlers': run_handler_benchmark,
+}
+# Sizes are 1m bars for engine runs and bars or checks for micro-benchmarks.
+DEFAULT_SIZES: Dict[str, List[int]] = {
+    'engine/idle': [100_000, 1_000_000],
+    'engine/macd': [100_000, 1_000_000],
+    'engine/grid': [20_000, 100_000],
+    'engine/churn': [20_000, 100_000],
+    'micro/match': [50_000],
+    'micro/clearing': [50_000],
+    'micro/risk': [50_000],
+    'micro/handlers': [50_000],
+}
+
+
+# Each case runs in a fresh process, so its peak RSS is its own and it starts with cold caches.
+def run_benchmarks(names: List[str], sizes: Optional[List[int]] = None, isolated: bool = True) -> List[BenchmarkResult]:
+    results: List[BenchmarkResult] = []
+    for name in names:
+        for size in sizes or DEFAULT_SIZES[name]:
+            if isolated:
+                with get_context('spawn').Pool(processes=1, maxtasksperchild=1) as pool:
+                    result: BenchmarkResult = pool.apply(run_case, (name, size))
+            else:
+                result: BenchmarkResult = run_case(name=name, size=size)
+            logging.info(f'{result.key} took {result.seconds:.3f}s')
+            results.append(result)
+    return results
+
+
+def run_case(name: str, size: int) -> BenchmarkResult:
+    logging.disable(logging.CRITICAL)
+    try:
+        return CASES[name](size)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def load_baselines(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as file:
+        return json.load(file)['results']
+
+
+# Throughput depends on the machine, so each baseline records the one it was measured on.
+def get_environment() -> Dict:
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+            'system': platform.system(), 'cpu_count': os.cpu_count()}
+
+
+def save_baselines(path: str, results: List[BenchmarkResult]) -> None:
+    environment: Dict = get_environment()
+    baselines: Dict = {
+        'results': {**load_baselines(path=path),
+                    **{result.key: {**asdict(result), 'environment': environment} for result in results}},
+    }
+    with open(path, 'w') as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+# Throughput below (1 - tolerance) of the baseline, or peak RSS above (1 + tolerance) of it, is a regression.
+# Baselines recorded in another environment are not compared, save baselines on the machine that checks them.
+def find_regressions(results: List[BenchmarkResult], baselines: Dict[str, Dict],
+                     tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    environment: Dict = get_environment()
+    regressions: List[str] = []
+    for result in results:
+        baseline: Optional[Dict] = baselines.get(result.key)
+        if baseline is None:
+            continue
+        if baseline.get('environment') != environment:
+            logging.warning(f'Skipping {result.key}, its baseline was recorded in another environment')
+            continue
+        for metric in ('bars_per_second', 'orders_per_second'):
+            value: Optional[float] = getattr(result, metric)
+            if value is not None and baseline.get(metric) and value < baseline[metric] * (1 - tolerance):
+                regressions.append(f'{result.key} {metric} {value:,.0f} < baseline {baseline[metric]:,.0f}')
+        if result.peak_rss_mb is not None and baseline.get('peak_rss_mb') and \
+                result.peak_rss_mb > baseline['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f'{result.key} peak_rss_mb {result.peak_rss_mb:,.1f} > baseline '
+                               f'{baseline["peak_rss_mb"]:,.1f}')
+    return regressions
+
+
+def format_results(results: List[BenchmarkResult], baselines: Dict[str, Dict]) -> str:
+    lines: List[str] = [f'{"case":<30}{"seconds":>10}{"bars/s":>14}{"orders/s":>14}{"peak MB":>10}{"vs base":>9}']
+    for result in results:
+        baseline: Optional[Dict] = baselines.get(result.key)
+        ratio: str = ''
+        metric: str = 'bars_per_second' if result.bars_per_second is not None else 'orders_per_second'
+        if baseline is not None and baseline.get(metric) and getattr(result, metric):
+            ratio = f'{getattr(result, metric) / baseline[metric]:.2f}x'
+        lines.append(f'{result.key:<30}{result.seconds:>10.3f}{_format_rate(result.bars_per_second):>14}'
+                     f'{_format_rate(result.orders_per_second):>14}'
+                     f'{_format_rate(result.peak_rss_mb, precision=1):>10}{ratio:>9}')
+    return '\n'.join(lines)
+
+
+def _format_rate(value: Optional[float], precision: int = 0) -> str:
+    return '-' if value is None else f'{value:,.{precision}f}'
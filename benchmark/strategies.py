@@ -0,0 +1,96 @@
+from typing import Dict, Tuple, Set
+
+from broker.enums import OrderDirection, OrderType, OrderStatus
+from data.model import MacdParams, BarDataHandler, MacdHandler
+from strategy.base_strategy import BaseStrategy
+from strategy.dependency.broker import Broker
+from strategy.dependency.init_api import InitApi
+
+SYMBOL_ID: str = 'BENCH'
+
+
+# Never trades, measures the cost of replaying bars.
+class IdleStrategy(BaseStrategy):
+    def __init__(self, _: InitApi):
+        pass
+
+    def on_bar(self, broker: Broker):
+        pass
+
+
+# Reverses the position on every crossing of the MACD and its signal line.
+class MacdCrossoverStrategy(BaseStrategy):
+    def __init__(self, _: InitApi):
+        self.macd: MacdHandler = _.get_indicator_handler(name='macd', timeframe='15m', size=2,
+                                                         params=MacdParams(fast_period=12, slow_period=26,
+                                                                           signal_period=9))
+        self.close: BarDataHandler = _.get_bar_data_handler(name='close', timeframe='15m', size=1)
+        self.position: int = 0
+
+    def on_bar(self, broker: Broker):
+        if len(self.macd.macd) < 2:
+            return
+        was_above: bool = self.macd.macd[0] > self.macd.signal[0]
+        is_above: bool = self.macd.macd[1] > self.macd.signal[1]
+        close: float = self.close.data[-1]
+        if is_above and not was_above and self.position <= 0:
+            broker.create_order(SYMBOL_ID, round(close * 1.01, 2), 1 - self.position, OrderDirection.BUY,
+                                OrderType.LMT)
+            self.position = 1
+        elif was_above and not is_above and self.position >= 0:
+            broker.create_order(SYMBOL_ID, round(close * 0.99, 2), 1 + self.position, OrderDirection.SELL,
+                                OrderType.LMT)
+            self.position = -1
+
+
+# Keeps limit orders resting on a grid of levels around the close, replacing filled ones and cancelling levels
+# the price has moved away from.
+class GridStrategy(BaseStrategy):
+    LEVEL_COUNT: int = 50
+    LEVEL_STEP: float = 0.001
+
+    def __init__(self, _: InitApi):
+        self.close: BarDataHandler = _.get_bar_data_handler(name='close', timeframe='15m', size=1)
+        self.orders: Dict[Tuple[OrderDirection, float], int] = {}
+
+    def on_bar(self, broker: Broker):
+        if len(self.close.data) == 0:
+            return
+        close: float = self.close.data[-1]
+        step: float = max(round(close * self.LEVEL_STEP, 2), 0.01)
+        pending_ids: Set[int] = {order.id for order in broker.get_orders_by_status(OrderStatus.PENDING)}
+        self.orders = {level: order_id for level, order_id in self.orders.items() if order_id in pending_ids}
+
+        lowest: float = close - step * (self.LEVEL_COUNT + 10)
+        highest: float = close + step * (self.LEVEL_COUNT + 10)
+        for (direction, price), order_id in list(self.orders.items()):
+            if price < lowest or price > highest:
+                broker.cancel_order(order_id)
+                del self.orders[(direction, price)]
+
+        for level in range(1, self.LEVEL_COUNT + 1):
+            for direction, price in ((OrderDirection.BUY, round(close - step * level, 2)),
+                                     (OrderDirection.SELL, round(close + step * level, 2))):
+                if (direction, price) not in self.orders:
+                    order = broker.create_order(SYMBOL_ID, price, 1, direction, OrderType.LMT)
+                    if order is not None:
+                        self.orders[(direction, price)] = order.id
+
+
+# Cancels whatever is left and crosses the spread on every bar, alternating sides.
+class ChurnStrategy(BaseStrategy):
+    def __init__(self, _: InitApi):
+        self.close: BarDataHandler = _.get_bar_data_handler(name='close', timeframe='1m', size=1)
+        self.bar_count: int = 0
+
+    def on_bar(self, broker: Broker):
+        self.bar_count += 1
+        if len(self.close.data) == 0:
+            return
+        for order in broker.get_orders_by_status(OrderStatus.PENDING):
+            broker.cancel_order(order.id)
+        close: float = self.close.data[-1]
+        if self.bar_count % 2:
+            broker.create_order(SYMBOL_ID, round(close * 1.002, 2), 1, OrderDirection.BUY, OrderType.LMT)
+        else:
+            broker.create_order(SYMBOL_ID, round(close * 0.998, 2), 1, OrderDirection.SELL, OrderType.LMT)
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from benchmark.model import BenchmarkResult
+from benchmark.runner import run_benchmarks, save_baselines, load_baselines, find_regressions
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_engine_and_micro_benchmarks_run(self):
+        results = run_benchmarks(names=['engine/churn', 'micro/handlers'], sizes=[1440], isolated=False)
+
+        self.assertEqual([result.key for result in results], ['engine/churn[1440]', 'micro/handlers[1440]'])
+        self.assertGreater(results[0].orders_per_second, 0)
+        self.assertGreater(results[1].bars_per_second, 0)
+        self.assertIsNone(results[1].orders_per_second)
+
+    def test_find_regressions_against_saved_baselines(self):
+        baseline = BenchmarkResult(name='engine/idle', size=1000, seconds=1.0, bars_per_second=1000.0,
+                                   orders_per_second=None, peak_rss_mb=100.0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baselines.json')
+            save_baselines(path=path, results=[baseline])
+            baselines = load_baselines(path=path)
+
+        slower = BenchmarkResult(name='engine/idle', size=1000, seconds=2.0, bars_per_second=500.0,
+                                 orders_per_second=None, peak_rss_mb=101.0)
+        similar = BenchmarkResult(name='engine/idle', size=1000, seconds=1.1, bars_per_second=900.0,
+                                  orders_per_second=None, peak_rss_mb=140.0)
+        self.assertEqual(len(find_regressions(results=[slower], baselines=baselines)), 1)
+        self.assertEqual(find_regressions(results=[similar], baselines=baselines, tolerance=0.5), [])
+
+        baselines['engine/idle[1000]']['environment']['cpu_count'] += 1
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(find_regressions(results=[slower], baselines=baselines), [])
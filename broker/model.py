@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict
 
 from broker.enums import OrderStatus, OrderDirection, OrderType
 
@@ -32,4 +32,4 @@ class Position:
 class Account:
     balance: float
     equity: float
-    position: Optional[Position]
+    positions: Dict[str, Position]
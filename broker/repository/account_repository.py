@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Dict
 
 from broker.model import Position
 
@@ -22,9 +22,14 @@ class AccountRepository(ABC):
         pass
 
     @abstractmethod
-    def set_position(self, position: Optional[Position]) -> None:
+    def set_position(self, symbol_id: str, position: Optional[Position]) -> None:
         pass
 
     @abstractmethod
-    def get_position(self) -> Optional[Position]:
+    def get_position(self, symbol_id: str) -> Optional[Position]:
+        pass
+
+    # Open positions by symbol, in the order they were opened.
+    @abstractmethod
+    def get_positions(self) -> Dict[str, Position]:
         pass
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Dict
 
 from broker.model import Position, Account
 from broker.repository.account_repository import AccountRepository
@@ -6,7 +6,7 @@ from broker.repository.account_repository import AccountRepository
 
 class GeneralAccountRepository(AccountRepository):
     def __init__(self, initial_equity: float):
-        self.account: Account = Account(balance=initial_equity, equity=initial_equity, position=None)
+        self.account: Account = Account(balance=initial_equity, equity=initial_equity, positions={})
 
     def get_balance(self) -> float:
         return self.account.balance
@@ -20,8 +20,14 @@ class GeneralAccountRepository(AccountRepository):
     def set_balance(self, balance: float) -> None:
         self.account.balance = balance
 
-    def set_position(self, position: Optional[Position]) -> None:
-        self.account.position = position
+    def set_position(self, symbol_id: str, position: Optional[Position]) -> None:
+        if position is None:
+            self.account.positions.pop(symbol_id, None)
+        else:
+            self.account.positions[symbol_id] = position
 
-    def get_position(self) -> Optional[Position]:
-        return self.account.position
+    def get_position(self, symbol_id: str) -> Optional[Position]:
+        return self.account.positions.get(symbol_id)
+
+    def get_positions(self) -> Dict[str, Position]:
+        return self.account.positions
@@ -1,17 +1,33 @@
-from typing import List, Optional
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Optional, Dict, Tuple, Set, Sequence
 
-from broker.enums import OrderStatus
+from broker.enums import OrderStatus, OrderDirection, OrderType
 from broker.model import Order
 from broker.repository.order_repository import OrderRepository
+from broker.store.order_table import OrderTable
 
 
+# Orders are kept as objects, or with an order table as its rows, in which case the orders handed out are views
+# and saved orders are copied into the table.
 class GeneralOrderRepository(OrderRepository):
-    def __init__(self):
-        self.orders: List[Order] = []
+    def __init__(self, order_table: Optional[OrderTable] = None):
+        self.orders: List[Order] | OrderTable = order_table if order_table is not None else []
+        # Order ids per status in insertion order. New orders arrive in id order, orders moving to another status
+        # may not, those statuses are put back in id order the next time they are listed.
+        self.order_ids_by_status: Dict[OrderStatus, Dict[int, None]] = {status: {} for status in OrderStatus}
+        self.unordered_statuses: Set[OrderStatus] = set()
+        # Pending order count, notionals and books per symbol, for the symbols that have pending orders.
+        self.pending_counts: Dict[str, int] = {}
+        self.pending_notionals: Dict[str, Dict[OrderDirection, float]] = {}
+        # Pending orders per direction and type as (price, id), sorted by price.
+        self.trigger_books: Dict[str, Dict[Tuple[OrderDirection, OrderType], List[Tuple[float, int]]]] = {}
 
     def save_order(self, order: Order) -> int:
         order.id = len(self.orders)
         self.orders.append(order)
+        self._add_status_order_id(status=order.status, order_id=order.id)
+        if order.status == OrderStatus.PENDING:
+            self._add_pending_order(order=order)
         return order.id
 
     def get_order_by_id(self, order_id: int) -> Optional[Order]:
@@ -20,4 +36,86 @@ class GeneralOrderRepository(OrderRepository):
         return self.orders[order_id]
 
     def get_order_by_status(self, status: OrderStatus) -> List[Order]:
-        return [order for order in self.orders if order.status == status]
+        if status in self.unordered_statuses:
+            self.order_ids_by_status[status] = dict.fromkeys(sorted(self.order_ids_by_status[status]))
+            self.unordered_statuses.discard(status)
+        return [self.orders[order_id] for order_id in self.order_ids_by_status[status]]
+
+    def get_order_count_by_status(self, status: OrderStatus) -> int:
+        return len(self.order_ids_by_status[status])
+
+    # Pending orders of one direction and type priced within [min_price, max_price], found by bisecting the book.
+    def get_pending_orders_by_price(self, symbol_id: str, direction: OrderDirection, order_type: OrderType,
+                                    min_price: Optional[float] = None,
+                                    max_price: Optional[float] = None) -> List[Order]:
+        books: Optional[Dict[Tuple[OrderDirection, OrderType], List[Tuple[float, int]]]] = \
+            self.trigger_books.get(symbol_id)
+        if books is None:
+            return []
+        book: List[Tuple[float, int]] = books[(direction, order_type)]
+        start: int = 0 if min_price is None else bisect_left(book, min_price, key=_get_book_price)
+        stop: int = len(book) if max_price is None else bisect_right(book, max_price, key=_get_book_price)
+        return [self.orders[order_id] for _, order_id in book[start:stop]]
+
+    def update_order(self, order_id: int, price: float, amount: int) -> None:
+        order: Order = self.orders[order_id]
+        is_pending: bool = order.status == OrderStatus.PENDING
+        if is_pending:
+            self._remove_pending_order(order=order)
+        order.price = price
+        order.amount = amount
+        if is_pending:
+            self._add_pending_order(order=order)
+
+    def update_order_status(self, order_id: int, status: OrderStatus) -> None:
+        order: Order = self.orders[order_id]
+        del self.order_ids_by_status[order.status][order_id]
+        if order.status == OrderStatus.PENDING:
+            self._remove_pending_order(order=order)
+        order.status = status
+        self._add_status_order_id(status=status, order_id=order_id)
+        if status == OrderStatus.PENDING:
+            self._add_pending_order(order=order)
+
+    def get_pending_notionals(self, symbol_id: str) -> Tuple[float, float]:
+        notionals: Optional[Dict[OrderDirection, float]] = self.pending_notionals.get(symbol_id)
+        if notionals is None:
+            return 0.0, 0.0
+        return notionals[OrderDirection.BUY], notionals[OrderDirection.SELL]
+
+    def get_pending_symbol_ids(self) -> List[str]:
+        return list(self.pending_counts)
+
+    def get_all_orders(self) -> Sequence[Order]:
+        return self.orders
+
+    def _add_status_order_id(self, status: OrderStatus, order_id: int) -> None:
+        order_ids: Dict[int, None] = self.order_ids_by_status[status]
+        if order_ids and order_id < next(reversed(order_ids)):
+            self.unordered_statuses.add(status)
+        order_ids[order_id] = None
+
+    def _add_pending_order(self, order: Order) -> None:
+        if order.symbol_id not in self.pending_counts:
+            self.pending_counts[order.symbol_id] = 0
+            self.pending_notionals[order.symbol_id] = {direction: 0.0 for direction in OrderDirection}
+            self.trigger_books[order.symbol_id] = {
+                (direction, order_type): [] for direction in OrderDirection for order_type in OrderType}
+        self.pending_counts[order.symbol_id] += 1
+        insort(self.trigger_books[order.symbol_id][(order.direction, order.type)], (order.price, order.id))
+        self.pending_notionals[order.symbol_id][order.direction] += order.price * order.amount
+
+    def _remove_pending_order(self, order: Order) -> None:
+        book: List[Tuple[float, int]] = self.trigger_books[order.symbol_id][(order.direction, order.type)]
+        del book[bisect_left(book, (order.price, order.id))]
+        self.pending_notionals[order.symbol_id][order.direction] -= order.price * order.amount
+        self.pending_counts[order.symbol_id] -= 1
+        # Running sums drift with rounding, so they restart from zero whenever the symbol has no pending orders.
+        if self.pending_counts[order.symbol_id] == 0:
+            del self.pending_counts[order.symbol_id]
+            del self.pending_notionals[order.symbol_id]
+            del self.trigger_books[order.symbol_id]
+
+
+def _get_book_price(entry: Tuple[float, int]) -> float:
+    return entry[0]
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, Tuple, Sequence
 
-from broker.enums import OrderStatus
+from broker.enums import OrderStatus, OrderDirection, OrderType
 from broker.model import Order
 
 
@@ -17,3 +17,34 @@ class OrderRepository(ABC):
     @abstractmethod
     def get_order_by_status(self, status: OrderStatus) -> List[Order]:
         pass
+
+    @abstractmethod
+    def get_order_count_by_status(self, status: OrderStatus) -> int:
+        pass
+
+    @abstractmethod
+    def get_pending_orders_by_price(self, symbol_id: str, direction: OrderDirection, order_type: OrderType,
+                                    min_price: Optional[float] = None,
+                                    max_price: Optional[float] = None) -> List[Order]:
+        pass
+
+    @abstractmethod
+    def update_order(self, order_id: int, price: float, amount: int) -> None:
+        pass
+
+    @abstractmethod
+    def update_order_status(self, order_id: int, status: OrderStatus) -> None:
+        pass
+
+    @abstractmethod
+    def get_all_orders(self) -> Sequence[Order]:
+        pass
+
+    # Sum of price * amount over pending buy and sell orders of the symbol.
+    @abstractmethod
+    def get_pending_notionals(self, symbol_id: str) -> Tuple[float, float]:
+        pass
+
+    @abstractmethod
+    def get_pending_symbol_ids(self) -> List[str]:
+        pass
@@ -6,14 +6,19 @@ from broker.enums import OrderStatus
 from broker.model import Order
 from broker.repository.order_repository import OrderRepository
 from broker.service.order_validation_service import OrderValidationService
+from common.journal.event import EventType, NO_ORDER_ID
+from common.journal.event_journal import EventJournal
+from common.journal.impl.logging_event_journal import LoggingEventJournal
 from data.model import Symbol
 from data.repository.data_repository import DataRepository
 
 
 class GeneralOrderValidationService(OrderValidationService):
-    def __init__(self, data_repository: DataRepository, order_repository: OrderRepository):
+    def __init__(self, data_repository: DataRepository, order_repository: OrderRepository,
+                 journal: Optional[EventJournal] = None):
         self.data_repository: DataRepository = data_repository
         self.order_repository: OrderRepository = order_repository
+        self.journal: EventJournal = journal if journal is not None else LoggingEventJournal()
 
     def validate_new_order_input(self, symbol_id: str, price: float, amount: int) -> bool:
         is_price_valid: bool = self._validate_price(symbol_id=symbol_id, price=price, order_id=None)
@@ -37,28 +42,30 @@ class GeneralOrderValidationService(OrderValidationService):
         if order_id is not None:
             order: Optional[Order] = self.order_repository.get_order_by_id(order_id=order_id)
             if order is None:
-                logging.error(f"Order {order_id} does not exist")
+                self.journal.append(EventType.ORDER_NOT_FOUND, order_id=order_id)
                 return False
             symbol_id = order.symbol_id
 
         if symbol_id is None:
             logging.error("Symbol is not provided")
             return False
-        symbol: Optional[Symbol] = self.data_repository.get_symbol()
+        symbol: Optional[Symbol] = self.data_repository.get_symbol(symbol_id=symbol_id)
+        if symbol is None:
+            logging.error("Symbol %s is not traded in this test", symbol_id)
+            return False
 
-        assert symbol is not None
         is_larger_than_zero: bool = price > 0
         is_divisible_by_tick_size: bool = math.isclose(abs(price % symbol.minimum_tick_size - symbol.minimum_tick_size),
                                                        0.0, abs_tol=1e-9) or math.isclose(
             abs(price % symbol.minimum_tick_size), 0.0, abs_tol=1e-9)
         if not is_larger_than_zero or not is_divisible_by_tick_size:
-            logging.error(f"Price {price} is not valid")
+            self.journal.append(EventType.INVALID_PRICE, order_id=NO_ORDER_ID if order_id is None else order_id,
+                                price=price)
         return is_larger_than_zero and is_divisible_by_tick_size
 
-    @staticmethod
-    def _validate_amount(amount: int) -> bool:
+    def _validate_amount(self, amount: int) -> bool:
         if amount <= 0:
-            logging.error(f"Amount {amount} is not valid")
+            self.journal.append(EventType.INVALID_AMOUNT, amount=amount)
             return False
         return True
 
@@ -67,13 +74,13 @@ class GeneralOrderValidationService(OrderValidationService):
         if order is None:
             return False
         if order.status != OrderStatus.PENDING:
-            logging.error(f"Order {order_id} is not pending")
+            self.journal.append(EventType.ORDER_NOT_PENDING, order_id=order_id)
             return False
         return True
 
     def _validate_is_order_exist(self, order_id: int) -> bool:
         order: Optional[Order] = self.order_repository.get_order_by_id(order_id=order_id)
         if order is None:
-            logging.error(f"Order {order_id} does not exist")
+            self.journal.append(EventType.ORDER_NOT_FOUND, order_id=order_id)
             return False
         return True
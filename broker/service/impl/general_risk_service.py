@@ -1,57 +1,68 @@
-import logging
-from typing import Optional, Tuple, List
+import math
+from typing import Optional, Tuple, List, Dict
+
+import numpy as np
 
 from broker.enums import OrderDirection, OrderStatus
 from broker.model import Order, Position
 from broker.repository.account_repository import AccountRepository
 from broker.repository.order_repository import OrderRepository
 from broker.service.risk_service import RiskService
+from common.journal.event import EventType
+from common.journal.event_journal import EventJournal
+from common.journal.impl.logging_event_journal import LoggingEventJournal
 from data.model import Symbol, TestConfig
 from data.repository.data_repository import DataRepository
 
 
 class GeneralRiskService(RiskService):
     def __init__(self, account_repository: AccountRepository, order_repository: OrderRepository,
-                 data_repository: DataRepository):
+                 data_repository: DataRepository, consistency_check: bool = False,
+                 journal: Optional[EventJournal] = None):
         self.account_repository: AccountRepository = account_repository
         self.order_repository: OrderRepository = order_repository
         self.data_repository: DataRepository = data_repository
+        self.consistency_check: bool = consistency_check
+        self.journal: EventJournal = journal if journal is not None else LoggingEventJournal()
 
     def validate_account_risk(self) -> bool:
-        buy_margin, sell_margin = self._get_used_margins()
         available_margin: float = self._get_available_margin()
-        required_margin: float = max(buy_margin, sell_margin)
+        required_margin: float = self._get_required_margin()
         return self._validate_margin(required_margin=required_margin, available_margin=available_margin)
 
     def validate_new_order_risk(self, symbol_id: str, price: float, amount: int, direction: OrderDirection) -> bool:
-        buy_margin, sell_margin = self._get_used_margins()
-        order_margin: float = self._get_margin(price=price, amount=amount)
-        buy_margin += order_margin if direction == OrderDirection.BUY else 0
-        sell_margin += order_margin if direction == OrderDirection.SELL else 0
-        required_margin: float = max(buy_margin, sell_margin)
+        order_margin: float = self._get_margin(symbol_id=symbol_id, price=price, amount=amount)
+        required_margin: float = self._get_required_margin(symbol_id=symbol_id, direction=direction,
+                                                           margin_change=order_margin)
         available_margin: float = self._get_available_margin()
         return self._validate_margin(required_margin=required_margin, available_margin=available_margin)
 
     def validate_update_order_risk(self, order_id: int, new_price: Optional[float], new_amount: Optional[int]) -> bool:
-        buy_margin, sell_margin = self._get_used_margins()
-
         order: Optional[Order] = self.order_repository.get_order_by_id(order_id=order_id)
         assert order is not None
-        order_margin: float = self._get_margin(price=order.price, amount=order.amount)
-        new_margin: float = self._get_margin(price=new_price or order.price,
+        order_margin: float = self._get_margin(symbol_id=order.symbol_id, price=order.price, amount=order.amount)
+        new_margin: float = self._get_margin(symbol_id=order.symbol_id, price=new_price or order.price,
                                              amount=new_amount or order.amount)
         diff_margin: float = new_margin - order_margin
-        buy_margin += diff_margin if order.direction == OrderDirection.BUY else 0
-        sell_margin += diff_margin if order.direction == OrderDirection.SELL else 0
 
-        required_margin: float = max(buy_margin, sell_margin)
+        required_margin: float = self._get_required_margin(symbol_id=order.symbol_id, direction=order.direction,
+                                                           margin_change=diff_margin)
         available_margin: float = self._get_available_margin()
         return self._validate_margin(required_margin=required_margin, available_margin=available_margin)
 
-    @staticmethod
-    def _validate_margin(required_margin, available_margin) -> bool:
+    def get_liquidation_balance(self) -> float:
+        required_margin: float = self._get_required_margin()
+        test_config: TestConfig = self.data_repository.get_test_config()
+        return required_margin / (1 - test_config.margin_requirement)
+
+    def validate_account_risk_on_balances(self, balances: np.ndarray) -> np.ndarray:
+        required_margin: float = self._get_required_margin()
+        test_config: TestConfig = self.data_repository.get_test_config()
+        return ~(required_margin >= balances * (1 - test_config.margin_requirement))
+
+    def _validate_margin(self, required_margin: float, available_margin: float) -> bool:
         if required_margin >= available_margin:
-            logging.error(f"Required margin {required_margin} is larger than available margin {available_margin}")
+            self.journal.append(EventType.INSUFFICIENT_MARGIN, value=required_margin, limit=available_margin)
             return False
         return True
 
@@ -59,37 +70,73 @@ class GeneralRiskService(RiskService):
         test_config: TestConfig = self.data_repository.get_test_config()
         return self.account_repository.get_balance() * (1 - test_config.margin_requirement)
 
-    def _get_pending_order_margins(self) -> Tuple[float, float]:
+    # The buy and sell margins of a symbol offset each other, so each symbol requires the larger of the two. The
+    # portfolio requires the sum over the symbols with a position or pending orders, optionally with a margin change
+    # on one side of one symbol.
+    def _get_required_margin(self, symbol_id: Optional[str] = None, direction: Optional[OrderDirection] = None,
+                             margin_change: float = 0) -> float:
+        symbol_ids: Dict[str, None] = dict.fromkeys(self.account_repository.get_positions())
+        symbol_ids.update(dict.fromkeys(self.order_repository.get_pending_symbol_ids()))
+        if symbol_id is not None:
+            symbol_ids[symbol_id] = None
+
+        required_margin: float = 0
+        for active_symbol_id in symbol_ids:
+            buy_margin, sell_margin = self._get_used_margins(symbol_id=active_symbol_id)
+            if active_symbol_id == symbol_id:
+                buy_margin += margin_change if direction == OrderDirection.BUY else 0
+                sell_margin += margin_change if direction == OrderDirection.SELL else 0
+            required_margin += max(buy_margin, sell_margin)
+        return required_margin
+
+    # Pending notionals are kept up to date by the order repository, so this does not scan the pending orders.
+    def _get_pending_order_margins(self, symbol_id: str) -> Tuple[float, float]:
+        buy_notional, sell_notional = self.order_repository.get_pending_notionals(symbol_id=symbol_id)
+        buy_margin: float = self._get_notional_margin(symbol_id=symbol_id, notional=buy_notional)
+        sell_margin: float = self._get_notional_margin(symbol_id=symbol_id, notional=sell_notional)
+        if self.consistency_check:
+            self._check_pending_order_margins(symbol_id=symbol_id, buy_margin=buy_margin, sell_margin=sell_margin)
+        return buy_margin, sell_margin
+
+    def _check_pending_order_margins(self, symbol_id: str, buy_margin: float, sell_margin: float) -> None:
         orders: List[Order] = self.order_repository.get_order_by_status(OrderStatus.PENDING)
-        buy_margin: float = 0
-        sell_margin: float = 0
+        expected_buy_margin: float = 0
+        expected_sell_margin: float = 0
 
         for order in orders:
-            order_margin: float = self._get_margin(price=order.price, amount=order.amount)
-            buy_margin += order_margin if order.direction == OrderDirection.BUY else 0
-            sell_margin += order_margin if order.direction == OrderDirection.SELL else 0
-
-        return buy_margin, sell_margin
-
-    def _get_position_margins(self) -> Tuple[float, float]:
+            if order.symbol_id != symbol_id:
+                continue
+            order_margin: float = self._get_margin(symbol_id=symbol_id, price=order.price, amount=order.amount)
+            expected_buy_margin += order_margin if order.direction == OrderDirection.BUY else 0
+            expected_sell_margin += order_margin if order.direction == OrderDirection.SELL else 0
+
+        if not math.isclose(buy_margin, expected_buy_margin, rel_tol=1e-9, abs_tol=1e-6) or \
+                not math.isclose(sell_margin, expected_sell_margin, rel_tol=1e-9, abs_tol=1e-6):
+            raise RuntimeError(f"Margin ledger ({buy_margin}, {sell_margin}) does not match pending orders "
+                               f"({expected_buy_margin}, {expected_sell_margin})")
+
+    def _get_position_margins(self, symbol_id: str) -> Tuple[float, float]:
         buy_margin: float = 0
         sell_margin: float = 0
-        position: Optional[Position] = self.account_repository.get_position()
+        position: Optional[Position] = self.account_repository.get_position(symbol_id=symbol_id)
 
         if position is None:
             return 0, 0
 
-        position_margin: float = self._get_margin(price=position.average_price,
+        position_margin: float = self._get_margin(symbol_id=symbol_id, price=position.average_price,
                                                   amount=position.amount)
         buy_margin += position_margin if position.direction == OrderDirection.BUY else 0
         sell_margin += position_margin if position.direction == OrderDirection.SELL else 0
         return buy_margin, sell_margin
 
-    def _get_margin(self, price: float, amount: int) -> float:
-        symbol: Symbol = self.data_repository.get_symbol()
-        return price * amount * symbol.multiplier * symbol.margin_rate
+    def _get_margin(self, symbol_id: str, price: float, amount: int) -> float:
+        return self._get_notional_margin(symbol_id=symbol_id, notional=price * amount)
+
+    def _get_notional_margin(self, symbol_id: str, notional: float) -> float:
+        symbol: Symbol = self.data_repository.get_symbol(symbol_id=symbol_id)
+        return notional * symbol.multiplier * symbol.margin_rate
 
-    def _get_used_margins(self) -> Tuple[float, float]:
-        position_margins: Tuple[float, float] = self._get_position_margins()
-        pending_order_margins: Tuple[float, float] = self._get_pending_order_margins()
+    def _get_used_margins(self, symbol_id: str) -> Tuple[float, float]:
+        position_margins: Tuple[float, float] = self._get_position_margins(symbol_id=symbol_id)
+        pending_order_margins: Tuple[float, float] = self._get_pending_order_margins(symbol_id=symbol_id)
         return position_margins[0] + pending_order_margins[0], position_margins[1] + pending_order_margins[1]
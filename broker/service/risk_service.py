@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 
+import numpy as np
+
 from broker.enums import OrderDirection
 
 
@@ -16,3 +18,13 @@ class RiskService(ABC):
     @abstractmethod
     def validate_account_risk(self) -> bool:
         pass
+
+    # Balance at or below which validate_account_risk fails with the current position and orders.
+    @abstractmethod
+    def get_liquidation_balance(self) -> float:
+        pass
+
+    # validate_account_risk for each of the given balances with the current position and orders.
+    @abstractmethod
+    def validate_account_risk_on_balances(self, balances: np.ndarray) -> np.ndarray:
+        pass
@@ -0,0 +1,193 @@
+import math
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Iterator, Iterable, Tuple
+
+import numpy as np
+
+from broker.enums import OrderDirection, OrderType, OrderStatus
+from broker.model import Order
+from data.store.bar_store import DATETIME_DTYPE
+
+ORDER_DIRECTIONS: List[OrderDirection] = list(OrderDirection)
+ORDER_TYPES: List[OrderType] = list(OrderType)
+ORDER_STATUSES: List[OrderStatus] = list(OrderStatus)
+# Array typecode and exported dtype of each column. Enums are stored as their index in the lists above, symbols as
+# their index in the table's symbol ids, datetimes as microseconds since the epoch and unset prices as NaN.
+COLUMN_TYPES: Dict[str, Tuple[str, np.dtype]] = {
+    'symbol_code': ('i', np.dtype('int32')),
+    'price': ('d', np.dtype('float64')),
+    'amount': ('q', np.dtype('int64')),
+    'direction': ('b', np.dtype('int8')),
+    'type': ('b', np.dtype('int8')),
+    'status': ('b', np.dtype('int8')),
+    'created_at': ('q', DATETIME_DTYPE),
+    'updated_at': ('q', DATETIME_DTYPE),
+    'commissions': ('d', np.dtype('float64')),
+    'execution_price': ('d', np.dtype('float64')),
+}
+EPOCH: datetime = datetime(1970, 1, 1)
+MICROSECOND: timedelta = timedelta(microseconds=1)
+
+
+def _value_property(name: str) -> property:
+    def get(view: 'OrderView') -> float | int:
+        return view.table.columns[name][view.id]
+
+    def put(view: 'OrderView', value: float | int) -> None:
+        view.table.columns[name][view.id] = value
+
+    return property(get, put)
+
+
+def _optional_property(name: str) -> property:
+    def get(view: 'OrderView') -> Optional[float]:
+        value: float = view.table.columns[name][view.id]
+        return None if math.isnan(value) else value
+
+    def put(view: 'OrderView', value: Optional[float]) -> None:
+        view.table.columns[name][view.id] = math.nan if value is None else value
+
+    return property(get, put)
+
+
+def _enum_property(name: str, members: List) -> property:
+    codes: Dict = {member: code for code, member in enumerate(members)}
+
+    def get(view: 'OrderView'):
+        return members[view.table.columns[name][view.id]]
+
+    def put(view: 'OrderView', value) -> None:
+        view.table.columns[name][view.id] = codes[value]
+
+    return property(get, put)
+
+
+def _datetime_property(name: str) -> property:
+    def get(view: 'OrderView') -> datetime:
+        return EPOCH + timedelta(microseconds=view.table.columns[name][view.id])
+
+    def put(view: 'OrderView', value: datetime) -> None:
+        view.table.columns[name][view.id] = (value - EPOCH) // MICROSECOND
+
+    return property(get, put)
+
+
+# One order of an order table with the attributes of an Order, reads and writes go to the table's columns.
+# Views are created on demand and hold nothing but the table and the order id.
+class OrderView:
+    __slots__ = ('table', 'id')
+
+    def __init__(self, table: 'OrderTable', order_id: int):
+        self.table: OrderTable = table
+        self.id: int = order_id
+
+    price: property = _value_property(name='price')
+    amount: property = _value_property(name='amount')
+    direction: property = _enum_property(name='direction', members=ORDER_DIRECTIONS)
+    type: property = _enum_property(name='type', members=ORDER_TYPES)
+    status: property = _enum_property(name='status', members=ORDER_STATUSES)
+    created_at: property = _datetime_property(name='created_at')
+    updated_at: property = _datetime_property(name='updated_at')
+    commissions: property = _optional_property(name='commissions')
+    execution_price: property = _optional_property(name='execution_price')
+
+    @property
+    def symbol_id(self) -> str:
+        return self.table.symbol_ids[self.table.columns['symbol_code'][self.id]]
+
+    @symbol_id.setter
+    def symbol_id(self, symbol_id: str) -> None:
+        self.table.columns['symbol_code'][self.id] = self.table.get_symbol_code(symbol_id=symbol_id)
+
+    def to_order(self) -> Order:
+        return Order(id=self.id, symbol_id=self.symbol_id, price=self.price, amount=self.amount,
+                     direction=self.direction, type=self.type, status=self.status, created_at=self.created_at,
+                     updated_at=self.updated_at, commissions=self.commissions, execution_price=self.execution_price)
+
+    # Compares by value with views and orders alike, so like orders views are not hashable.
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, OrderView):
+            return self.to_order() == other.to_order()
+        if isinstance(other, Order):
+            return self.to_order() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_order())
+
+
+# Orders kept as one typed array per field instead of one object per order, about 60 bytes an order. Order ids
+# are row indexes. Indexing returns OrderView proxies, to_columns exports the orders without creating any.
+class OrderTable(Sequence):
+    def __init__(self):
+        self.length: int = 0
+        self.symbol_ids: List[str] = []
+        self.symbol_codes: Dict[str, int] = {}
+        self.columns: Dict[str, array] = {name: array(typecode) for name, (typecode, _) in COLUMN_TYPES.items()}
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Order]) -> 'OrderTable':
+        table: OrderTable = cls()
+        for order in orders:
+            table.append(order=order)
+        return table
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int | slice) -> OrderView | List[OrderView]:
+        if isinstance(index, slice):
+            return [OrderView(self, order_id) for order_id in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if index < 0 or index >= self.length:
+            raise IndexError(f'Order {index} is out of range')
+        return OrderView(self, index)
+
+    def __iter__(self) -> Iterator[OrderView]:
+        return (OrderView(self, order_id) for order_id in range(self.length))
+
+    # Copies the order into a new row, its id is the returned row index.
+    def append(self, order: Order) -> int:
+        columns: Dict[str, array] = self.columns
+        columns['symbol_code'].append(self.get_symbol_code(symbol_id=order.symbol_id))
+        columns['price'].append(order.price)
+        columns['amount'].append(order.amount)
+        columns['direction'].append(ORDER_DIRECTIONS.index(order.direction))
+        columns['type'].append(ORDER_TYPES.index(order.type))
+        columns['status'].append(ORDER_STATUSES.index(order.status))
+        columns['created_at'].append((order.created_at - EPOCH) // MICROSECOND)
+        columns['updated_at'].append((order.updated_at - EPOCH) // MICROSECOND)
+        columns['commissions'].append(math.nan if order.commissions is None else order.commissions)
+        columns['execution_price'].append(math.nan if order.execution_price is None else order.execution_price)
+        self.length += 1
+        return self.length - 1
+
+    def get_symbol_code(self, symbol_id: str) -> int:
+        code: Optional[int] = self.symbol_codes.get(symbol_id)
+        if code is None:
+            code = len(self.symbol_ids)
+            self.symbol_ids.append(symbol_id)
+            self.symbol_codes[symbol_id] = code
+        return code
+
+    # Copies of the columns as numpy arrays, with the ids and the symbol ids decoded from their codes.
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        columns: Dict[str, np.ndarray] = {'id': np.arange(self.length, dtype=np.int64)}
+        for name, (typecode, dtype) in COLUMN_TYPES.items():
+            column: np.ndarray = np.frombuffer(self.columns[name], dtype=typecode)
+            columns[name] = column.astype(dtype) if dtype == DATETIME_DTYPE else column.copy()
+        symbol_code: np.ndarray = columns.pop('symbol_code')
+        columns['symbol_id'] = np.asarray(self.symbol_ids, dtype=str)[symbol_code] if self.symbol_ids \
+            else np.empty(0, dtype=str)
+        return columns
+
+
+# Columns of a list of orders or of an order table, see OrderTable.to_columns.
+def get_order_columns(orders: Sequence) -> Dict[str, np.ndarray]:
+    table: OrderTable = orders if isinstance(orders, OrderTable) else OrderTable.from_orders(orders=orders)
+    return table.to_columns()
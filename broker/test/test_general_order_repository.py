@@ -0,0 +1,123 @@
+import unittest
+from datetime import datetime
+
+from broker.enums import OrderStatus, OrderDirection, OrderType
+from broker.model import Order
+from broker.repository.impl.general_order_repository import GeneralOrderRepository
+from broker.store.order_table import OrderTable
+
+
+def _order(symbol_id: str = 'symbol1') -> Order:
+    return Order(id=-1, symbol_id=symbol_id, price=10.0, amount=1, direction=OrderDirection.BUY, type=OrderType.LMT,
+                 status=OrderStatus.PENDING, created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1),
+                 commissions=None, execution_price=None)
+
+
+class TestGeneralOrderRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = self._create_repository()
+        self.orders = [_order() for _ in range(5)]
+        for order in self.orders:
+            self.repository.save_order(order)
+
+    def _create_repository(self):
+        return GeneralOrderRepository()
+
+    def test_save_order_assigns_ids(self):
+        self.assertEqual([order.id for order in self.orders], [0, 1, 2, 3, 4])
+        self.assertIs(self.repository.get_order_by_id(3), self.orders[3])
+        self.assertIsNone(self.repository.get_order_by_id(5))
+
+    def test_update_order_status_moves_order_between_indexes(self):
+        self.repository.update_order_status(order_id=3, status=OrderStatus.FILLED)
+        self.repository.update_order_status(order_id=1, status=OrderStatus.FILLED)
+        self.repository.update_order_status(order_id=2, status=OrderStatus.CANCELLED)
+
+        self.assertEqual(self.orders[3].status, OrderStatus.FILLED)
+        self.assertEqual([order.id for order in self.repository.get_order_by_status(OrderStatus.PENDING)], [0, 4])
+        self.assertEqual([order.id for order in self.repository.get_order_by_status(OrderStatus.FILLED)], [1, 3])
+        self.assertEqual([order.id for order in self.repository.get_order_by_status(OrderStatus.CANCELLED)], [2])
+
+    def test_pending_orders_are_listed_without_sorting(self):
+        for order_id in (3, 1):
+            self.repository.update_order_status(order_id=order_id, status=OrderStatus.FILLED)
+        self.assertEqual([order.id for order in self.repository.get_order_by_status(OrderStatus.PENDING)], [0, 2, 4])
+        self.assertEqual(self.repository.unordered_statuses, {OrderStatus.FILLED})
+
+        self.assertEqual([order.id for order in self.repository.get_order_by_status(OrderStatus.FILLED)], [1, 3])
+        self.assertEqual(self.repository.unordered_statuses, set())
+
+    def test_pending_notionals_follow_order_changes(self):
+        self.assertEqual(self.repository.get_pending_notionals(symbol_id='symbol1'), (50.0, 0.0))
+        self.repository.update_order(order_id=0, price=12.0, amount=2)
+        self.repository.update_order_status(order_id=1, status=OrderStatus.FILLED)
+        self.assertEqual(self.repository.get_pending_notionals(symbol_id='symbol1'), (54.0, 0.0))
+
+        for order_id in (0, 2, 3, 4):
+            self.repository.update_order_status(order_id=order_id, status=OrderStatus.CANCELLED)
+        self.assertEqual(self.repository.get_pending_notionals(symbol_id='symbol1'), (0.0, 0.0))
+
+    def test_get_pending_orders_by_price(self):
+        for order_id, price in enumerate([10.5, 9.5, 11.0, 9.5, 10.0]):
+            self.repository.update_order(order_id=order_id, price=price, amount=1)
+        self.repository.update_order_status(order_id=2, status=OrderStatus.FILLED)
+
+        def get_ids(min_price, max_price):
+            return [order.id for order in self.repository.get_pending_orders_by_price(
+                symbol_id='symbol1', direction=OrderDirection.BUY, order_type=OrderType.LMT, min_price=min_price,
+                max_price=max_price)]
+
+        self.assertEqual(get_ids(None, None), [1, 3, 4, 0])
+        self.assertEqual(get_ids(10.0, None), [4, 0])
+        self.assertEqual(get_ids(None, 9.5), [1, 3])
+        self.assertEqual(get_ids(9.6, 10.4), [4])
+        self.assertEqual(self.repository.get_pending_orders_by_price(symbol_id='symbol1', direction=OrderDirection.SELL,
+                                                                     order_type=OrderType.LMT), [])
+        self.assertEqual(self.repository.get_pending_orders_by_price(symbol_id='symbol2', direction=OrderDirection.BUY,
+                                                                     order_type=OrderType.LMT), [])
+        self.assertEqual(self.repository.get_order_count_by_status(OrderStatus.PENDING), 4)
+
+    def test_pending_notionals_reset_without_drift(self):
+        order_ids = []
+        for price in (0.1, 0.2, 0.3, 0.7, 1.1):
+            order: Order = _order(symbol_id='symbol2')
+            order.price = price
+            order_ids.append(self.repository.save_order(order))
+        for order_id in (order_ids[0], order_ids[2], order_ids[1], order_ids[4]):
+            self.repository.update_order_status(order_id=order_id, status=OrderStatus.CANCELLED)
+        self.assertAlmostEqual(self.repository.get_pending_notionals(symbol_id='symbol2')[0], 0.7)
+
+        self.repository.update_order_status(order_id=order_ids[3], status=OrderStatus.CANCELLED)
+        self.assertEqual(self.repository.get_pending_notionals(symbol_id='symbol2'), (0.0, 0.0))
+        self.assertEqual(self.repository.get_pending_symbol_ids(), ['symbol1'])
+
+    def test_pending_orders_are_kept_per_symbol(self):
+        order: Order = _order(symbol_id='symbol2')
+        order.direction = OrderDirection.SELL
+        self.repository.save_order(order)
+        self.assertEqual(self.repository.get_pending_symbol_ids(), ['symbol1', 'symbol2'])
+        self.assertEqual(self.repository.get_pending_notionals(symbol_id='symbol2'), (0.0, 10.0))
+        self.assertEqual(self.repository.get_pending_notionals(symbol_id='symbol1'), (50.0, 0.0))
+        self.assertEqual(self.repository.get_pending_orders_by_price(symbol_id='symbol2', direction=OrderDirection.SELL,
+                                                                     order_type=OrderType.LMT), [order])
+
+        self.repository.update_order_status(order_id=order.id, status=OrderStatus.CANCELLED)
+        self.assertEqual(self.repository.get_pending_symbol_ids(), ['symbol1'])
+        self.assertEqual(self.repository.get_pending_notionals(symbol_id='symbol2'), (0.0, 0.0))
+
+
+class TestOrderTableOrderRepository(TestGeneralOrderRepository):
+    def setUp(self):
+        super().setUp()
+        # Saved orders are copied into the table, changes are seen through the views.
+        self.orders = [self.repository.get_order_by_id(order.id) for order in self.orders]
+
+    def _create_repository(self):
+        return GeneralOrderRepository(order_table=OrderTable())
+
+    def test_save_order_assigns_ids(self):
+        order: Order = _order()
+        self.assertEqual(self.repository.save_order(order), 5)
+        self.assertEqual(self.repository.get_order_by_id(5), order)
+        self.assertIsNone(self.repository.get_order_by_id(6))
+        self.assertEqual([order.id for order in self.repository.get_all_orders()], [0, 1, 2, 3, 4, 5])
@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import Mock
 
+import numpy as np
+
 from broker.enums import OrderDirection
 from broker.repository.account_repository import AccountRepository
 from broker.repository.order_repository import OrderRepository
@@ -14,12 +16,14 @@ class TestBarRiskService(unittest.TestCase):
         self.order_repository = Mock(spec=OrderRepository)
         self.data_repository = Mock(spec=DataRepository)
         self.service = GeneralRiskService(self.account_repository, self.order_repository, self.data_repository)
+        self.account_repository.get_positions.return_value = {}
+        self.order_repository.get_pending_symbol_ids.return_value = ['symbol1']
 
     def test_validate_new_order_risk(self):
         self.account_repository.get_balance.return_value = 1000.0
         self.data_repository.get_test_config.return_value = Mock(margin_requirement=0.1)
         self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
-        self.order_repository.get_order_by_status.return_value = []
+        self.order_repository.get_pending_notionals.return_value = (0.0, 0.0)
         self.account_repository.get_position.return_value = None
         result = self.service.validate_new_order_risk('symbol1', 10.0, 5, OrderDirection.BUY)
         self.assertTrue(result)
@@ -30,8 +34,7 @@ class TestBarRiskService(unittest.TestCase):
         self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
         self.order_repository.get_order_by_id.return_value = Mock(symbol_id='symbol1', price=10.0, amount=5,
                                                                   direction=OrderDirection.BUY)
-        self.order_repository.get_order_by_status.return_value = [Mock(symbol_id='symbol1', price=10.0, amount=5,
-                                                                       direction=OrderDirection.BUY)]
+        self.order_repository.get_pending_notionals.return_value = (50.0, 0.0)
         self.account_repository.get_position.return_value = None
         result = self.service.validate_update_order_risk(1, 20.0, 10)
         self.assertTrue(result)
@@ -40,8 +43,7 @@ class TestBarRiskService(unittest.TestCase):
         self.account_repository.get_balance.return_value = 1000.0
         self.data_repository.get_test_config.return_value = Mock(margin_requirement=0.1)
         self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
-        self.order_repository.get_order_by_status.return_value = [
-            Mock(symbol_id='symbol1', price=10.0, amount=5, direction=OrderDirection.BUY)]
+        self.order_repository.get_pending_notionals.return_value = (50.0, 0.0)
         self.account_repository.get_position.return_value = Mock(symbol_id='symbol1', average_price=10.0, amount=5,
                                                                  direction=OrderDirection.BUY)
 
@@ -54,8 +56,7 @@ class TestBarRiskService(unittest.TestCase):
         self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
         self.order_repository.get_order_by_id.return_value = Mock(symbol_id='symbol1', price=10.0, amount=5,
                                                                   direction=OrderDirection.BUY)
-        self.order_repository.get_order_by_status.return_value = [
-            Mock(symbol_id='symbol1', price=10.0, amount=5, direction=OrderDirection.BUY)]
+        self.order_repository.get_pending_notionals.return_value = (50.0, 0.0)
         self.account_repository.get_position.return_value = Mock(symbol_id='symbol1', average_price=10.0, amount=5,
                                                                  direction=OrderDirection.BUY)
         result = self.service.validate_update_order_risk(1, 20.0, 10)
@@ -65,7 +66,7 @@ class TestBarRiskService(unittest.TestCase):
         self.account_repository.get_balance.return_value = 100.0
         self.data_repository.get_test_config.return_value = Mock(margin_requirement=0.1)
         self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
-        self.order_repository.get_order_by_status.return_value = []
+        self.order_repository.get_pending_notionals.return_value = (0.0, 0.0)
         self.account_repository.get_position.return_value = None
         result = self.service.validate_new_order_risk('symbol1', 1000.0, 5, OrderDirection.BUY)
         self.assertFalse(result)
@@ -76,7 +77,59 @@ class TestBarRiskService(unittest.TestCase):
         self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
         self.order_repository.get_order_by_id.return_value = Mock(symbol_id='symbol1', price=10.0, amount=5,
                                                                   direction=OrderDirection.BUY)
-        self.order_repository.get_order_by_status.return_value = []
+        self.order_repository.get_pending_notionals.return_value = (0.0, 0.0)
         self.account_repository.get_position.return_value = None
         result = self.service.validate_update_order_risk(1, 1000.0, 10)
         self.assertFalse(result)
+
+    def test_validate_account_risk_uses_pending_notionals(self):
+        self.account_repository.get_balance.return_value = 100.0
+        self.data_repository.get_test_config.return_value = Mock(margin_requirement=0.1)
+        self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
+        self.order_repository.get_pending_notionals.return_value = (500.0, 1000.0)
+        self.account_repository.get_position.return_value = None
+        self.assertFalse(self.service.validate_account_risk())
+        self.order_repository.get_order_by_status.assert_not_called()
+
+    def test_consistency_check_detects_stale_ledger(self):
+        service = GeneralRiskService(self.account_repository, self.order_repository, self.data_repository,
+                                     consistency_check=True)
+        self.account_repository.get_balance.return_value = 1000.0
+        self.data_repository.get_test_config.return_value = Mock(margin_requirement=0.1)
+        self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
+        self.account_repository.get_position.return_value = None
+        self.order_repository.get_order_by_status.return_value = [
+            Mock(symbol_id='symbol1', price=10.0, amount=5, direction=OrderDirection.BUY)]
+
+        self.order_repository.get_pending_notionals.return_value = (50.0, 0.0)
+        self.assertTrue(service.validate_account_risk())
+        self.order_repository.get_pending_notionals.return_value = (40.0, 0.0)
+        with self.assertRaises(RuntimeError):
+            service.validate_account_risk()
+
+    def test_portfolio_margin_nets_within_and_sums_across_symbols(self):
+        self.account_repository.get_balance.return_value = 100.0
+        self.data_repository.get_test_config.return_value = Mock(margin_requirement=0.1)
+        self.data_repository.get_symbol.side_effect = lambda symbol_id: {
+            'symbol1': Mock(multiplier=1, margin_rate=0.1), 'symbol2': Mock(multiplier=2, margin_rate=0.1),
+            'symbol3': Mock(multiplier=1, margin_rate=0.1)}[symbol_id]
+        self.order_repository.get_pending_symbol_ids.return_value = ['symbol1', 'symbol2']
+        self.order_repository.get_pending_notionals.side_effect = lambda symbol_id: {
+            'symbol1': (500.0, 300.0), 'symbol2': (100.0, 0.0), 'symbol3': (0.0, 0.0)}[symbol_id]
+        self.account_repository.get_position.return_value = None
+
+        self.assertAlmostEqual(self.service.get_liquidation_balance(), 70.0 / 0.9)
+        self.assertTrue(self.service.validate_new_order_risk('symbol2', 50.0, 1, OrderDirection.BUY))
+        self.assertFalse(self.service.validate_new_order_risk('symbol2', 50.0, 3, OrderDirection.BUY))
+        self.assertTrue(self.service.validate_new_order_risk('symbol1', 100.0, 2, OrderDirection.SELL))
+        self.assertFalse(self.service.validate_new_order_risk('symbol3', 100.0, 3, OrderDirection.SELL))
+
+    def test_validate_account_risk_on_balances(self):
+        self.data_repository.get_test_config.return_value = Mock(margin_requirement=0.5)
+        self.data_repository.get_symbol.return_value = Mock(multiplier=1, margin_rate=0.1)
+        self.order_repository.get_pending_notionals.return_value = (500.0, 0.0)
+        self.account_repository.get_position.return_value = None
+
+        self.assertEqual(self.service.get_liquidation_balance(), 100.0)
+        self.assertEqual(self.service.validate_account_risk_on_balances(np.array([101.0, 100.0, 99.0])).tolist(),
+                         [True, False, False])
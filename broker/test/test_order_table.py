@@ -0,0 +1,82 @@
+import math
+import pickle
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from broker.enums import OrderStatus, OrderDirection, OrderType
+from broker.model import Order
+from broker.store.order_table import OrderTable, get_order_columns
+
+
+def _order(symbol_id: str, price: float, direction: OrderDirection) -> Order:
+    return Order(id=-1, symbol_id=symbol_id, price=price, amount=3, direction=direction, type=OrderType.STP,
+                 status=OrderStatus.PENDING, created_at=datetime(2024, 1, 2, 9, 30),
+                 updated_at=datetime(2024, 1, 2, 9, 30), commissions=None, execution_price=None)
+
+
+class TestOrderTable(unittest.TestCase):
+    def setUp(self):
+        self.orders = [_order('symbol1', 10.5, OrderDirection.BUY), _order('symbol2', 20.0, OrderDirection.SELL),
+                       _order('symbol1', 11.0, OrderDirection.SELL)]
+        self.table = OrderTable.from_orders(self.orders)
+        for order_id, order in enumerate(self.orders):
+            order.id = order_id
+
+    def test_views_read_the_saved_orders(self):
+        self.assertEqual(len(self.table), 3)
+        for order_id, order in enumerate(self.orders):
+            self.assertEqual(self.table[order_id].to_order(), order)
+        self.assertEqual(self.table[-1].symbol_id, 'symbol1')
+        self.assertEqual([view.id for view in self.table[1:]], [1, 2])
+        with self.assertRaises(IndexError):
+            _ = self.table[3]
+
+    def test_views_write_to_the_columns(self):
+        view = self.table[1]
+        view.status = OrderStatus.FILLED
+        view.execution_price = 19.5
+        view.commissions = 0.25
+        view.updated_at = datetime(2024, 1, 2, 9, 45)
+
+        order = self.table[1]
+        self.assertIsNot(order, view)
+        self.assertEqual(order.status, OrderStatus.FILLED)
+        self.assertEqual((order.execution_price, order.commissions), (19.5, 0.25))
+        self.assertEqual(order.updated_at, datetime(2024, 1, 2, 9, 45))
+        self.assertIsNone(self.table[0].execution_price)
+        with self.assertRaises(AttributeError):
+            view.note = 'views have no attributes of their own'
+
+    def test_to_columns(self):
+        self.table[2].execution_price = 11.0
+        columns = self.table.to_columns()
+
+        np.testing.assert_array_equal(columns['id'], [0, 1, 2])
+        np.testing.assert_array_equal(columns['symbol_id'], ['symbol1', 'symbol2', 'symbol1'])
+        np.testing.assert_array_equal(columns['price'], [10.5, 20.0, 11.0])
+        np.testing.assert_array_equal(columns['direction'], [0, 1, 1])
+        self.assertEqual(columns['created_at'][0], np.datetime64('2024-01-02T09:30'))
+        self.assertTrue(math.isnan(columns['execution_price'][0]))
+        self.assertEqual(columns['execution_price'][2], 11.0)
+        # Columns are copies, later changes to the table do not show up in them.
+        self.table[0].price = 10.0
+        self.assertEqual(columns['price'][0], 10.5)
+
+    def test_order_lists_export_the_same_columns(self):
+        table_columns = get_order_columns(self.table)
+        list_columns = get_order_columns(self.orders)
+        self.assertEqual(list(table_columns), list(list_columns))
+        for name in table_columns:
+            np.testing.assert_array_equal(table_columns[name], list_columns[name])
+
+    def test_views_compare_and_pickle_by_value(self):
+        self.assertEqual(self.table[0], self.orders[0])
+        self.assertNotEqual(self.table[0], self.table[2])
+        view = pickle.loads(pickle.dumps(self.table[1]))
+        self.assertEqual(view, self.table[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
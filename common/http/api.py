@@ -1,28 +1,67 @@
+import threading
+from typing import Optional, Dict
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from common.http.request import GetBarDataRequest, GetSymbolRequest
-from common.http.response import GetBarDataResponse, GetSymbolResponse
+from common.http.response import GetBarDataResponse, GetSymbolResponse, RawResponse
 
+POOL_SIZE: int = 16
+TIMEOUT: float = 300.0
+# Bar data in the bar file layout, columns as raw little-endian arrays. Servers that do not know it answer in JSON.
+BAR_DATA_CONTENT_TYPE: str = 'application/x-wind-bars'
+JSON_CONTENT_TYPE: str = 'application/json'
 
-def get_bar_data(token: str, request: GetBarDataRequest) -> GetBarDataResponse:
-    url = f"localhost:8080/api/data/"
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-    response = requests.get(url, headers=headers, json=request.to_dict())
+_session: Optional[requests.Session] = None
+_session_lock: threading.Lock = threading.Lock()
+
+
+# A keep-alive session whose pool keeps up to pool_size connections, so requests issued from several threads reuse
+# connections instead of opening one each. Size it to the most requests its caller has in flight at once.
+def create_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    session: requests.Session = requests.Session()
+    adapter: HTTPAdapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Session shared by the requests of callers that do not bring their own.
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+# Bar data in the bar file layout is returned undecoded, see data.store.bar_file.
+def get_bar_data(token: str, request: GetBarDataRequest, base_url: str,
+                 session: Optional[requests.Session] = None) -> GetBarDataResponse | RawResponse:
+    response: requests.Response = _get(token=token, url=f"{base_url}/api/data/", payload=request.to_dict(),
+                                       accept=f"{BAR_DATA_CONTENT_TYPE}, {JSON_CONTENT_TYPE};q=0.5", session=session)
     if response.status_code != 200:
         raise RuntimeError(f"Failed to get data: {response.status_code} - {response.text}")
-    get_data_response: GetBarDataResponse = response.json()
-    return get_data_response
+    content_type: str = response.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type == BAR_DATA_CONTENT_TYPE:
+        return RawResponse(content_type=content_type, content=response.content)
+    return GetBarDataResponse.from_dict(data=response.json())
 
 
-def get_symbol(token: str, request: GetSymbolRequest) -> GetSymbolResponse:
-    url = f"localhost:8080/api/data/symbol"
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-    response = requests.get(url, headers=headers, json=request.to_dict())
+def get_symbol(token: str, request: GetSymbolRequest, base_url: str,
+               session: Optional[requests.Session] = None) -> GetSymbolResponse:
+    response: requests.Response = _get(token=token, url=f"{base_url}/api/data/symbol", payload=request.to_dict(),
+                                       session=session)
     if response.status_code != 200:
         raise RuntimeError(f"Failed to get symbol: {response.status_code} - {response.text}")
-    get_symbol_response: GetSymbolResponse = response.json()
-    return get_symbol_response
+    return GetSymbolResponse.from_dict(data=response.json())
+
+
+def _get(token: str, url: str, payload: Dict, accept: str = JSON_CONTENT_TYPE,
+         session: Optional[requests.Session] = None) -> requests.Response:
+    headers: Dict[str, str] = {
+        "Authorization": f"Bearer {token}",
+        "Accept": accept
+    }
+    return (session or get_session()).get(url, headers=headers, json=payload, timeout=TIMEOUT)
@@ -0,0 +1,123 @@
+import argparse
+import json
+import logging
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional
+
+import numpy as np
+
+from common.http.api import BAR_DATA_CONTENT_TYPE, JSON_CONTENT_TYPE
+from common.http.dto import SymbolDto
+from data.model import Symbol
+from data.store.bar_file import encode_bar_store
+from data.store.bar_store import BarStore, DATETIME_DTYPE
+from data.store.synthetic_bar_data import generate_bar_data, generate_symbol
+
+
+# Stand-in for the data service that answers /api/data/ and /api/data/symbol with seeded synthetic data for
+# any symbol, so backtests and benchmarks run without network access. The same seed serves the same bars.
+class DataServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080, seed: int = 0):
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), _DataRequestHandler)
+        self.server.daemon_threads = True
+        self.server.seed = seed
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'DataServer':
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def serve_forever(self) -> None:
+        logging.info(f'Serving synthetic data on {self.url}')
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+
+    def __enter__(self) -> 'DataServer':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class _DataRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        try:
+            payload: Dict = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if self.path == '/api/data/symbol':
+                self._send_symbol(symbol=generate_symbol(symbol_id=payload['symbolId'], seed=self.server.seed))
+            elif self.path == '/api/data/':
+                self._send_bar_data(store=generate_bar_data(symbol_id=payload['symbolId'],
+                                                            timeframe=payload['timeframe'],
+                                                            start_date=datetime.fromisoformat(payload['startDate']),
+                                                            end_date=datetime.fromisoformat(payload['endDate']),
+                                                            seed=self.server.seed))
+            else:
+                self._send_json(status=404, data=None, message=f'No endpoint {self.path}')
+        except (KeyError, ValueError) as e:
+            self._send_json(status=400, data=None, message=f'Bad request: {e}')
+
+    do_POST = do_GET
+
+    def _send_symbol(self, symbol: Symbol) -> None:
+        symbol_dto: SymbolDto = SymbolDto(symbolId=symbol.id, minimumTickSize=symbol.minimum_tick_size,
+                                          multiplier=symbol.multiplier, marginRate=symbol.margin_rate,
+                                          upperLimit=symbol.upper_limit, lowerLimit=symbol.lower_limit,
+                                          commissionFee=symbol.commission_fee,
+                                          commissionRate=symbol.commission_rate)
+        self._send_json(status=200, data=asdict(symbol_dto))
+
+    def _send_bar_data(self, store: BarStore) -> None:
+        if BAR_DATA_CONTENT_TYPE in self.headers.get('Accept', ''):
+            self._send(status=200, content_type=BAR_DATA_CONTENT_TYPE,
+                       content=encode_bar_store(store=store, meta={'status': 200, 'message': 'OK'}))
+            return
+        self._send_json(status=200, data={name: (np.datetime_as_string(column).tolist()
+                                                 if column.dtype == DATETIME_DTYPE else column.tolist())
+                                          for name, column in store.columns.items()})
+
+    def _send_json(self, status: int, data: Optional[Dict], message: str = 'OK') -> None:
+        self._send(status=status, content_type=JSON_CONTENT_TYPE,
+                   content=json.dumps({'status': status, 'message': message, 'data': data}).encode('utf-8'))
+
+    def _send(self, status: int, content_type: str, content: bytes) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.debug(format % args)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Serve seeded synthetic market data')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--seed', type=int, default=0)
+    args: argparse.Namespace = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    DataServer(host=args.host, port=args.port, seed=args.seed).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -12,8 +12,8 @@ class GetBarDataRequest:
     def to_dict(self):
         return {
             "symbolId": self.symbol_id,
-            "startDate": self.start_date,
-            "endDate": self.end_date,
+            "startDate": self.start_date.isoformat(),
+            "endDate": self.end_date.isoformat(),
             "timeframe": self.timeframe
         }
 
@@ -10,9 +10,24 @@ class GetBarDataResponse:
     message: str
     data: Dict
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GetBarDataResponse':
+        return cls(status=data["status"], message=data["message"], data=data["data"])
+
+
+# Body of a response in a binary format, left for the caller to decode.
+@dataclass
+class RawResponse:
+    content_type: str
+    content: bytes
+
 
 @dataclass
 class GetSymbolResponse:
     status: int
     message: str
     data: SymbolDto
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GetSymbolResponse':
+        return cls(status=data["status"], message=data["message"], data=SymbolDto(**data["data"]))
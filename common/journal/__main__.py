@@ -0,0 +1,30 @@
+import argparse
+import sys
+from typing import Optional, List
+
+import numpy as np
+
+from common.journal.event import EventType, read_journal, decode_events
+
+
+# python -m common.journal run.wtj [--events ORDER_MATCHED ORDER_CLEARED] [--limit 100]
+def main(argv: Optional[List[str]] = None) -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Print the events of an event journal')
+    parser.add_argument('path')
+    parser.add_argument('--events', nargs='*', default=[], choices=[event.name for event in EventType],
+                        help='only print these events')
+    parser.add_argument('--limit', type=int, help='print at most this many events')
+    args: argparse.Namespace = parser.parse_args(argv)
+
+    records: np.ndarray = read_journal(path=args.path)
+    if args.events:
+        records = records[np.isin(records['event'], [EventType[name] for name in args.events])]
+    if args.limit is not None:
+        records = records[:args.limit]
+    for line in decode_events(records=records):
+        print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
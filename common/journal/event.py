@@ -0,0 +1,88 @@
+import logging
+import os
+import struct
+from enum import IntEnum
+from typing import Dict, Tuple, List
+
+import numpy as np
+
+MAGIC: bytes = b'WTJRNL\x00\x01'
+HEADER_SIZE: int = 64
+NO_ORDER_ID: int = -1
+
+
+# Fields other than the event and the bar index are NaN, or NO_ORDER_ID, when the event has no such value.
+# Amounts are negative for sell orders.
+class EventType(IntEnum):
+    ORDER_CREATED = 1
+    ORDER_UPDATED = 2
+    ORDER_CANCELLED = 3
+    ORDER_MATCHED = 4
+    ORDER_CLEARED = 5
+    ORDER_REJECTED_UPPER_LIMIT = 6
+    ORDER_REJECTED_LOWER_LIMIT = 7
+    ORDER_REJECTED_VOLUME = 8
+    ORDER_NOT_FOUND = 9
+    ORDER_NOT_PENDING = 10
+    INVALID_PRICE = 11
+    INVALID_AMOUNT = 12
+    INSUFFICIENT_MARGIN = 13
+    FORCE_CLOSE_FAILED = 14
+
+
+EVENT_DTYPE: np.dtype = np.dtype([('event', '<u2'), ('bar_index', '<i8'), ('order_id', '<i8'), ('price', '<f8'),
+                                  ('amount', '<f8'), ('value', '<f8'), ('limit', '<f8')], align=True)
+# Packs one record in the layout of EVENT_DTYPE.
+EVENT_STRUCT: struct.Struct = struct.Struct('<H6xqqdddd')
+
+# Log level and message of each event. value holds the order type code for created orders, the realized pnl for
+# cleared ones, the price change or volume for rejections and the required margin when it is insufficient.
+EVENT_MESSAGES: Dict[EventType, Tuple[int, str]] = {
+    EventType.ORDER_CREATED: (logging.INFO, 'Order {order_id} created: {side} {size:g} {order_type} at {price:g}'),
+    EventType.ORDER_UPDATED: (logging.INFO, 'Order {order_id} updated to {size:g} at {price:g}'),
+    EventType.ORDER_CANCELLED: (logging.INFO, 'Order {order_id} has been cancelled'),
+    EventType.ORDER_MATCHED: (logging.INFO, 'Order {order_id} matched at {price:g}'),
+    EventType.ORDER_CLEARED: (logging.INFO, 'Order {order_id} realized pnl: {value:g}'),
+    EventType.ORDER_REJECTED_UPPER_LIMIT: (logging.INFO, 'Order {order_id} has been rejected due to upper limit '
+                                                         'breach, change {value:g} above {limit:g}'),
+    EventType.ORDER_REJECTED_LOWER_LIMIT: (logging.INFO, 'Order {order_id} has been rejected due to lower limit '
+                                                         'breach, change {value:g} below {limit:g}'),
+    EventType.ORDER_REJECTED_VOLUME: (logging.INFO, 'Order {order_id} has been rejected due to insufficient volume '
+                                                    '{value:g} for {size:g}'),
+    EventType.ORDER_NOT_FOUND: (logging.ERROR, 'Order {order_id} does not exist'),
+    EventType.ORDER_NOT_PENDING: (logging.ERROR, 'Order {order_id} is not pending'),
+    EventType.INVALID_PRICE: (logging.ERROR, 'Price {price:g} is not valid'),
+    EventType.INVALID_AMOUNT: (logging.ERROR, 'Amount {amount:g} is not valid'),
+    EventType.INSUFFICIENT_MARGIN: (logging.ERROR, 'Required margin {value:g} is larger than available margin '
+                                                   '{limit:g}'),
+    EventType.FORCE_CLOSE_FAILED: (logging.ERROR, 'Force close of order {order_id} for {side} {size:g} at {price:g} '
+                                                  'failed'),
+}
+ORDER_TYPE_NAMES: List[str] = ['LMT', 'STP']
+
+
+def format_event(record: np.void | Tuple) -> str:
+    event, bar_index, order_id, price, amount, value, limit = (record.item() if isinstance(record, np.void)
+                                                               else record)
+    _, message = EVENT_MESSAGES[EventType(event)]
+    order_type: str = ORDER_TYPE_NAMES[int(value)] if event == EventType.ORDER_CREATED else ''
+    return f'bar {bar_index}: ' + message.format(order_id=order_id, price=price, amount=amount, value=value,
+                                                 limit=limit, side='SELL' if amount < 0 else 'BUY',
+                                                 size=abs(amount), order_type=order_type)
+
+
+# Records of a journal file. Trailing records that were never written are dropped, so the journal of a run that
+# did not finish can still be read.
+def read_journal(path: str) -> np.ndarray:
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('Not an event journal file')
+    if os.path.getsize(path) <= HEADER_SIZE:
+        return np.empty(0, dtype=EVENT_DTYPE)
+    records: np.ndarray = np.fromfile(path, dtype=EVENT_DTYPE, offset=HEADER_SIZE)
+    written: np.ndarray = np.flatnonzero(records['event'])
+    return records[:written[-1] + 1] if len(written) > 0 else records[:0]
+
+
+def decode_events(records: np.ndarray) -> List[str]:
+    return [format_event(record=record) for record in records.tolist()]
@@ -0,0 +1,27 @@
+import math
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from common.journal.event import EventType, NO_ORDER_ID
+
+
+class EventJournal(ABC):
+    @abstractmethod
+    def append(self, event: EventType, order_id: int = NO_ORDER_ID, price: float = math.nan,
+               amount: float = math.nan, value: float = math.nan, limit: float = math.nan) -> None:
+        pass
+
+    # Events appended from now on are stamped with this bar index.
+    @abstractmethod
+    def set_bar_index(self, bar_index: int) -> None:
+        pass
+
+    # A copy of the records appended so far.
+    @abstractmethod
+    def get_records(self) -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
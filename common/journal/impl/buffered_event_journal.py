@@ -0,0 +1,79 @@
+import logging
+import math
+import os
+from typing import Optional
+
+import numpy as np
+
+from common.journal.event import EventType, NO_ORDER_ID, EVENT_MESSAGES, EVENT_DTYPE, EVENT_STRUCT, MAGIC, \
+    HEADER_SIZE, format_event
+from common.journal.event_journal import EventJournal
+
+
+# Packs each event into a preallocated array of EVENT_DTYPE records, doubling it when full. With a path the array
+# is a memory mapping of the journal file, so the records reach the file without being copied and a run that
+# does not finish leaves a readable journal behind. Events are also logged when their level is enabled.
+class BufferedEventJournal(EventJournal):
+    def __init__(self, capacity: int = 65536, path: Optional[str] = None):
+        self.path: Optional[str] = path
+        self.capacity: int = max(capacity, 1)
+        self.count: int = 0
+        self.bar_index: int = 0
+        self.logger: logging.Logger = logging.getLogger()
+        if path is not None:
+            with open(path, 'wb') as file:
+                file.write(MAGIC.ljust(HEADER_SIZE, b'\x00'))
+            self.records: np.ndarray = self._map(capacity=self.capacity)
+        else:
+            self.records: np.ndarray = np.zeros(self.capacity, dtype=EVENT_DTYPE)
+        self.buffer: memoryview = memoryview(self.records.view(np.uint8))
+
+    def append(self, event: EventType, order_id: int = NO_ORDER_ID, price: float = math.nan,
+               amount: float = math.nan, value: float = math.nan, limit: float = math.nan) -> None:
+        if self.count == self.capacity:
+            self._grow()
+        EVENT_STRUCT.pack_into(self.buffer, self.count * EVENT_STRUCT.size, event, self.bar_index, order_id, price,
+                               amount, value, limit)
+        self.count += 1
+        level: int = EVENT_MESSAGES[event][0]
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, format_event(record=(event, self.bar_index, order_id, price, amount, value, limit)))
+
+    def set_bar_index(self, bar_index: int) -> None:
+        self.bar_index = bar_index
+
+    def get_records(self) -> np.ndarray:
+        return np.array(self.records[:self.count])
+
+    # Trims the journal file to the records written. The records stay readable through get_records.
+    def close(self) -> None:
+        if self.path is None or not isinstance(self.records, np.memmap):
+            return
+        records: np.ndarray = self.get_records()
+        self._release()
+        self.records = records
+        with open(self.path, 'r+b') as file:
+            file.truncate(HEADER_SIZE + self.count * EVENT_DTYPE.itemsize)
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        if self.path is not None:
+            self._release()
+            self.records = self._map(capacity=self.capacity)
+        else:
+            records: np.ndarray = np.zeros(self.capacity, dtype=EVENT_DTYPE)
+            records[:self.count] = self.records[:self.count]
+            self.records = records
+        self.buffer = memoryview(self.records.view(np.uint8))
+
+    # The file is extended to the capacity, its unwritten records are zero.
+    def _map(self, capacity: int) -> np.memmap:
+        if os.path.getsize(self.path) < HEADER_SIZE + capacity * EVENT_DTYPE.itemsize:
+            with open(self.path, 'r+b') as file:
+                file.truncate(HEADER_SIZE + capacity * EVENT_DTYPE.itemsize)
+        return np.memmap(self.path, dtype=EVENT_DTYPE, mode='r+', offset=HEADER_SIZE, shape=(capacity,))
+
+    # The mapping is unmapped once the records are replaced and nothing refers to it any more.
+    def _release(self) -> None:
+        self.records.flush()
+        self.buffer.release()
@@ -0,0 +1,29 @@
+import logging
+import math
+
+import numpy as np
+
+from common.journal.event import EventType, NO_ORDER_ID, EVENT_MESSAGES, EVENT_DTYPE, format_event
+from common.journal.event_journal import EventJournal
+
+
+# Keeps no records, only logs the events whose level is enabled. Messages are formatted only then.
+class LoggingEventJournal(EventJournal):
+    def __init__(self):
+        self.bar_index: int = 0
+        self.logger: logging.Logger = logging.getLogger()
+
+    def append(self, event: EventType, order_id: int = NO_ORDER_ID, price: float = math.nan,
+               amount: float = math.nan, value: float = math.nan, limit: float = math.nan) -> None:
+        level: int = EVENT_MESSAGES[event][0]
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, format_event(record=(event, self.bar_index, order_id, price, amount, value, limit)))
+
+    def set_bar_index(self, bar_index: int) -> None:
+        self.bar_index = bar_index
+
+    def get_records(self) -> np.ndarray:
+        return np.empty(0, dtype=EVENT_DTYPE)
+
+    def close(self) -> None:
+        pass
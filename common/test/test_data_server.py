@@ -0,0 +1,39 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from common.http.api import get_session
+from common.http.data_server import DataServer
+from data.service.impl.general_market_data_service import GeneralMarketDataService
+from data.store.synthetic_bar_data import generate_bar_data, generate_symbol
+
+
+class TestDataServer(unittest.TestCase):
+    def setUp(self):
+        self.server = DataServer(port=0, seed=7).start()
+        self.service = GeneralMarketDataService(token='token', cache_repository=None, base_url=self.server.url)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_serves_seeded_symbol_and_bar_data(self):
+        start, end = datetime(2024, 3, 1), datetime(2024, 3, 4, 6)
+        store = self.service.get_bar_data('symbol1', '15m', start, end)
+        expected = generate_bar_data('symbol1', '15m', start, end, seed=7)
+
+        self.assertEqual(self.service.get_symbol('symbol1'), generate_symbol('symbol1', seed=7))
+        self.assertEqual(set(store.columns), {'datetime', 'open', 'high', 'low', 'close', 'volume', 'percent_change',
+                                              'bid', 'ask'})
+        for name, column in expected.columns.items():
+            np.testing.assert_array_equal(store.columns[name], column)
+
+    def test_serves_json_and_rejects_bad_requests(self):
+        payload = {'symbolId': 'symbol1', 'startDate': '2024-03-01T00:00:00', 'endDate': '2024-03-01T00:09:00',
+                   'timeframe': '1m'}
+        response = get_session().get(f'{self.server.url}/api/data/', json=payload)
+        self.assertEqual(len(response.json()['data']['close']), 10)
+        self.assertEqual(response.json()['data']['datetime'][0], '2024-03-01T00:00:00.000000')
+
+        response = get_session().get(f'{self.server.url}/api/data/', json={**payload, 'timeframe': '2m'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,79 @@
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from common.journal.__main__ import main
+from common.journal.event import EventType, HEADER_SIZE, EVENT_DTYPE, read_journal, decode_events
+from common.journal.impl.buffered_event_journal import BufferedEventJournal
+from common.journal.impl.logging_event_journal import LoggingEventJournal
+
+
+class TestBufferedEventJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.wtj')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _append_events(self, journal, count):
+        for index in range(count):
+            journal.set_bar_index(index // 2)
+            journal.append(EventType.ORDER_CREATED, order_id=index, price=100.0 + index, amount=-index, value=1)
+
+    def test_records_grow_past_capacity(self):
+        journal = BufferedEventJournal(capacity=2)
+        self._append_events(journal, 5)
+
+        records = journal.get_records()
+        self.assertEqual(journal.capacity, 8)
+        self.assertEqual(list(records['order_id']), [0, 1, 2, 3, 4])
+        self.assertEqual(list(records['bar_index']), [0, 0, 1, 1, 2])
+        self.assertEqual(list(records['price']), [100.0, 101.0, 102.0, 103.0, 104.0])
+        self.assertTrue(np.isnan(records['limit']).all())
+
+    def test_file_round_trip(self):
+        journal = BufferedEventJournal(capacity=2, path=self.path)
+        self._append_events(journal, 5)
+        journal.append(EventType.INSUFFICIENT_MARGIN, value=120.0, limit=100.0)
+        journal.close()
+
+        self.assertEqual(os.path.getsize(self.path), HEADER_SIZE + 6 * EVENT_DTYPE.itemsize)
+        self.assertEqual(read_journal(self.path).tobytes(), journal.get_records().tobytes())
+        self.assertEqual(decode_events(read_journal(self.path))[-2:],
+                         ['bar 2: Order 4 created: SELL 4 STP at 104',
+                          'bar 2: Required margin 120 is larger than available margin 100'])
+
+    def test_unfinished_file_is_readable(self):
+        journal = BufferedEventJournal(capacity=16, path=self.path)
+        self._append_events(journal, 3)
+        journal.records.flush()
+
+        self.assertEqual(os.path.getsize(self.path), HEADER_SIZE + 16 * EVENT_DTYPE.itemsize)
+        self.assertEqual(list(read_journal(self.path)['order_id']), [0, 1, 2])
+
+    def test_decoder_prints_selected_events(self):
+        journal = BufferedEventJournal(capacity=4, path=self.path)
+        self._append_events(journal, 2)
+        journal.append(EventType.ORDER_MATCHED, order_id=1, price=101.0)
+        journal.close()
+
+        with patch('builtins.print') as print_line:
+            main([self.path, '--events', 'ORDER_MATCHED'])
+        print_line.assert_called_once_with('bar 0: Order 1 matched at 101')
+
+    def test_events_are_logged_only_when_enabled(self):
+        journal = LoggingEventJournal()
+        with self.assertLogs(level=logging.ERROR) as logs:
+            journal.append(EventType.ORDER_MATCHED, order_id=1, price=101.0)
+            journal.append(EventType.INVALID_AMOUNT, amount=0)
+        self.assertEqual(logs.output, ['ERROR:root:bar 0: Amount 0 is not valid'])
+        self.assertEqual(len(journal.get_records()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
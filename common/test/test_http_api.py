@@ -0,0 +1,104 @@
+import json
+import threading
+import unittest
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+from common.http.api import get_bar_data, get_symbol, create_session, BAR_DATA_CONTENT_TYPE
+from common.http.dto import SymbolDto
+from common.http.request import GetBarDataRequest, GetSymbolRequest
+from common.http.response import RawResponse
+from data.store.bar_file import encode_bar_store, decode_bar_store
+from data.store.bar_store import BarStore
+
+SYMBOL: dict = {'symbolId': 'symbol1', 'minimumTickSize': 0.01, 'multiplier': 10, 'marginRate': 0.1,
+                'upperLimit': 0.1, 'lowerLimit': -0.1, 'commissionFee': 1.0, 'commissionRate': 0.0001}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, self.headers['Authorization'], body, self.client_address))
+        if self.path == '/api/data/symbol':
+            self._send(200, {'status': 200, 'message': 'ok', 'data': SYMBOL})
+        elif self.path == '/api/data/' and self.server.binary and BAR_DATA_CONTENT_TYPE in self.headers['Accept']:
+            store = BarStore.from_dict({'datetime': [datetime.fromisoformat(body['startDate'])], 'close': [1.5]})
+            self._send_bytes(200, BAR_DATA_CONTENT_TYPE, encode_bar_store(store=store, meta={'status': 200,
+                                                                                           'message': 'ok'}))
+        elif self.path == '/api/data/':
+            self._send(200, {'status': 200, 'message': 'ok', 'data': {'datetime': [body['startDate']],
+                                                                      'close': [1.5]}})
+        else:
+            self._send(404, {'status': 404, 'message': 'not found', 'data': None})
+
+    def _send(self, status: int, payload: dict):
+        self._send_bytes(status, 'application/json', json.dumps(payload).encode('utf-8'))
+
+    def _send_bytes(self, status: int, content_type: str, content: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpApi(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.requests = []
+        self.server.binary = False
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_symbol_parses_response(self):
+        response = get_symbol(token='token', request=GetSymbolRequest(symbol_id='symbol1'), base_url=self.base_url)
+        self.assertEqual(response.data, SymbolDto(**SYMBOL))
+        self.assertEqual(self.server.requests[0][:3], ('/api/data/symbol', 'Bearer token', {'symbolId': 'symbol1'}))
+
+    def test_get_bar_data_serializes_dates_and_reuses_connection(self):
+        request = GetBarDataRequest(symbol_id='symbol1', start_date=datetime(2024, 1, 1),
+                                    end_date=datetime(2024, 1, 2), timeframe='1m')
+        responses = [get_bar_data(token='token', request=request, base_url=self.base_url) for _ in range(3)]
+
+        self.assertEqual(responses[0].data, {'datetime': ['2024-01-01T00:00:00'], 'close': [1.5]})
+        self.assertEqual(self.server.requests[0][2]['endDate'], '2024-01-02T00:00:00')
+        self.assertEqual(len({client_address for *_, client_address in self.server.requests}), 1)
+
+    def test_get_bar_data_negotiates_binary_columns(self):
+        self.server.binary = True
+        request = GetBarDataRequest(symbol_id='symbol1', start_date=datetime(2024, 1, 1),
+                                    end_date=datetime(2024, 1, 2), timeframe='1m')
+        response = get_bar_data(token='token', request=request, base_url=self.base_url)
+
+        self.assertIsInstance(response, RawResponse)
+        self.assertEqual(response.content_type, BAR_DATA_CONTENT_TYPE)
+        store, meta = decode_bar_store(buffer=response.content)
+        self.assertEqual(meta, {'status': 200, 'message': 'ok'})
+        np.testing.assert_array_equal(store.columns['close'], [1.5])
+        self.assertEqual(store.columns['datetime'][0], np.datetime64('2024-01-01T00:00:00'))
+
+    def test_requests_use_the_given_session(self):
+        session = create_session(pool_size=2)
+        request = GetSymbolRequest(symbol_id='symbol1')
+        responses = [get_symbol(token='token', request=request, base_url=self.base_url, session=session)
+                     for _ in range(3)]
+
+        self.assertEqual(responses[0].data, SymbolDto(**SYMBOL))
+        self.assertEqual(session.get_adapter(self.base_url).poolmanager.connection_pool_kw['maxsize'], 2)
+        self.assertEqual(len({client_address for *_, client_address in self.server.requests}), 1)
+
+    def test_failed_request_raises(self):
+        with self.assertRaises(RuntimeError):
+            get_symbol(token='token', request=GetSymbolRequest(symbol_id='symbol1'), base_url=f'{self.base_url}/x')
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 from data.model import DataHandler, IndicatorParams
 from data.service.data_service import DataService
@@ -10,17 +10,27 @@ class DataApi(InitApi):
     def __init__(self, data_service: DataService):
         self.data_service: DataService = data_service
 
-    def get_current_bar_data(self, name: str, timeframe: str) -> Optional[float | datetime]:
-        return self.data_service.get_current_bar_data(name=name, timeframe=timeframe)
+    def get_current_bar_data(self, name: str, timeframe: str,
+                             symbol_id: Optional[str] = None) -> Optional[float | datetime]:
+        return self.data_service.get_current_bar_data(name=name, timeframe=timeframe, symbol_id=symbol_id)
 
-    def subscribe_bar_data(self, timeframe: str) -> bool:
-        return self.data_service.subscribe_bar_data(timeframe=timeframe)
+    def subscribe_bar_data(self, timeframe: str, symbol_id: Optional[str] = None) -> bool:
+        return self.data_service.subscribe_bar_data(timeframe=timeframe, symbol_id=symbol_id)
 
-    def get_bar_data_handler(self, name: str, timeframe: str, size: int) -> DataHandler:
-        return self.data_service.get_bar_data_handler(name=name, timeframe=timeframe, size=size)
+    def subscribe_many_bar_data(self, timeframes: List[str], symbol_ids: Optional[List[str]] = None) -> bool:
+        return self.data_service.subscribe_many_bar_data(timeframes=timeframes, symbol_ids=symbol_ids)
 
-    def get_indicator_handler(self, name: str, timeframe: str, size: int, params: IndicatorParams) -> DataHandler:
-        return self.data_service.get_indicator_handler(name=name, timeframe=timeframe, size=size, params=params)
+    def get_bar_data_handler(self, name: str, timeframe: str, size: int,
+                             symbol_id: Optional[str] = None) -> DataHandler:
+        return self.data_service.get_bar_data_handler(name=name, timeframe=timeframe, size=size, symbol_id=symbol_id)
+
+    def get_indicator_handler(self, name: str, timeframe: str, size: int, params: IndicatorParams,
+                              symbol_id: Optional[str] = None) -> DataHandler:
+        return self.data_service.get_indicator_handler(name=name, timeframe=timeframe, size=size, params=params,
+                                                       symbol_id=symbol_id)
 
     def update_on_bar(self):
         return self.data_service.update_on_bar()
+
+    def fast_forward(self, bar_count: int):
+        return self.data_service.fast_forward(bar_count=bar_count)
@@ -1,26 +1,40 @@
 from collections import deque
-from datetime import datetime
-from typing import List, Optional
+from typing import Optional
+
+import numpy as np
 
 from data.handler.data_handler_manager import DataHandlerManager
 from data.model import DataHandler, BarDataHandler
 from data.repository.data_repository import DataRepository
+from data.store.timeframe_alignment import TimeframeAlignment
 
 
 class BarDataDataHandlerManager(DataHandlerManager):
-    def __init__(self, name: str, timeframe: str, size: int, data_repository: DataRepository) -> None:
-        bar_data: Optional[List[any]] = data_repository.get_all_data(name=name, timeframe=timeframe)
+    def __init__(self, name: str, timeframe: str, size: int, data_repository: DataRepository,
+                 symbol_id: Optional[str] = None) -> None:
+        bar_data: Optional[np.ndarray] = data_repository.get_all_data(name=name, timeframe=timeframe,
+                                                                      symbol_id=symbol_id)
         if bar_data is None:
             raise Exception(f"No data for {name} in timeframe {timeframe}")
-        self.bar_data: deque[any] = deque(bar_data)
+        self.bar_data: np.ndarray = bar_data
         self.bar_data_vo: deque[any] = deque(maxlen=size)
-        bar_data_datetime: List[datetime] = data_repository.get_all_data(name='datetime', timeframe=timeframe)
-        self.bar_data_datetime: deque[datetime] = deque(bar_data_datetime)
+        alignment: Optional[TimeframeAlignment] = data_repository.get_alignment(timeframe=timeframe,
+                                                                                symbol_id=symbol_id)
+        if alignment is None:
+            raise Exception(f"No alignment for timeframe {timeframe}")
+        self.alignment: TimeframeAlignment = alignment
+        self.cursor: int = 0
+
+    def update(self, bar_index: int) -> None:
+        stop: int = int(self.alignment.bar_index[bar_index]) + 1
+        if stop > self.cursor:
+            self.bar_data_vo.extend(self.bar_data[max(self.cursor, stop - self.bar_data_vo.maxlen):stop])
+            self.cursor = stop
 
-    def update(self, current_datetime: datetime) -> None:
-        if current_datetime >= self.bar_data_datetime[0]:
-            self.bar_data_vo.append(self.bar_data.popleft())
-            self.bar_data_datetime.popleft()
+    def get_next_update_bar_index(self) -> Optional[int]:
+        if self.cursor >= len(self.alignment.first_1m_index):
+            return None
+        return int(self.alignment.first_1m_index[self.cursor])
 
     def get_data_handler(self) -> DataHandler:
         return BarDataHandler(data=self.bar_data_vo)
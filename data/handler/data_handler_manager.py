@@ -1,12 +1,18 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
+from typing import Optional
 
 from data.model import DataHandler
 
 
 class DataHandlerManager(ABC):
+    # Appends every bar that started at or before the 1m bar bar_index and has not been appended yet.
     @abstractmethod
-    def update(self, current_datetime: datetime) -> None:
+    def update(self, bar_index: int) -> None:
+        pass
+
+    # 1m bar from which update() appends the next bar, or None once all bars have been appended.
+    @abstractmethod
+    def get_next_update_bar_index(self) -> Optional[int]:
         pass
 
     @abstractmethod
@@ -1,14 +1,31 @@
+import json
 import logging
 from abc import ABC, abstractmethod
+from dataclasses import asdict
+from typing import Optional
 
 from data.handler.data_handler_manager import DataHandlerManager
 from data.model import IndicatorParams
 from data.repository.data_repository import DataRepository
+from data.repository.indicator_cache_repository import IndicatorCacheRepository
+from data.store.bar_store import BarStore
 
 
 class IndicatorHandlerManager(DataHandlerManager, ABC):
     @abstractmethod
     def __init__(self, timeframe: str, size: int, params: IndicatorParams,
-                 data_repository: DataRepository) -> None:
+                 data_repository: DataRepository,
+                 indicator_cache_repository: Optional[IndicatorCacheRepository] = None,
+                 symbol_id: Optional[str] = None) -> None:
         logging.debug(f"IndicatorHandlerManager.__init__({timeframe}, {size}, {params}, {data_repository})")
         pass
+
+    # Outputs are keyed by the content of the input bars, so they are shared by every run on the same data.
+    @staticmethod
+    def _get_cache_key(name: str, timeframe: str, params: IndicatorParams, data_repository: DataRepository,
+                       symbol_id: Optional[str] = None) -> str:
+        bar_data: Optional[BarStore] = data_repository.get_bar_store(timeframe=timeframe, symbol_id=symbol_id)
+        if bar_data is None:
+            raise Exception(f"No data in timeframe {timeframe}")
+        fingerprint: str = bar_data.get_fingerprint(names=('datetime', 'close'))
+        return f"{fingerprint}/{timeframe}/{name}/{type(params).__name__}/{json.dumps(asdict(params), sort_keys=True)}"
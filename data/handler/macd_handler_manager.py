@@ -1,48 +1,81 @@
 from collections import deque
-from datetime import datetime
-from typing import Tuple, List, Optional
+from typing import Optional
 
-import pandas as pd
+import numpy as np
 
 from data.handler.indicator_handler_manager import IndicatorHandlerManager
+from data.indicator.macd import Macd
 from data.model import DataHandler, IndicatorParams, MacdParams, MacdHandler
 from data.repository.data_repository import DataRepository
+from data.repository.indicator_cache_repository import IndicatorCacheRepository
+from data.store.bar_store import BarStore
+from data.store.timeframe_alignment import TimeframeAlignment
 
 
 class MacdHandlerManager(IndicatorHandlerManager):
     def __init__(self, timeframe: str, size: int, params: IndicatorParams,
-                 data_repository: DataRepository) -> None:
-        super().__init__(timeframe, size, params, data_repository)
+                 data_repository: DataRepository,
+                 indicator_cache_repository: Optional[IndicatorCacheRepository] = None,
+                 symbol_id: Optional[str] = None) -> None:
+        super().__init__(timeframe, size, params, data_repository, indicator_cache_repository, symbol_id)
         if not isinstance(params, MacdParams):
             raise Exception(f"params is not of type MacdParams")
         self.params: MacdParams = params
         self.timeframe: str = timeframe
-        macd, signal = self._get_macd_and_signal(data_repository)
-        self.macd: deque[float] = macd
-        self.signal: deque[float] = signal
+        self.indicator: Macd = self._init_indicator()
+        bar_close: Optional[np.ndarray] = data_repository.get_all_data(name="close", timeframe=self.timeframe,
+                                                                       symbol_id=symbol_id)
+        if bar_close is None:
+            raise Exception(f"No data for close in timeframe {self.timeframe}")
+        self.bar_close: np.ndarray = bar_close
         self.macd_vo: deque[float] = deque(maxlen=size)
         self.signal_vo: deque[float] = deque(maxlen=size)
-        bar_datetime: Optional[List[datetime]] = data_repository.get_all_data(name="datetime", timeframe=self.timeframe)
-        assert bar_datetime is not None
-        self.bar_datetime: deque[datetime] = deque(bar_datetime)
+        alignment: Optional[TimeframeAlignment] = data_repository.get_alignment(timeframe=self.timeframe,
+                                                                                symbol_id=symbol_id)
+        assert alignment is not None
+        self.alignment: TimeframeAlignment = alignment
+        self.cursor: int = 0
+
+        self.outputs: Optional[BarStore] = None
+        if indicator_cache_repository is not None:
+            key: str = self._get_cache_key(name='macd', timeframe=timeframe, params=params,
+                                           data_repository=data_repository, symbol_id=symbol_id)
+            self.outputs = indicator_cache_repository.get(key=key)
+            if self.outputs is None:
+                self.outputs = self._get_outputs()
+                indicator_cache_repository.put(key=key, outputs=self.outputs)
+
+    def update(self, bar_index: int) -> None:
+        stop: int = int(self.alignment.bar_index[bar_index]) + 1
+        if stop <= self.cursor:
+            return
+        if self.outputs is None:
+            for close in self.bar_close[self.cursor:stop].tolist():
+                macd, signal = self.indicator.update(value=close)
+                self.macd_vo.append(macd)
+                self.signal_vo.append(signal)
+        else:
+            start: int = max(self.cursor, stop - self.macd_vo.maxlen)
+            self.macd_vo.extend(self.outputs.columns['macd'][start:stop])
+            self.signal_vo.extend(self.outputs.columns['signal'][start:stop])
+        self.cursor = stop
 
-    def update(self, current_datetime: datetime) -> None:
-        if self.bar_datetime[0] >= current_datetime:
-            self.macd_vo.append(self.macd.popleft())
-            self.signal_vo.append(self.signal.popleft())
-            self.bar_datetime.popleft()
+    def get_next_update_bar_index(self) -> Optional[int]:
+        if self.cursor >= len(self.alignment.first_1m_index):
+            return None
+        return int(self.alignment.first_1m_index[self.cursor])
 
     def get_data_handler(self) -> DataHandler:
         return MacdHandler(macd=self.macd_vo, signal=self.signal_vo)
 
-    def _get_macd_and_signal(self, data_repository: DataRepository) -> Tuple[deque[float], deque[float]]:
-        bar_close: Optional[List[float]] = data_repository.get_all_data(name="close", timeframe=self.timeframe)
-        if bar_close is None:
-            raise Exception(f"No data for close in timeframe {self.timeframe}")
-        df_close = pd.DataFrame(bar_close)
-        df_close.columns = ['close']
-        df_close['fast_ema'] = df_close['close'].ewm(span=self.params.fast_period, adjust=False).mean()
-        df_close['slow_ema'] = df_close['close'].ewm(span=self.params.slow_period, adjust=False).mean()
-        df_close['macd'] = df_close['fast_ema'] - df_close['slow_ema']
-        df_close['signal'] = df_close['macd'].ewm(span=self.params.signal_period, adjust=False).mean()
-        return deque(df_close['macd'].values), deque(df_close['signal'].values)
+    def _init_indicator(self) -> Macd:
+        return Macd(fast_period=self.params.fast_period, slow_period=self.params.slow_period,
+                    signal_period=self.params.signal_period)
+
+    def _get_outputs(self) -> BarStore:
+        indicator: Macd = self._init_indicator()
+        macd: np.ndarray = np.empty(len(self.bar_close))
+        signal: np.ndarray = np.empty(len(self.bar_close))
+        for index, close in enumerate(self.bar_close.tolist()):
+            macd[index], signal[index] = indicator.update(value=close)
+        return BarStore(columns={'macd': macd, 'signal': signal})
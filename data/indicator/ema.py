@@ -0,0 +1,22 @@
+from data.indicator.indicator import Indicator
+
+
+# Follows the recursion of pandas ewm(span=period, adjust=False).mean() step by step, including its weight
+# bookkeeping around missing values, so the results match it bit for bit.
+class Ema(Indicator[float]):
+    def __init__(self, period: int):
+        self.alpha: float = 1.0 / (1.0 + (period - 1) / 2)
+        self.decay: float = 1.0 - self.alpha
+        self.weight: float = 1.0
+        self.value: float = float('nan')
+
+    def update(self, value: float) -> float:
+        if self.value != self.value:
+            self.value = value
+            return self.value
+        self.weight *= self.decay
+        if value == value:
+            if self.value != value:
+                self.value = (self.weight * self.value + self.alpha * value) / (self.weight + self.alpha)
+            self.weight = 1.0
+        return self.value
@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+from typing import Generic, TypeVar
+
+T = TypeVar('T')
+
+
+# Updated with one value at a time, returns the indicator's output after that value.
+class Indicator(ABC, Generic[T]):
+    @abstractmethod
+    def update(self, value: float) -> T:
+        pass
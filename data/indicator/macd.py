@@ -0,0 +1,18 @@
+from typing import Tuple
+
+from data.indicator.ema import Ema
+from data.indicator.indicator import Indicator
+
+
+class Macd(Indicator[Tuple[float, float]]):
+    def __init__(self, fast_period: int, slow_period: int, signal_period: int):
+        self.fast_ema: Ema = Ema(period=fast_period)
+        self.slow_ema: Ema = Ema(period=slow_period)
+        self.signal_ema: Ema = Ema(period=signal_period)
+        self.macd: float = float('nan')
+        self.signal: float = float('nan')
+
+    def update(self, value: float) -> Tuple[float, float]:
+        self.macd = self.fast_ema.update(value=value) - self.slow_ema.update(value=value)
+        self.signal = self.signal_ema.update(value=self.macd)
+        return self.macd, self.signal
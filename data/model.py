@@ -1,6 +1,14 @@
+import os
 from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional, List, Tuple, Dict
+
+from data.store.bar_store import BarStore
+
+DEFAULT_CACHE_DIR: str = os.path.join(os.path.expanduser('~'), '.wind-tester', 'cache')
+DEFAULT_DATA_URL: str = 'http://localhost:8080'
+TIMEFRAME_MINUTES: Dict[str, int] = {'1m': 1, '5m': 5, '15m': 15, '30m': 30, '1h': 60, '4h': 240}
 
 
 @dataclass
@@ -26,6 +34,36 @@ class TestConfig:
     spread: int = 1
     slippage: int = 0
     margin_requirement: float = 0.3
+    # Bar data and symbols are cached under this directory when set, DEFAULT_CACHE_DIR is the usual place.
+    cache_dir: Optional[str] = None
+    # Indicator outputs are computed over the whole series up front and kept in a cache of this many entries,
+    # 0 updates them bar by bar instead.
+    indicator_cache_size: int = 0
+    margin_consistency_check: bool = False
+    fast_forward: bool = True
+    # Symbols traded together in a portfolio test, symbol_id alone is traded when not set.
+    symbol_ids: Optional[List[str]] = None
+    data_url: str = DEFAULT_DATA_URL
+    # Symbols and bar data are fetched with up to this many requests in flight.
+    fetch_concurrency: int = 8
+    # Long bar data ranges are downloaded in pages of about this many bars.
+    page_bars: int = 50000
+    # Times each engine stage and service method and logs a summary at the end of the run.
+    profile: bool = False
+    # Records order events in a journal of journal_capacity events, grown when full, and returns them with the result.
+    # Otherwise events are only logged. With a path the journal is recorded and written to that file, see
+    # common.journal.
+    journal: bool = False
+    journal_path: Optional[str] = None
+    journal_capacity: int = 65536
+    # Keeps orders in a columnar order table instead of one object each. Runs placing millions of orders take far
+    # less memory, order attribute access is slower.
+    order_table: bool = False
+    # Bounds the memory of long runs. Each run replays its bar data from memory-mapped bar files in a directory of
+    # its own under spill_dir, and keeps the balance and equity histories history_chunk_size bars at a time, writing
+    # them there when full. The histories of the result map those files, the directory is left to the caller.
+    spill_dir: Optional[str] = None
+    history_chunk_size: int = 65536
 
 
 @dataclass
@@ -54,3 +92,16 @@ class MacdParams(IndicatorParams):
 class MacdHandler(DataHandler):
     macd: deque[float]
     signal: deque[float]
+
+
+@dataclass
+class CachedBarData:
+    store: BarStore
+    ranges: List[Tuple[datetime, datetime]]
+
+
+@dataclass
+class SharedBarDataHandle:
+    symbols: Dict[str, Symbol]
+    # Shared memory name of the bar data of each symbol id and timeframe.
+    shared_memory_names: Dict[str, Dict[str, str]]
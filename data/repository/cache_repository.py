@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List
+
+from data.model import Symbol, CachedBarData
+
+
+class CacheRepository(ABC):
+    @abstractmethod
+    def load_bar_data(self, symbol_id: str, timeframe: str) -> Optional[CachedBarData]:
+        pass
+
+    @abstractmethod
+    def save_bar_data(self, symbol_id: str, timeframe: str, cached_bar_data: CachedBarData) -> None:
+        pass
+
+    @abstractmethod
+    def load_bar_data_pages(self, symbol_id: str, timeframe: str) -> List[CachedBarData]:
+        pass
+
+    @abstractmethod
+    def save_bar_data_page(self, symbol_id: str, timeframe: str, page: CachedBarData) -> None:
+        pass
+
+    @abstractmethod
+    def delete_bar_data_pages(self, symbol_id: str, timeframe: str) -> None:
+        pass
+
+    @abstractmethod
+    def load_symbol(self, symbol_id: str) -> Optional[Symbol]:
+        pass
+
+    @abstractmethod
+    def save_symbol(self, symbol: Symbol) -> None:
+        pass
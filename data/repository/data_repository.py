@@ -2,7 +2,12 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Optional, List
 
+import numpy as np
+
 from data.model import Symbol, TestConfig
+from data.store.bar_store import BarStore
+from data.store.min_max_tree import MinMaxTree
+from data.store.timeframe_alignment import TimeframeAlignment
 
 
 class DataRepository(ABC):
@@ -15,11 +20,28 @@ class DataRepository(ABC):
         pass
 
     @abstractmethod
-    def get_current_bar_data(self, name: str, timeframe: str) -> Optional[datetime | float]:
+    def get_clock(self) -> Optional[np.ndarray]:
+        pass
+
+    @abstractmethod
+    def get_current_bar_data(self, name: str, timeframe: str,
+                             symbol_id: Optional[str] = None) -> Optional[datetime | float]:
+        pass
+
+    @abstractmethod
+    def has_current_bar(self, symbol_id: Optional[str] = None) -> bool:
+        pass
+
+    @abstractmethod
+    def get_symbol(self, symbol_id: Optional[str] = None) -> Symbol:
+        pass
+
+    @abstractmethod
+    def get_symbol_ids(self) -> List[str]:
         pass
 
     @abstractmethod
-    def get_symbol(self) -> Symbol:
+    def add_symbol(self, symbol: Symbol) -> None:
         pass
 
     @abstractmethod
@@ -27,9 +49,25 @@ class DataRepository(ABC):
         pass
 
     @abstractmethod
-    def get_all_data(self, name: str, timeframe: str) -> Optional[List[float] | List[datetime]]:
+    def get_all_data(self, name: str, timeframe: str, symbol_id: Optional[str] = None) -> Optional[np.ndarray]:
+        pass
+
+    @abstractmethod
+    def get_alignment(self, timeframe: str, symbol_id: Optional[str] = None) -> Optional[TimeframeAlignment]:
+        pass
+
+    @abstractmethod
+    def get_min_max_tree(self, name: str, timeframe: str, symbol_id: Optional[str] = None) -> Optional[MinMaxTree]:
+        pass
+
+    @abstractmethod
+    def get_bar_store(self, timeframe: str, symbol_id: Optional[str] = None) -> Optional[BarStore]:
+        pass
+
+    @abstractmethod
+    def save_data(self, timeframe: str, data: Optional[dict | BarStore], symbol_id: Optional[str] = None) -> None:
         pass
 
     @abstractmethod
-    def save_data(self, timeframe: str, data: dict) -> None:
+    def open_data(self, timeframe: str, path: str, symbol_id: Optional[str] = None) -> None:
         pass
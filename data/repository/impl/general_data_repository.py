@@ -1,19 +1,35 @@
 import logging
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Tuple, List
 
-from data.model import TestConfig, Symbol
+import numpy as np
+
+from data.model import TestConfig, Symbol, TIMEFRAME_MINUTES
 from data.repository.data_repository import DataRepository
+from data.store.bar_file import read_bar_file
+from data.store.bar_store import BarStore, DATETIME_DTYPE
+from data.store.min_max_tree import MinMaxTree
+from data.store.timeframe_alignment import TimeframeAlignment
 
 
+# Bars are kept per symbol. The bar count walks a clock merged from the 1m datetimes of every symbol, and each
+# symbol's bars are aligned to it, so symbols with different sessions can be replayed together. Methods default to
+# the symbol the repository was created with.
 class GeneralDataRepository(DataRepository):
     def __init__(self, symbol: Symbol, test_config: TestConfig):
         self.symbol: Symbol = symbol
+        self.symbol_id: str = symbol.id
+        self.symbols: Dict[str, Symbol] = {symbol.id: symbol}
         self.test_config: TestConfig = test_config
         self.bar_count: int = 0
-        self.data: Dict[str, Dict[str, List[any]]] = {}
-        self.timeframes: Dict[str, int] = {}
-        self._init_timeframes()
+        self.data: Dict[Tuple[str, str], BarStore] = {}
+        self.columns: Dict[Tuple[str, str, str], np.ndarray] = {}
+        self.min_max_trees: Dict[Tuple[str, str, str], MinMaxTree] = {}
+        self.alignments: Dict[Tuple[str, str], TimeframeAlignment] = {}
+        self.clock: Optional[np.ndarray] = None
+        # Symbol whose 1m bars are the clock itself, their index is the bar count.
+        self.clock_symbol_id: Optional[str] = None
+        self.timeframes: Dict[str, int] = dict(TIMEFRAME_MINUTES)
 
     def get_bar_count(self) -> int:
         return self.bar_count
@@ -21,46 +37,126 @@ class GeneralDataRepository(DataRepository):
     def set_bar_count(self, bar_count: int) -> None:
         self.bar_count = bar_count
 
-    def get_all_data(self, name: str, timeframe: str) -> Optional[List[float] | List[datetime]]:
-        if timeframe not in self.timeframes:
-            logging.error(f'Timeframe {timeframe} is not supported')
-            return None
-        if name not in self.data[timeframe]:
-            logging.error(f'No data for {name} in timeframe {timeframe}')
-            return None
-        return self.data[timeframe][name]
+    def get_clock(self) -> Optional[np.ndarray]:
+        return self.clock
 
-    def get_current_bar_data(self, name: str, timeframe: str) -> Optional[datetime | float]:
-        if timeframe not in self.timeframes:
-            logging.error(f'Timeframe {timeframe} is not supported')
-            return None
-        if name not in self.data[timeframe]:
-            logging.error(f'No data for {name} in timeframe {timeframe}')
-            return None
+    def get_all_data(self, name: str, timeframe: str, symbol_id: Optional[str] = None) -> Optional[np.ndarray]:
+        return self._get_column(name=name, timeframe=timeframe, symbol_id=symbol_id or self.symbol_id)
 
-        timeframe_to_int: int = self.timeframes[timeframe]
-        mapped_bar_count: int = self.bar_count // timeframe_to_int
+    def get_current_bar_data(self, name: str, timeframe: str,
+                             symbol_id: Optional[str] = None) -> Optional[datetime | float]:
+        symbol_id = symbol_id or self.symbol_id
+        column: Optional[np.ndarray] = self.columns.get((symbol_id, timeframe, name))
+        if column is None:
+            column = self._get_column(name=name, timeframe=timeframe, symbol_id=symbol_id)
+            if column is None:
+                return None
 
-        if mapped_bar_count >= len(self.data[timeframe][name]):
+        if timeframe == '1m' and symbol_id == self.clock_symbol_id:
+            mapped_bar_count: int = self.bar_count
+        else:
+            alignment: Optional[TimeframeAlignment] = self.get_alignment(timeframe=timeframe, symbol_id=symbol_id)
+            if alignment is None or self.bar_count >= len(alignment.bar_index):
+                logging.error(f'No data for {name} in timeframe {timeframe} at bar {self.bar_count}')
+                return None
+            mapped_bar_count: int = int(alignment.bar_index[self.bar_count])
+
+        if mapped_bar_count < 0 or mapped_bar_count >= len(column):
             logging.error(f'No data for {name} in timeframe {timeframe} at bar {self.bar_count}')
             return None
-        return self.data[timeframe][name][mapped_bar_count]
+        value = column[mapped_bar_count]
+        return value.item() if column.dtype == DATETIME_DTYPE else value
+
+    # Whether the symbol has a 1m bar starting at the current bar count, rather than carrying its last one over.
+    def has_current_bar(self, symbol_id: Optional[str] = None) -> bool:
+        symbol_id = symbol_id or self.symbol_id
+        if symbol_id == self.clock_symbol_id:
+            return self.bar_count < len(self.clock)
+        alignment: Optional[TimeframeAlignment] = self.get_alignment(timeframe='1m', symbol_id=symbol_id)
+        if alignment is None or self.bar_count >= len(alignment.bar_index):
+            return False
+        bar_index: int = int(alignment.bar_index[self.bar_count])
+        return bar_index >= 0 and alignment.first_1m_index[bar_index] == self.bar_count
+
+    # Built on first use and dropped when the clock changes.
+    def get_alignment(self, timeframe: str, symbol_id: Optional[str] = None) -> Optional[TimeframeAlignment]:
+        symbol_id = symbol_id or self.symbol_id
+        alignment: Optional[TimeframeAlignment] = self.alignments.get((symbol_id, timeframe))
+        if alignment is None:
+            bar_datetime: Optional[np.ndarray] = self.columns.get((symbol_id, timeframe, 'datetime'))
+            if self.clock is None or bar_datetime is None:
+                logging.error(f'Cannot align timeframe {timeframe} of {symbol_id} without its datetime and 1m data')
+                return None
+            alignment = TimeframeAlignment(datetime_1m=self.clock, bar_datetime=bar_datetime)
+            self.alignments[(symbol_id, timeframe)] = alignment
+        return alignment
+
+    # Built on first use, columns never change once saved.
+    def get_min_max_tree(self, name: str, timeframe: str, symbol_id: Optional[str] = None) -> Optional[MinMaxTree]:
+        symbol_id = symbol_id or self.symbol_id
+        tree: Optional[MinMaxTree] = self.min_max_trees.get((symbol_id, timeframe, name))
+        if tree is None:
+            column: Optional[np.ndarray] = self._get_column(name=name, timeframe=timeframe, symbol_id=symbol_id)
+            if column is None:
+                return None
+            tree = MinMaxTree(values=column)
+            self.min_max_trees[(symbol_id, timeframe, name)] = tree
+        return tree
+
+    def get_bar_store(self, timeframe: str, symbol_id: Optional[str] = None) -> Optional[BarStore]:
+        return self.data.get((symbol_id or self.symbol_id, timeframe))
 
-    def get_symbol(self) -> Symbol:
-        return self.symbol
+    def get_symbol(self, symbol_id: Optional[str] = None) -> Symbol:
+        return self.symbols.get(symbol_id or self.symbol_id)
+
+    def get_symbol_ids(self) -> List[str]:
+        return list(self.symbols)
+
+    def add_symbol(self, symbol: Symbol) -> None:
+        self.symbols.setdefault(symbol.id, symbol)
 
     def get_test_config(self) -> TestConfig:
         return self.test_config
 
-    def save_data(self, timeframe: str, data: dict) -> None:
-        if timeframe in self.data:
-            logging.error(f'Data for timeframe {timeframe} already exists')
+    def save_data(self, timeframe: str, data: Optional[dict | BarStore], symbol_id: Optional[str] = None) -> None:
+        if data is None:
+            return
+        symbol_id = symbol_id or self.symbol_id
+        if symbol_id not in self.symbols:
+            logging.error(f'Symbol {symbol_id} is not added')
+            return
+        if timeframe not in self.timeframes:
+            logging.error(f'Timeframe {timeframe} is not supported')
+            return
+        if (symbol_id, timeframe) in self.data:
+            logging.error(f'Data for timeframe {timeframe} of {symbol_id} already exists')
             return
-        self.data[timeframe] = data
-
-    def _init_timeframes(self) -> None:
-        self.timeframes['1m'] = 1
-        self.timeframes['15m'] = 15
-        self.timeframes['30m'] = 30
-        self.timeframes['1h'] = 60
-        self.timeframes['4h'] = 240
+        store: BarStore = data if isinstance(data, BarStore) else BarStore.from_dict(data=data)
+        self.data[(symbol_id, timeframe)] = store
+        for name, column in store.columns.items():
+            self.columns[(symbol_id, timeframe, name)] = column
+        if timeframe == '1m' and 'datetime' in store:
+            self._merge_clock(symbol_id=symbol_id, datetime_1m=store.columns['datetime'])
+
+    def open_data(self, timeframe: str, path: str, symbol_id: Optional[str] = None) -> None:
+        store, _ = read_bar_file(path=path, memory_map=True)
+        self.save_data(timeframe=timeframe, data=store, symbol_id=symbol_id)
+
+    def _merge_clock(self, symbol_id: str, datetime_1m: np.ndarray) -> None:
+        if self.clock is None:
+            self.clock = datetime_1m
+            self.clock_symbol_id = symbol_id
+        else:
+            self.clock = np.union1d(self.clock, datetime_1m)
+            self.clock_symbol_id = None
+        self.alignments.clear()
+
+    def _get_column(self, name: str, timeframe: str, symbol_id: str) -> Optional[np.ndarray]:
+        if timeframe not in self.timeframes:
+            logging.error(f'Timeframe {timeframe} is not supported')
+            return None
+        column: Optional[np.ndarray] = self.columns.get((symbol_id, timeframe, name))
+        if column is None:
+            logging.error(f'No data for {name} in timeframe {timeframe} of {symbol_id}')
+            return None
+        return column
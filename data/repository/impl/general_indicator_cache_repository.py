@@ -0,0 +1,53 @@
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from data.repository.indicator_cache_repository import IndicatorCacheRepository
+from data.store.bar_file import read_bar_file, write_bar_file
+from data.store.bar_store import BarStore
+
+
+# Indicator outputs in a bounded in-memory LRU, backed by bar files under cache_dir/indicators when a cache
+# directory is given.
+class GeneralIndicatorCacheRepository(IndicatorCacheRepository):
+    def __init__(self, capacity: int, cache_dir: Optional[str]):
+        self.capacity: int = capacity
+        self.cache_dir: Optional[str] = cache_dir
+        self.outputs: OrderedDict[str, BarStore] = OrderedDict()
+
+    def get(self, key: str) -> Optional[BarStore]:
+        outputs: Optional[BarStore] = self.outputs.get(key)
+        if outputs is not None:
+            self.outputs.move_to_end(key)
+            return outputs
+        path: Optional[str] = self._get_path(key=key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            outputs, _ = read_bar_file(path=path, memory_map=True)
+        except (OSError, ValueError):
+            logging.error(f'Failed to read cached indicator {key}')
+            return None
+        self._remember(key=key, outputs=outputs)
+        return outputs
+
+    def put(self, key: str, outputs: BarStore) -> None:
+        self._remember(key=key, outputs=outputs)
+        path: Optional[str] = self._get_path(key=key)
+        if path is not None:
+            write_bar_file(path=path, store=outputs, meta={'key': key})
+
+    def _remember(self, key: str, outputs: BarStore) -> None:
+        self.outputs[key] = outputs
+        self.outputs.move_to_end(key)
+        while len(self.outputs) > self.capacity:
+            self.outputs.popitem(last=False)
+
+    def _get_path(self, key: str) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        file_name: str = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, 'indicators', f'{file_name}.wtb')
+
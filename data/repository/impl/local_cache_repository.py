@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+
+from data.model import Symbol, CachedBarData
+from data.repository.cache_repository import CacheRepository
+from data.store.bar_file import read_bar_file, write_bar_file
+from data.store.bar_store import BarStore
+
+
+# Keeps one bar file per symbol and timeframe under cache_dir/<symbol_id>/, together with the date ranges
+# it covers, and the symbol metadata next to it. Bar files are memory-mapped when loaded. Pages of a download in
+# progress are kept as part files under cache_dir/<symbol_id>/<timeframe>.parts/ until the download completes.
+class LocalCacheRepository(CacheRepository):
+    def __init__(self, cache_dir: str):
+        self.cache_dir: str = cache_dir
+
+    def load_bar_data(self, symbol_id: str, timeframe: str) -> Optional[CachedBarData]:
+        path: str = self._get_bar_data_path(symbol_id=symbol_id, timeframe=timeframe)
+        if not os.path.exists(path):
+            return None
+        try:
+            store, meta = read_bar_file(path=path, memory_map=True)
+        except (OSError, ValueError):
+            logging.error(f'Failed to read cached {timeframe} bar data for {symbol_id}')
+            return None
+        ranges: List[Tuple[datetime, datetime]] = [(datetime.fromisoformat(start), datetime.fromisoformat(end))
+                                                   for start, end in meta.get('ranges', [])]
+        return CachedBarData(store=store, ranges=ranges)
+
+    def save_bar_data(self, symbol_id: str, timeframe: str, cached_bar_data: CachedBarData) -> None:
+        meta: Dict = {'symbol_id': symbol_id, 'timeframe': timeframe,
+                      'ranges': [[start.isoformat(), end.isoformat()] for start, end in cached_bar_data.ranges]}
+        store: BarStore = cached_bar_data.store
+        write_bar_file(path=self._get_bar_data_path(symbol_id=symbol_id, timeframe=timeframe), store=store,
+                       meta=meta)
+
+    def load_bar_data_pages(self, symbol_id: str, timeframe: str) -> List[CachedBarData]:
+        directory: str = self._get_pages_dir(symbol_id=symbol_id, timeframe=timeframe)
+        if not os.path.isdir(directory):
+            return []
+        pages: List[CachedBarData] = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.wtb'):
+                continue
+            try:
+                store, meta = read_bar_file(path=os.path.join(directory, name))
+            except (OSError, ValueError):
+                logging.warning(f'Skipping unreadable {timeframe} bar data page {name} for {symbol_id}')
+                continue
+            pages.append(CachedBarData(store=store, ranges=[(datetime.fromisoformat(start),
+                                                             datetime.fromisoformat(end))
+                                                            for start, end in meta.get('ranges', [])]))
+        return pages
+
+    def save_bar_data_page(self, symbol_id: str, timeframe: str, page: CachedBarData) -> None:
+        start, end = page.ranges[0]
+        meta: Dict = {'symbol_id': symbol_id, 'timeframe': timeframe,
+                      'ranges': [[start.isoformat(), end.isoformat()] for start, end in page.ranges]}
+        name: str = f'{start:%Y%m%dT%H%M%S}-{end:%Y%m%dT%H%M%S}.wtb'
+        write_bar_file(path=os.path.join(self._get_pages_dir(symbol_id=symbol_id, timeframe=timeframe), name),
+                       store=page.store, meta=meta)
+
+    def delete_bar_data_pages(self, symbol_id: str, timeframe: str) -> None:
+        shutil.rmtree(self._get_pages_dir(symbol_id=symbol_id, timeframe=timeframe), ignore_errors=True)
+
+    def load_symbol(self, symbol_id: str) -> Optional[Symbol]:
+        path: str = self._get_symbol_path(symbol_id=symbol_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as file:
+            return Symbol(**json.load(file))
+
+    def save_symbol(self, symbol: Symbol) -> None:
+        path: str = self._get_symbol_path(symbol_id=symbol.id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path: str = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(asdict(symbol), file)
+        os.replace(temp_path, path)
+
+    def _get_bar_data_path(self, symbol_id: str, timeframe: str) -> str:
+        return os.path.join(self.cache_dir, symbol_id, f'{timeframe}.wtb')
+
+    def _get_pages_dir(self, symbol_id: str, timeframe: str) -> str:
+        return os.path.join(self.cache_dir, symbol_id, f'{timeframe}.parts')
+
+    def _get_symbol_path(self, symbol_id: str) -> str:
+        return os.path.join(self.cache_dir, symbol_id, 'symbol.json')
@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from data.store.bar_store import BarStore
+
+
+class IndicatorCacheRepository(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[BarStore]:
+        pass
+
+    @abstractmethod
+    def put(self, key: str, outputs: BarStore) -> None:
+        pass
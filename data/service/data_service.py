@@ -1,28 +1,39 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 from data.model import DataHandler, IndicatorParams
 
 
 class DataService(ABC):
     @abstractmethod
-    def get_current_bar_data(self, name: str, timeframe: str) -> Optional[float | datetime]:
+    def get_current_bar_data(self, name: str, timeframe: str,
+                             symbol_id: Optional[str] = None) -> Optional[float | datetime]:
         pass
 
     @abstractmethod
-    def subscribe_bar_data(self, timeframe: str) -> bool:
+    def subscribe_bar_data(self, timeframe: str, symbol_id: Optional[str] = None) -> bool:
         pass
 
+    # Fetches all timeframes of all the symbols concurrently, every symbol of the test when symbol_ids is not given.
     @abstractmethod
-    def get_bar_data_handler(self, name: str, timeframe: str, size: int) -> Optional[DataHandler]:
+    def subscribe_many_bar_data(self, timeframes: List[str], symbol_ids: Optional[List[str]] = None) -> bool:
         pass
 
     @abstractmethod
-    def get_indicator_handler(self, name: str, timeframe: str, size: int,
-                              params: IndicatorParams) -> Optional[DataHandler]:
+    def get_bar_data_handler(self, name: str, timeframe: str, size: int,
+                             symbol_id: Optional[str] = None) -> Optional[DataHandler]:
+        pass
+
+    @abstractmethod
+    def get_indicator_handler(self, name: str, timeframe: str, size: int, params: IndicatorParams,
+                              symbol_id: Optional[str] = None) -> Optional[DataHandler]:
         pass
 
     @abstractmethod
     def update_on_bar(self):
         pass
+
+    @abstractmethod
+    def fast_forward(self, bar_count: int):
+        pass
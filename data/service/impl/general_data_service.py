@@ -1,75 +1,123 @@
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Dict, Type
+from typing import List, Optional, Dict, Type, Tuple, Iterator
 
-from common.http.api import get_bar_data
-from common.http.request import GetBarDataRequest
-from common.http.response import GetBarDataResponse
 from data.handler.bar_data_handler_manager import BarDataDataHandlerManager
 from data.handler.data_handler_manager import DataHandlerManager
 from data.handler.indicator_handler_manager import IndicatorHandlerManager
 from data.handler.macd_handler_manager import MacdHandlerManager
 from data.model import DataHandler, TestConfig, IndicatorParams
 from data.repository.data_repository import DataRepository
+from data.repository.indicator_cache_repository import IndicatorCacheRepository
 from data.service.data_service import DataService
+from data.service.market_data_service import MarketDataService
+from data.store.bar_store import BarStore
 
 
 class GeneralDataService(DataService):
 
-    def __init__(self, data_repository: DataRepository):
+    def __init__(self, data_repository: DataRepository, market_data_service: MarketDataService,
+                 indicator_cache_repository: Optional[IndicatorCacheRepository] = None):
         self.data_repository: DataRepository = data_repository
+        self.market_data_service: MarketDataService = market_data_service
+        self.indicator_cache_repository: Optional[IndicatorCacheRepository] = indicator_cache_repository
         self.data_handler_managers: List[DataHandlerManager] = []
+        self.update_schedule: List[Tuple[int, int, DataHandlerManager]] = []
+        self.update_sequence: Iterator[int] = itertools.count()
         self.indicator_manager_constructors: Dict[str, Type[IndicatorHandlerManager]] = {}
+        self._init_indicator_manager()
 
-    def get_current_bar_data(self, name: str, timeframe: str) -> Optional[float | datetime]:
-        return self.data_repository.get_all_data(name=name, timeframe=timeframe)
+    def get_current_bar_data(self, name: str, timeframe: str,
+                             symbol_id: Optional[str] = None) -> Optional[float | datetime]:
+        return self.data_repository.get_all_data(name=name, timeframe=timeframe, symbol_id=symbol_id)
 
-    def subscribe_bar_data(self, timeframe: str) -> bool:
+    def subscribe_bar_data(self, timeframe: str, symbol_id: Optional[str] = None) -> bool:
         config: TestConfig = self.data_repository.get_test_config()
-        token: str = config.token
-        start_date: datetime = config.start_date
-        end_date: datetime = config.end_date
-        symbol_id: str = config.symbol_id
-        request: GetBarDataRequest = GetBarDataRequest(symbol_id=symbol_id, start_date=start_date, end_date=end_date,
-                                                       timeframe=timeframe)
         try:
-            response: GetBarDataResponse = get_bar_data(token=token, request=request)
-            self.data_repository.save_data(timeframe=timeframe, data=response.data)
+            bar_data: BarStore = self._fetch_bar_data(symbol_id=symbol_id or config.symbol_id, timeframe=timeframe)
+            self.data_repository.save_data(timeframe=timeframe, data=bar_data, symbol_id=symbol_id)
             return True
         except (Exception,):
             return False
 
-    def get_bar_data_handler(self, name: str, timeframe: str, size: int) -> Optional[DataHandler]:
+    def subscribe_many_bar_data(self, timeframes: List[str], symbol_ids: Optional[List[str]] = None) -> bool:
+        config: TestConfig = self.data_repository.get_test_config()
+        keys: List[Tuple[str, str]] = [(symbol_id, timeframe)
+                                       for symbol_id in symbol_ids or self.data_repository.get_symbol_ids()
+                                       for timeframe in timeframes]
+        try:
+            with ThreadPoolExecutor(max_workers=config.fetch_concurrency) as executor:
+                bar_data: List[BarStore] = list(executor.map(
+                    lambda key: self._fetch_bar_data(symbol_id=key[0], timeframe=key[1]), keys))
+            for (symbol_id, timeframe), symbol_bar_data in zip(keys, bar_data):
+                self.data_repository.save_data(timeframe=timeframe, data=symbol_bar_data, symbol_id=symbol_id)
+            return True
+        except (Exception,):
+            return False
+
+    def get_bar_data_handler(self, name: str, timeframe: str, size: int,
+                             symbol_id: Optional[str] = None) -> Optional[DataHandler]:
         try:
             bar_data_handler_manager: BarDataDataHandlerManager = BarDataDataHandlerManager(name=name,
                                                                                             timeframe=timeframe,
                                                                                             size=size,
                                                                                             data_repository=self.
-                                                                                            data_repository)
-            self.data_handler_managers.append(bar_data_handler_manager)
+                                                                                            data_repository,
+                                                                                            symbol_id=symbol_id)
+            self._register_data_handler_manager(data_handler_manager=bar_data_handler_manager)
             return bar_data_handler_manager.get_data_handler()
         except (Exception,):
             return None
 
-    def get_indicator_handler(self, name: str, timeframe: str, size: int, params: IndicatorParams) -> DataHandler:
+    def get_indicator_handler(self, name: str, timeframe: str, size: int, params: IndicatorParams,
+                              symbol_id: Optional[str] = None) -> DataHandler:
         try:
             indicator_manager_constructor: Type[IndicatorHandlerManager] = self.indicator_manager_constructors[name]
             indicator_manager: IndicatorHandlerManager = (
                 indicator_manager_constructor(timeframe=timeframe,
                                               size=size,
                                               params=params,
-                                              data_repository=self.data_repository))
-            self.data_handler_managers.append(indicator_manager)
+                                              data_repository=self.data_repository,
+                                              indicator_cache_repository=self.indicator_cache_repository,
+                                              symbol_id=symbol_id))
+            self._register_data_handler_manager(data_handler_manager=indicator_manager)
             return indicator_manager.get_data_handler()
         except (Exception,):
             raise Exception(f"Indicator manager {name} not found")
 
-    def update_handler(self, current_datetime: datetime) -> None:
-        for data_handler_manager in self.data_handler_managers:
-            data_handler_manager.update(current_datetime=current_datetime)
+    # Managers are kept in a heap by the 1m bar their next bar starts on, so a 1m bar only touches the managers
+    # whose bar has started, and each of them catches up on all of its pending bars at once.
+    def update_handler(self, bar_index: int) -> None:
+        while self.update_schedule and self.update_schedule[0][0] <= bar_index:
+            _, _, data_handler_manager = heapq.heappop(self.update_schedule)
+            data_handler_manager.update(bar_index=bar_index)
+            self._schedule_data_handler_manager(data_handler_manager=data_handler_manager)
 
     def update_on_bar(self):
-        self.update_handler(current_datetime=self.data_repository.get_current_bar_data(name="datetime", timeframe="1m"))
+        self.update_handler(bar_index=self.data_repository.get_bar_count())
         self.data_repository.set_bar_count(bar_count=self.data_repository.get_bar_count() + 1)
 
+    # Same as calling update_on_bar until the bar count reaches bar_count, the handlers catch up in one update.
+    def fast_forward(self, bar_count: int):
+        self.data_repository.set_bar_count(bar_count=bar_count - 1)
+        self.update_on_bar()
+
+    def _fetch_bar_data(self, symbol_id: str, timeframe: str) -> BarStore:
+        config: TestConfig = self.data_repository.get_test_config()
+        return self.market_data_service.get_bar_data(symbol_id=symbol_id, timeframe=timeframe,
+                                                     start_date=config.start_date, end_date=config.end_date)
+
+    def _register_data_handler_manager(self, data_handler_manager: DataHandlerManager) -> None:
+        self.data_handler_managers.append(data_handler_manager)
+        self._schedule_data_handler_manager(data_handler_manager=data_handler_manager)
+
+    def _schedule_data_handler_manager(self, data_handler_manager: DataHandlerManager) -> None:
+        next_update_bar_index: Optional[int] = data_handler_manager.get_next_update_bar_index()
+        if next_update_bar_index is not None:
+            heapq.heappush(self.update_schedule,
+                           (next_update_bar_index, next(self.update_sequence), data_handler_manager))
+
     def _init_indicator_manager(self):
         self.indicator_manager_constructors['macd'] = MacdHandlerManager
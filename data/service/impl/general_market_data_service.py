@@ -0,0 +1,165 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Callable
+
+import requests
+
+from common.http.api import get_bar_data, get_symbol, create_session
+from common.http.dto import SymbolDto
+from common.http.request import GetBarDataRequest, GetSymbolRequest
+from common.http.response import GetBarDataResponse, GetSymbolResponse, RawResponse
+from data.model import Symbol, CachedBarData, TestConfig, DEFAULT_DATA_URL, TIMEFRAME_MINUTES
+from data.repository.cache_repository import CacheRepository
+from data.repository.impl.local_cache_repository import LocalCacheRepository
+from data.service.market_data_service import MarketDataService
+from data.store.bar_file import decode_bar_store
+from data.store.bar_store import BarStore, merge_bar_stores
+from data.store.date_range import DateRange, get_missing_ranges, merge_ranges, split_range, get_utc_now
+
+
+# Serves bar data and symbols from the local cache when it is configured, and only asks the data service
+# for the date ranges the cache does not cover yet. Long ranges are downloaded in pages of about page_bars bars,
+# concurrently. Each page is saved to the cache as it arrives, so an interrupted download resumes from the pages
+# it already has.
+class GeneralMarketDataService(MarketDataService):
+    def __init__(self, token: str, cache_repository: Optional[CacheRepository], base_url: str = DEFAULT_DATA_URL,
+                 page_bars: int = 50000, fetch_concurrency: int = 8, clock: Callable[[], datetime] = get_utc_now):
+        self.token: str = token
+        self.cache_repository: Optional[CacheRepository] = cache_repository
+        self.base_url: str = base_url
+        self.page_bars: int = page_bars
+        self.fetch_concurrency: int = fetch_concurrency
+        self.clock: Callable[[], datetime] = clock
+        # Requests of this service share one keep-alive session, with a connection for each concurrent fetch.
+        self.session: requests.Session = create_session(pool_size=fetch_concurrency)
+
+    @classmethod
+    def from_test_config(cls, test_config: TestConfig) -> 'GeneralMarketDataService':
+        cache_repository: Optional[CacheRepository] = None
+        if test_config.cache_dir is not None:
+            cache_repository = LocalCacheRepository(cache_dir=test_config.cache_dir)
+        return cls(token=test_config.token, cache_repository=cache_repository, base_url=test_config.data_url,
+                   page_bars=test_config.page_bars, fetch_concurrency=test_config.fetch_concurrency)
+
+    def get_symbol(self, symbol_id: str) -> Symbol:
+        if self.cache_repository is not None:
+            symbol: Optional[Symbol] = self.cache_repository.load_symbol(symbol_id=symbol_id)
+            if symbol is not None:
+                return symbol
+        symbol: Symbol = self._fetch_symbol(symbol_id=symbol_id)
+        if self.cache_repository is not None:
+            self.cache_repository.save_symbol(symbol=symbol)
+        return symbol
+
+    def get_bar_data(self, symbol_id: str, timeframe: str, start_date: datetime, end_date: datetime) -> BarStore:
+        if self.cache_repository is None:
+            pages: List[CachedBarData] = self._fetch_pages(symbol_id=symbol_id, timeframe=timeframe,
+                                                           missing_ranges=[(start_date, end_date)])
+            return merge_bar_stores(stores=[page.store for page in pages])
+
+        cached_bar_data: Optional[CachedBarData] = self.cache_repository.load_bar_data(symbol_id=symbol_id,
+                                                                                       timeframe=timeframe)
+        if cached_bar_data is None:
+            cached_bar_data = CachedBarData(store=BarStore(columns={}), ranges=[])
+        # Pages left behind by an interrupted download are already covered.
+        saved_pages: List[CachedBarData] = self.cache_repository.load_bar_data_pages(symbol_id=symbol_id,
+                                                                                    timeframe=timeframe)
+        if len(saved_pages) > 0:
+            logging.info(f'Resuming {timeframe} bar data download for {symbol_id} from {len(saved_pages)} pages')
+        cached_bar_data = self._merge(cached_bar_data=cached_bar_data, pages=saved_pages)
+
+        missing_ranges: List[DateRange] = get_missing_ranges(ranges=cached_bar_data.ranges, start_date=start_date,
+                                                             end_date=end_date)
+        if len(missing_ranges) == 0 and len(saved_pages) == 0:
+            logging.info(f'Serving {timeframe} bar data for {symbol_id} from cache')
+        else:
+            pages: List[CachedBarData] = self._fetch_pages(symbol_id=symbol_id, timeframe=timeframe,
+                                                           missing_ranges=missing_ranges)
+            cached_bar_data = self._merge(cached_bar_data=cached_bar_data, pages=pages)
+            self.cache_repository.save_bar_data(symbol_id=symbol_id, timeframe=timeframe,
+                                                cached_bar_data=cached_bar_data)
+            self.cache_repository.delete_bar_data_pages(symbol_id=symbol_id, timeframe=timeframe)
+        return cached_bar_data.store.select(start_date=start_date, end_date=end_date)
+
+    # Pages are returned in date order. When a page fails the error is raised once the other pages are done, and
+    # the pages that completed stay in the cache.
+    def _fetch_pages(self, symbol_id: str, timeframe: str, missing_ranges: List[DateRange]) -> List[CachedBarData]:
+        page_size: timedelta = timedelta(minutes=TIMEFRAME_MINUTES.get(timeframe, 1) * self.page_bars)
+        page_ranges: List[DateRange] = [page_range for missing_start, missing_end in missing_ranges
+                                        for page_range in split_range(start_date=missing_start, end_date=missing_end,
+                                                                      page_size=page_size)]
+        if len(page_ranges) == 0:
+            return []
+        if len(page_ranges) == 1:
+            start_date, end_date = page_ranges[0]
+            return [self._get_page(store=self._fetch_bar_data(symbol_id=symbol_id, timeframe=timeframe,
+                                                              start_date=start_date, end_date=end_date),
+                                   page_range=page_ranges[0])]
+
+        pages: Dict[DateRange, CachedBarData] = {}
+        with ThreadPoolExecutor(max_workers=min(self.fetch_concurrency, len(page_ranges))) as executor:
+            futures: Dict[Future, DateRange] = {executor.submit(self._fetch_page, symbol_id, timeframe, page_range):
+                                                page_range for page_range in page_ranges}
+            for future in as_completed(futures):
+                if future.exception() is None:
+                    pages[futures[future]] = future.result()
+        failed: List[Future] = [future for future in futures if future.exception() is not None]
+        if len(failed) > 0:
+            logging.error(f'Failed to download {len(failed)} of {len(page_ranges)} pages of {timeframe} bar data '
+                          f'for {symbol_id}')
+            raise failed[0].exception()
+        return [pages[page_range] for page_range in page_ranges]
+
+    def _fetch_page(self, symbol_id: str, timeframe: str, page_range: DateRange) -> CachedBarData:
+        start_date, end_date = page_range
+        page: CachedBarData = self._get_page(store=self._fetch_bar_data(symbol_id=symbol_id, timeframe=timeframe,
+                                                                        start_date=start_date, end_date=end_date),
+                                             page_range=page_range)
+        if self.cache_repository is not None and len(page.ranges) > 0:
+            self.cache_repository.save_bar_data_page(symbol_id=symbol_id, timeframe=timeframe, page=page)
+        return page
+
+    # A page covers the range it was asked for, bars or not, so weekends, holidays and the end of the data are not
+    # asked for again. The range is cut at the current time, bars after it are fetched by a later run.
+    def _get_page(self, store: BarStore, page_range: DateRange) -> CachedBarData:
+        start_date, end_date = page_range
+        covered_end: datetime = min(end_date, self.clock())
+        return CachedBarData(store=store, ranges=[(start_date, covered_end)] if covered_end >= start_date else [])
+
+    @staticmethod
+    def _merge(cached_bar_data: CachedBarData, pages: List[CachedBarData]) -> CachedBarData:
+        if len(pages) == 0:
+            return cached_bar_data
+        try:
+            store: BarStore = merge_bar_stores(stores=[cached_bar_data.store] + [page.store for page in pages])
+        except ValueError:
+            logging.warning('Cached bar data has different columns, replacing it')
+            return CachedBarData(store=merge_bar_stores(stores=[page.store for page in pages]),
+                                 ranges=merge_ranges(ranges=[page_range for page in pages
+                                                             for page_range in page.ranges]))
+        return CachedBarData(store=store, ranges=merge_ranges(ranges=cached_bar_data.ranges +
+                                                              [page_range for page in pages
+                                                               for page_range in page.ranges]))
+
+    def _fetch_symbol(self, symbol_id: str) -> Symbol:
+        request: GetSymbolRequest = GetSymbolRequest(symbol_id=symbol_id)
+        logging.info('Fetching symbol')
+        response: GetSymbolResponse = get_symbol(request=request, token=self.token, base_url=self.base_url,
+                                                 session=self.session)
+        symbol_dto: SymbolDto = response.data
+        return Symbol(id=symbol_dto.symbolId, minimum_tick_size=symbol_dto.minimumTickSize,
+                      multiplier=symbol_dto.multiplier, commission_fee=symbol_dto.commissionFee,
+                      commission_rate=symbol_dto.commissionRate, margin_rate=symbol_dto.marginRate,
+                      upper_limit=symbol_dto.upperLimit, lower_limit=symbol_dto.lowerLimit)
+
+    def _fetch_bar_data(self, symbol_id: str, timeframe: str, start_date: datetime, end_date: datetime) -> BarStore:
+        request: GetBarDataRequest = GetBarDataRequest(symbol_id=symbol_id, start_date=start_date, end_date=end_date,
+                                                       timeframe=timeframe)
+        logging.info(f'Fetching {timeframe} bar data from {start_date} to {end_date}')
+        response: GetBarDataResponse | RawResponse = get_bar_data(token=self.token, request=request,
+                                                                  base_url=self.base_url, session=self.session)
+        if isinstance(response, RawResponse):
+            store, _ = decode_bar_store(buffer=response.content)
+            return store
+        return BarStore.from_dict(data=response.data)
@@ -0,0 +1,37 @@
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Tuple
+
+from data.model import Symbol, SharedBarDataHandle
+from data.service.market_data_service import MarketDataService
+from data.store.bar_store import BarStore
+from data.store.shared_bar_store import attach_bar_store
+
+
+# Serves bar data that another process published to shared memory, without copying it.
+class SharedMemoryMarketDataService(MarketDataService):
+    def __init__(self, handle: SharedBarDataHandle):
+        self.symbols: Dict[str, Symbol] = handle.symbols
+        self.bar_data: Dict[Tuple[str, str], BarStore] = {}
+        self.shared_memories: Dict[Tuple[str, str], SharedMemory] = {}
+        for symbol_id, shared_memory_names in handle.shared_memory_names.items():
+            for timeframe, name in shared_memory_names.items():
+                key: Tuple[str, str] = (symbol_id, timeframe)
+                self.bar_data[key], self.shared_memories[key] = attach_bar_store(name=name)
+
+    def get_symbol(self, symbol_id: str) -> Symbol:
+        if symbol_id not in self.symbols:
+            raise RuntimeError(f'Symbol {symbol_id} was not published')
+        return self.symbols[symbol_id]
+
+    def get_bar_data(self, symbol_id: str, timeframe: str, start_date: datetime, end_date: datetime) -> BarStore:
+        bar_data: BarStore = self.bar_data.get((symbol_id, timeframe))
+        if bar_data is None:
+            raise RuntimeError(f'{timeframe} bar data for {symbol_id} was not published')
+        return bar_data.select(start_date=start_date, end_date=end_date)
+
+    def close(self) -> None:
+        self.bar_data.clear()
+        for shared_memory in self.shared_memories.values():
+            shared_memory.close()
+        self.shared_memories.clear()
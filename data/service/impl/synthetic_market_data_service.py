@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Dict, Tuple
+
+from data.model import Symbol
+from data.service.market_data_service import MarketDataService
+from data.store.bar_store import BarStore
+from data.store.synthetic_bar_data import generate_bar_data, generate_symbol
+
+
+# Serves the seeded synthetic data of the local data server in-process, without HTTP or a cache directory.
+# Generated bars are kept, so repeated runs over the same range only pay for generating them once.
+class SyntheticMarketDataService(MarketDataService):
+    def __init__(self, seed: int = 0):
+        self.seed: int = seed
+        self.bar_data: Dict[Tuple[str, str, datetime, datetime], BarStore] = {}
+
+    def get_symbol(self, symbol_id: str) -> Symbol:
+        return generate_symbol(symbol_id=symbol_id, seed=self.seed)
+
+    def get_bar_data(self, symbol_id: str, timeframe: str, start_date: datetime, end_date: datetime) -> BarStore:
+        key: Tuple[str, str, datetime, datetime] = (symbol_id, timeframe, start_date, end_date)
+        store: BarStore = self.bar_data.get(key)
+        if store is None:
+            store = generate_bar_data(symbol_id=symbol_id, timeframe=timeframe, start_date=start_date,
+                                      end_date=end_date, seed=self.seed)
+            self.bar_data[key] = store
+        return store
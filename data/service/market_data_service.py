@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from data.model import Symbol
+from data.store.bar_store import BarStore
+
+
+class MarketDataService(ABC):
+    @abstractmethod
+    def get_symbol(self, symbol_id: str) -> Symbol:
+        pass
+
+    @abstractmethod
+    def get_bar_data(self, symbol_id: str, timeframe: str, start_date: datetime, end_date: datetime) -> BarStore:
+        pass
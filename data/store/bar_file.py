@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+from typing import Dict, Tuple, List
+
+import numpy as np
+
+from data.store.bar_store import BarStore
+
+MAGIC: bytes = b'WTBAR\x00\x01\x00'
+ALIGNMENT: int = 64
+_PREFIX_SIZE: int = len(MAGIC) + 8
+
+
+# Layout: magic, little-endian uint64 header size, JSON header, then each column as raw little-endian
+# values starting on a 64-byte boundary so readers can map them straight into arrays.
+def encode_bar_store(store: BarStore, meta: Dict = None) -> bytes:
+    columns: List[Tuple[str, np.ndarray]] = [(name, _to_little_endian(column)) for name, column in
+                                             store.columns.items()]
+    layout: List[Dict] = []
+    offset: int = 0
+    for name, column in columns:
+        layout.append({'name': name, 'dtype': column.dtype.str, 'offset': offset})
+        offset = _align(offset + column.nbytes)
+    header: bytes = json.dumps({'length': len(store), 'columns': layout, 'meta': meta or {}}).encode('utf-8')
+    data_start: int = _align(_PREFIX_SIZE + len(header))
+
+    buffer: bytearray = bytearray(data_start + offset)
+    buffer[:len(MAGIC)] = MAGIC
+    buffer[len(MAGIC):_PREFIX_SIZE] = len(header).to_bytes(8, 'little')
+    buffer[_PREFIX_SIZE:_PREFIX_SIZE + len(header)] = header
+    for (_, column), column_layout in zip(columns, layout):
+        start: int = data_start + column_layout['offset']
+        buffer[start:start + column.nbytes] = column.tobytes()
+    return bytes(buffer)
+
+
+def decode_bar_store(buffer: bytes | bytearray | memoryview | np.ndarray) -> Tuple[BarStore, Dict]:
+    raw: np.ndarray = buffer if isinstance(buffer, np.ndarray) else np.frombuffer(buffer, dtype=np.uint8)
+    header, data_start = _read_header(buffer=raw)
+    columns: Dict[str, np.ndarray] = {}
+    for column_layout in header['columns']:
+        dtype: np.dtype = np.dtype(column_layout['dtype'])
+        start: int = data_start + column_layout['offset']
+        columns[column_layout['name']] = raw[start:start + dtype.itemsize * header['length']].view(dtype)
+    return BarStore(columns=columns), header['meta']
+
+
+def write_bar_file(path: str, store: BarStore, meta: Dict = None) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path: str = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(encode_bar_store(store=store, meta=meta))
+    os.replace(temp_path, path)
+
+
+# With memory_map the columns are read-only views of the file mapping, so processes opening the same file share
+# its pages through the OS page cache and nothing is read until it is touched.
+def read_bar_file(path: str, memory_map: bool = False) -> Tuple[BarStore, Dict]:
+    if memory_map:
+        return decode_bar_store(buffer=np.memmap(path, dtype=np.uint8, mode='r'))
+    with open(path, 'rb') as file:
+        return decode_bar_store(buffer=file.read())
+
+
+def _read_header(buffer: np.ndarray) -> Tuple[Dict, int]:
+    if buffer[:len(MAGIC)].tobytes() != MAGIC:
+        raise ValueError('Not a bar data file')
+    header_size: int = int.from_bytes(buffer[len(MAGIC):_PREFIX_SIZE].tobytes(), 'little')
+    header: Dict = json.loads(buffer[_PREFIX_SIZE:_PREFIX_SIZE + header_size].tobytes().decode('utf-8'))
+    return header, _align(_PREFIX_SIZE + header_size)
+
+
+def _to_little_endian(column: np.ndarray) -> np.ndarray:
+    column = np.ascontiguousarray(column)
+    if column.dtype.byteorder == '>':
+        return column.astype(column.dtype.newbyteorder('<'))
+    return column
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
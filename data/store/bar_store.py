@@ -0,0 +1,106 @@
+import hashlib
+from datetime import datetime
+from typing import Dict, Optional, List, Iterator, Tuple
+
+import numpy as np
+
+DATETIME_DTYPE: np.dtype = np.dtype('datetime64[us]')
+VALUE_DTYPE: np.dtype = np.dtype('float64')
+
+
+class BarRow:
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store: 'BarStore', index: int):
+        self.store: BarStore = store
+        self.index: int = index
+
+    def __getitem__(self, name: str) -> datetime | float:
+        value = self.store.columns[name][self.index]
+        return value.item() if value.dtype == DATETIME_DTYPE else value
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.store.columns
+
+
+# Bars of one timeframe kept as one contiguous typed array per field.
+# Slices and rows are views into the same buffers, nothing is copied.
+class BarStore:
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        lengths: set = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f'Columns have different lengths: {lengths}')
+        self.columns: Dict[str, np.ndarray] = columns
+        self.length: int = lengths.pop() if lengths else 0
+        self.fingerprints: Dict[Tuple[str, ...], str] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[any]]) -> 'BarStore':
+        return cls(columns={name: _to_column(name=name, values=values) for name, values in data.items()})
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __iter__(self) -> Iterator[BarRow]:
+        return (BarRow(store=self, index=index) for index in range(self.length))
+
+    def get_column(self, name: str) -> Optional[np.ndarray]:
+        return self.columns.get(name)
+
+    # Content hash of the given columns, computed once per store.
+    def get_fingerprint(self, names: Tuple[str, ...]) -> str:
+        fingerprint: Optional[str] = self.fingerprints.get(names)
+        if fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for name in names:
+                column: np.ndarray = np.ascontiguousarray(self.columns[name])
+                digest.update(f'{name}:{column.dtype.str}:{len(column)};'.encode('utf-8'))
+                digest.update(column.view(np.uint8).data)
+            fingerprint = digest.hexdigest()
+            self.fingerprints[names] = fingerprint
+        return fingerprint
+
+    def slice(self, start: int, stop: int) -> 'BarStore':
+        return BarStore(columns={name: column[start:stop] for name, column in self.columns.items()})
+
+    def row(self, index: int) -> BarRow:
+        if index < 0 or index >= self.length:
+            raise IndexError(f'Bar {index} is out of range')
+        return BarRow(store=self, index=index)
+
+    def select(self, start_date: datetime, end_date: datetime) -> 'BarStore':
+        bar_datetime: Optional[np.ndarray] = self.columns.get('datetime')
+        if bar_datetime is None:
+            return self
+        start: int = int(np.searchsorted(bar_datetime, np.datetime64(start_date, 'us'), side='left'))
+        stop: int = int(np.searchsorted(bar_datetime, np.datetime64(end_date, 'us'), side='right'))
+        return self.slice(start=start, stop=stop)
+
+
+# Concatenates stores into one sorted by datetime. Bars sharing a datetime keep the value from the later store.
+def merge_bar_stores(stores: List[BarStore]) -> BarStore:
+    stores = [store for store in stores if store.columns]
+    if len(stores) == 0:
+        return BarStore(columns={})
+    if len(stores) == 1:
+        return stores[0]
+    names: List[str] = list(stores[0].columns)
+    if any(set(store.columns) != set(names) for store in stores):
+        raise ValueError('Cannot merge bar data with different columns')
+
+    bar_datetime: np.ndarray = np.concatenate([store.columns['datetime'] for store in stores])
+    order: np.ndarray = np.argsort(bar_datetime, kind='stable')
+    sorted_datetime: np.ndarray = bar_datetime[order]
+    is_last: np.ndarray = np.append(sorted_datetime[1:] != sorted_datetime[:-1], True)
+    order = order[is_last]
+    return BarStore(columns={name: np.concatenate([store.columns[name] for store in stores])[order]
+                             for name in names})
+
+
+def _to_column(name: str, values: any) -> np.ndarray:
+    if name == 'datetime':
+        return np.ascontiguousarray(values, dtype=DATETIME_DTYPE)
+    return np.ascontiguousarray(values, dtype=VALUE_DTYPE)
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+DateRange = Tuple[datetime, datetime]
+
+
+# Bar datetimes are naive UTC, this is the current time on the same clock.
+def get_utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    merged: List[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+# Parts of [start_date, end_date] not covered by ranges. Missing parts share their boundaries with the
+# covered ranges, so fetching one may return bars that are already cached.
+def get_missing_ranges(ranges: List[DateRange], start_date: datetime, end_date: datetime) -> List[DateRange]:
+    missing: List[DateRange] = []
+    cursor: datetime = start_date
+    is_cursor_covered: bool = False
+    for start, end in merge_ranges(ranges):
+        if end < cursor:
+            continue
+        if start > end_date:
+            break
+        if start > cursor:
+            missing.append((cursor, start))
+        cursor = max(cursor, end)
+        is_cursor_covered = True
+    if cursor < end_date or not is_cursor_covered:
+        missing.append((cursor, end_date))
+    return missing
+
+
+# Splits [start_date, end_date] into consecutive pages of at most page_size. Pages share their boundaries like
+# the missing ranges do.
+def split_range(start_date: datetime, end_date: datetime, page_size: timedelta) -> List[DateRange]:
+    pages: List[DateRange] = []
+    cursor: datetime = start_date
+    while cursor + page_size < end_date:
+        pages.append((cursor, cursor + page_size))
+        cursor += page_size
+    pages.append((cursor, end_date))
+    return pages
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+# Segment trees of the minimum and maximum of a column. They answer "first index at or after start where the value
+# is at most / at least x" in O(log n), walking up from start to the first subtree that can contain a match and
+# then down to its leftmost match.
+class MinMaxTree:
+    def __init__(self, values: np.ndarray):
+        self.length: int = len(values)
+        self.size: int = 1 << max(self.length - 1, 0).bit_length()
+        self.minimum: np.ndarray = self._build(values=values, padding=np.inf, reduce=np.minimum)
+        self.maximum: np.ndarray = self._build(values=values, padding=-np.inf, reduce=np.maximum)
+
+    def find_first_at_most(self, start: int, value: float) -> int:
+        return self._find_first(tree=self.minimum, start=start, matches=lambda node: node <= value)
+
+    def find_first_at_least(self, start: int, value: float) -> int:
+        return self._find_first(tree=self.maximum, start=start, matches=lambda node: node >= value)
+
+    # Returns the length of the column when nothing matches.
+    def _find_first(self, tree: np.ndarray, start: int, matches) -> int:
+        if start >= self.length:
+            return self.length
+        node: int = start + self.size
+        while not matches(tree[node]):
+            while node & 1:
+                node >>= 1
+            if node == 0:
+                return self.length
+            node += 1
+        while node < self.size:
+            node <<= 1
+            if not matches(tree[node]):
+                node += 1
+        return node - self.size
+
+    def _build(self, values: np.ndarray, padding: float, reduce: np.ufunc) -> np.ndarray:
+        tree: np.ndarray = np.full(2 * self.size, padding, dtype=np.float64)
+        tree[self.size:self.size + self.length] = values
+        level: int = self.size
+        while level > 1:
+            tree[level // 2:level] = reduce(tree[level:2 * level:2], tree[level + 1:2 * level:2])
+            level //= 2
+        return tree
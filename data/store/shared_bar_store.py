@@ -0,0 +1,22 @@
+from multiprocessing.shared_memory import SharedMemory
+from typing import Tuple
+
+import numpy as np
+
+from data.store.bar_file import encode_bar_store, decode_bar_store
+from data.store.bar_store import BarStore
+
+
+# The owner of the returned block is responsible for closing and unlinking it once every reader is done.
+def publish_bar_store(store: BarStore) -> SharedMemory:
+    payload: bytes = encode_bar_store(store=store)
+    shared_memory: SharedMemory = SharedMemory(create=True, size=max(len(payload), 1))
+    shared_memory.buf[:len(payload)] = payload
+    return shared_memory
+
+
+# The columns of the returned store are views of the block, which has to stay open while they are in use.
+def attach_bar_store(name: str) -> Tuple[BarStore, SharedMemory]:
+    shared_memory: SharedMemory = SharedMemory(name=name)
+    store, _ = decode_bar_store(buffer=np.frombuffer(shared_memory.buf, dtype=np.uint8))
+    return store, shared_memory
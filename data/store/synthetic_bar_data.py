@@ -0,0 +1,95 @@
+import zlib
+from datetime import datetime
+from typing import Dict
+
+import numpy as np
+
+from data.model import Symbol, TIMEFRAME_MINUTES
+from data.store.bar_store import BarStore, DATETIME_DTYPE
+
+MINUTES_PER_DAY: int = 1440
+MINUTE_VOLATILITY: float = 0.0005
+TREND_PERIODS: np.ndarray = np.array([20.0, 90.0, 365.0])
+TREND_AMPLITUDES: np.ndarray = np.array([0.03, 0.06, 0.15])
+MULTIPLIERS: np.ndarray = np.array([1, 5, 10, 100])
+
+
+def generate_symbol(symbol_id: str, seed: int = 0) -> Symbol:
+    rng: np.random.Generator = np.random.default_rng([seed, _get_symbol_key(symbol_id=symbol_id)])
+    return Symbol(id=symbol_id, minimum_tick_size=0.01, multiplier=int(rng.choice(MULTIPLIERS)),
+                  commission_fee=1.0, commission_rate=0.0001, margin_rate=0.1, upper_limit=0.1, lower_limit=-0.1)
+
+
+# Seeded OHLCV bars of a symbol with percent_change, bid and ask, 24 hours a day on weekdays. Each day is drawn
+# from its own generator keyed by seed, symbol and date, so any range returns the same bars as a longer range
+# containing it. Within a day the log price is a Brownian bridge between the values of a slow trend at the day
+# boundaries, so consecutive days join up. Higher timeframes are aggregated from the 1m bars.
+def generate_bar_data(symbol_id: str, timeframe: str, start_date: datetime, end_date: datetime,
+                      seed: int = 0) -> BarStore:
+    if timeframe not in TIMEFRAME_MINUTES:
+        raise ValueError(f'Timeframe {timeframe} is not supported')
+    symbol_key: int = _get_symbol_key(symbol_id=symbol_id)
+    rng: np.random.Generator = np.random.default_rng([seed, symbol_key])
+    log_base: float = np.log(rng.uniform(50.0, 500.0))
+    phases: np.ndarray = rng.uniform(0.0, 2 * np.pi, size=len(TREND_PERIODS))
+
+    first_day: int = int(np.datetime64(start_date, 'D').astype(np.int64))
+    last_day: int = int(np.datetime64(end_date, 'D').astype(np.int64))
+    days: np.ndarray = np.arange(first_day, last_day + 1)
+    days = days[(days + 3) % 7 < 5]
+    if len(days) == 0:
+        return BarStore.from_dict(data={name: [] for name in ('datetime', 'open', 'high', 'low', 'close', 'volume',
+                                                              'percent_change', 'bid', 'ask')})
+
+    def get_trend(day: np.ndarray) -> np.ndarray:
+        return log_base + np.sin(2 * np.pi * day[:, None] / TREND_PERIODS + phases) @ TREND_AMPLITUDES
+
+    noise: np.ndarray = np.empty((len(days), 3, MINUTES_PER_DAY))
+    for index, day in enumerate(days):
+        np.random.default_rng([seed, symbol_key, int(day)]).standard_normal(out=noise[index])
+    walk: np.ndarray = np.cumsum(noise[:, 0] * MINUTE_VOLATILITY, axis=1)
+    walk -= walk[:, -1:] * np.arange(1, MINUTES_PER_DAY + 1) / MINUTES_PER_DAY
+    day_open: np.ndarray = get_trend(day=days)
+    day_close: np.ndarray = get_trend(day=days + 1)
+    log_close: np.ndarray = walk + day_open[:, None] + (day_close - day_open)[:, None] * np.arange(
+        1, MINUTES_PER_DAY + 1) / MINUTES_PER_DAY
+    log_open: np.ndarray = np.concatenate([day_open[:, None], log_close[:, :-1]], axis=1)
+    # The previous trading day closes on the trend at midnight, skipping the weekend.
+    previous_close: np.ndarray = _round_to_tick(np.exp(get_trend(day=days - np.where((days + 3) % 7 == 0, 2, 0))))
+
+    close: np.ndarray = _round_to_tick(np.exp(log_close))
+    open_: np.ndarray = _round_to_tick(np.exp(log_open))
+    wick: np.ndarray = np.abs(noise[:, 1:]) * MINUTE_VOLATILITY / 2
+    high: np.ndarray = np.maximum(_round_to_tick(np.exp(np.maximum(log_open, log_close) + wick[:, 0])),
+                                  np.maximum(open_, close))
+    low: np.ndarray = np.minimum(_round_to_tick(np.exp(np.minimum(log_open, log_close) - wick[:, 1])),
+                                 np.minimum(open_, close))
+    volume: np.ndarray = np.floor(100.0 * np.exp(np.abs(noise[:, 0]) / 2))
+    bar_datetime: np.ndarray = ((days.astype('datetime64[D]').astype(DATETIME_DTYPE)[:, None] +
+                                 np.arange(MINUTES_PER_DAY).astype('timedelta64[m]')))
+    columns: Dict[str, np.ndarray] = {'datetime': bar_datetime, 'open': open_, 'high': high, 'low': low,
+                                      'close': close, 'volume': volume}
+    columns = {name: column.reshape(-1) for name, column in columns.items()}
+
+    minutes: int = TIMEFRAME_MINUTES[timeframe]
+    if minutes > 1:
+        columns = _aggregate(columns=columns, minutes=minutes)
+    columns['percent_change'] = columns['close'] / np.repeat(previous_close, MINUTES_PER_DAY // minutes) - 1
+    columns['bid'] = _round_to_tick(columns['close'] - 0.01)
+    columns['ask'] = _round_to_tick(columns['close'] + 0.01)
+    return BarStore(columns=columns).select(start_date=start_date, end_date=end_date)
+
+
+def _aggregate(columns: Dict[str, np.ndarray], minutes: int) -> Dict[str, np.ndarray]:
+    starts: np.ndarray = np.arange(0, len(columns['close']), minutes)
+    return {'datetime': columns['datetime'][starts], 'open': columns['open'][starts],
+            'high': np.maximum.reduceat(columns['high'], starts), 'low': np.minimum.reduceat(columns['low'], starts),
+            'close': columns['close'][starts + minutes - 1], 'volume': np.add.reduceat(columns['volume'], starts)}
+
+
+def _round_to_tick(price: np.ndarray) -> np.ndarray:
+    return np.round(price * 100.0) / 100.0
+
+
+def _get_symbol_key(symbol_id: str) -> int:
+    return zlib.crc32(symbol_id.encode('utf-8'))
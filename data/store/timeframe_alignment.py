@@ -0,0 +1,11 @@
+import numpy as np
+
+
+# Maps 1m bars to the bars of another timeframe by start time, built once with two vectorized searches. Unlike
+# dividing the 1m bar count by the timeframe length it stays correct when either series has session gaps.
+class TimeframeAlignment:
+    def __init__(self, datetime_1m: np.ndarray, bar_datetime: np.ndarray):
+        # Index of the bar each 1m bar falls in, -1 for 1m bars before the first bar.
+        self.bar_index: np.ndarray = np.searchsorted(bar_datetime, datetime_1m, side='right') - 1
+        # Index of the first 1m bar at or after the start of each bar, the 1m bar count if there is none.
+        self.first_1m_index: np.ndarray = np.searchsorted(datetime_1m, bar_datetime, side='left')
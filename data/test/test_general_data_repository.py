@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+
+from data.model import Symbol, TestConfig
+from data.repository.impl.general_data_repository import GeneralDataRepository
+from data.store.bar_file import write_bar_file
+from data.store.bar_store import BarStore
+
+
+class TestGeneralDataRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = GeneralDataRepository(symbol=Mock(spec=Symbol, id='symbol1'),
+                                                test_config=Mock(spec=TestConfig))
+        start = datetime(2024, 1, 1)
+        self.repository.save_data(timeframe='1m', data={
+            'datetime': [start + timedelta(minutes=i) for i in range(30)],
+            'close': [float(i) for i in range(30)],
+        })
+        self.repository.save_data(timeframe='15m', data={
+            'datetime': [start, start + timedelta(minutes=15)],
+            'close': [100.0, 115.0],
+        })
+
+    def test_save_data_stores_typed_columns(self):
+        close = self.repository.get_all_data(name='close', timeframe='1m')
+        self.assertIsInstance(close, np.ndarray)
+        self.assertEqual(close.dtype, np.float64)
+        self.assertTrue(close.flags['C_CONTIGUOUS'])
+
+    def test_get_current_bar_data(self):
+        self.repository.set_bar_count(16)
+        self.assertEqual(self.repository.get_current_bar_data(name='close', timeframe='1m'), 16.0)
+        self.assertEqual(self.repository.get_current_bar_data(name='close', timeframe='15m'), 115.0)
+        current_time = self.repository.get_current_bar_data(name='datetime', timeframe='1m')
+        self.assertIsInstance(current_time, datetime)
+        self.assertEqual(current_time, datetime(2024, 1, 1, 0, 16))
+
+    def test_every_model_timeframe_is_supported(self):
+        start = datetime(2024, 1, 1)
+        self.repository.save_data(timeframe='5m', data={
+            'datetime': [start + timedelta(minutes=5 * i) for i in range(6)],
+            'close': [float(5 * i) for i in range(6)],
+        })
+        self.repository.set_bar_count(12)
+        self.assertEqual(self.repository.get_current_bar_data(name='close', timeframe='5m'), 10.0)
+
+    def test_get_current_bar_data_out_of_range(self):
+        self.repository.set_bar_count(30)
+        self.assertIsNone(self.repository.get_current_bar_data(name='close', timeframe='1m'))
+
+    def test_get_all_data_missing(self):
+        self.assertIsNone(self.repository.get_all_data(name='open', timeframe='1m'))
+        self.assertIsNone(self.repository.get_all_data(name='close', timeframe='1h'))
+        self.assertIsNone(self.repository.get_all_data(name='close', timeframe='2m'))
+
+    def test_bar_store_slice_and_row_are_views(self):
+        store: BarStore = self.repository.get_bar_store(timeframe='1m')
+        window: BarStore = store.slice(10, 20)
+        self.assertEqual(len(window), 10)
+        self.assertTrue(np.shares_memory(window.columns['close'], store.columns['close']))
+        row = window.row(2)
+        self.assertEqual(row['close'], 12.0)
+        self.assertEqual(row['datetime'], datetime(2024, 1, 1, 0, 12))
+        with self.assertRaises(IndexError):
+            window.row(10)
+
+    def test_open_data_memory_maps_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, '30m.wtb')
+            write_bar_file(path=path, store=BarStore.from_dict({'datetime': [datetime(2024, 1, 1)], 'close': [1.5]}))
+            self.repository.open_data(timeframe='30m', path=path)
+
+            close = self.repository.get_all_data(name='close', timeframe='30m')
+            self.assertIsInstance(close.base, np.memmap)
+            self.assertFalse(close.flags['WRITEABLE'])
+            self.assertEqual(self.repository.get_current_bar_data(name='close', timeframe='30m'), 1.5)
+
+    def test_get_current_bar_data_across_session_gap(self):
+        repository = GeneralDataRepository(symbol=Mock(spec=Symbol, id='symbol1'),
+                                           test_config=Mock(spec=TestConfig))
+        start = datetime(2024, 1, 1)
+        minutes = list(range(20)) + list(range(60, 80))
+        repository.save_data(timeframe='1m', data={'datetime': [start + timedelta(minutes=i) for i in minutes],
+                                                   'close': [float(i) for i in minutes]})
+        repository.save_data(timeframe='15m', data={'datetime': [start + timedelta(minutes=i) for i in (0, 15, 60, 75)],
+                                                    'close': [0.0, 15.0, 60.0, 75.0]})
+
+        repository.set_bar_count(19)
+        self.assertEqual(repository.get_current_bar_data(name='close', timeframe='15m'), 15.0)
+        repository.set_bar_count(20)
+        self.assertEqual(repository.get_current_bar_data(name='close', timeframe='15m'), 60.0)
+        np.testing.assert_array_equal(repository.get_alignment(timeframe='15m').first_1m_index, [0, 15, 20, 35])
+
+    def test_symbols_share_a_merged_clock(self):
+        start = datetime(2024, 1, 1)
+        symbol2 = Mock(spec=Symbol, id='symbol2')
+        self.repository.add_symbol(symbol=symbol2)
+        minutes = [0, 1, 2, 40, 41]
+        self.repository.save_data(timeframe='1m', symbol_id='symbol2',
+                                  data={'datetime': [start + timedelta(minutes=i) for i in minutes],
+                                        'close': [1000.0 + i for i in minutes]})
+
+        self.assertEqual(self.repository.get_symbol_ids(), ['symbol1', 'symbol2'])
+        self.assertIs(self.repository.get_symbol(symbol_id='symbol2'), symbol2)
+        self.assertEqual(len(self.repository.get_clock()), 32)
+        self.repository.set_bar_count(16)
+        self.assertEqual(self.repository.get_current_bar_data(name='close', timeframe='1m'), 16.0)
+        self.assertEqual(self.repository.get_current_bar_data(name='close', timeframe='1m', symbol_id='symbol2'),
+                         1002.0)
+        self.assertTrue(self.repository.has_current_bar())
+        self.assertFalse(self.repository.has_current_bar(symbol_id='symbol2'))
+        # Minute 40 is only traded by symbol2, symbol1 carries its last bar over.
+        self.repository.set_bar_count(30)
+        self.assertEqual(self.repository.get_current_bar_data(name='close', timeframe='1m'), 29.0)
+        self.assertFalse(self.repository.has_current_bar())
+        self.assertTrue(self.repository.has_current_bar(symbol_id='symbol2'))
+        self.assertEqual(self.repository.get_current_bar_data(name='close', timeframe='15m'), 115.0)
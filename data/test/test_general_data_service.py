@@ -0,0 +1,64 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+
+from data.model import Symbol, TestConfig
+from data.repository.impl.general_data_repository import GeneralDataRepository
+from data.service.impl.general_data_service import GeneralDataService
+from data.service.market_data_service import MarketDataService
+
+
+class TestGeneralDataService(unittest.TestCase):
+    def setUp(self):
+        self.start = datetime(2024, 1, 1)
+        self.data_repository = GeneralDataRepository(symbol=Mock(spec=Symbol, id='symbol1'),
+                                                     test_config=Mock(spec=TestConfig))
+        for timeframe, minutes in [('1m', 1), ('15m', 15), ('1h', 60)]:
+            self.data_repository.save_data(timeframe=timeframe, data={
+                'datetime': [self.start + timedelta(minutes=minutes * i) for i in range(480 // minutes)],
+                'close': np.arange(480 // minutes, dtype=float)})
+        self.service = GeneralDataService(data_repository=self.data_repository,
+                                          market_data_service=Mock(spec=MarketDataService))
+
+    def test_update_handler_only_updates_managers_at_their_boundaries(self):
+        handler_15m = self.service.get_bar_data_handler(name='close', timeframe='15m', size=3)
+        handler_1h = self.service.get_bar_data_handler(name='close', timeframe='1h', size=3)
+        manager_15m, manager_1h = self.service.data_handler_managers
+        manager_15m.update = Mock(wraps=manager_15m.update)
+        manager_1h.update = Mock(wraps=manager_1h.update)
+
+        for minute in range(90):
+            self.service.update_handler(bar_index=minute)
+
+        self.assertEqual(manager_15m.update.call_count, 6)
+        self.assertEqual(manager_1h.update.call_count, 2)
+        self.assertEqual(list(handler_15m.data), [3.0, 4.0, 5.0])
+        self.assertEqual(list(handler_1h.data), [0.0, 1.0])
+
+    def test_update_handler_catches_up_skipped_bars(self):
+        handler_15m = self.service.get_bar_data_handler(name='close', timeframe='15m', size=3)
+        self.service.update_handler(bar_index=0)
+        self.service.update_handler(bar_index=100)
+        self.assertEqual(list(handler_15m.data), [4.0, 5.0, 6.0])
+        self.assertEqual(self.service.data_handler_managers[0].cursor, 7)
+
+    def test_fast_forward_matches_bar_by_bar_updates(self):
+        handler = self.service.get_bar_data_handler(name='close', timeframe='15m', size=3)
+        other_repository = GeneralDataRepository(symbol=Mock(spec=Symbol, id='symbol1'),
+                                                 test_config=Mock(spec=TestConfig))
+        for timeframe in ('1m', '15m'):
+            other_repository.save_data(timeframe=timeframe, data=self.data_repository.get_bar_store(timeframe))
+        other_service = GeneralDataService(data_repository=other_repository,
+                                           market_data_service=Mock(spec=MarketDataService))
+        other_handler = other_service.get_bar_data_handler(name='close', timeframe='15m', size=3)
+
+        self.service.update_on_bar()
+        self.service.fast_forward(bar_count=77)
+        for _ in range(77):
+            other_service.update_on_bar()
+
+        self.assertEqual(self.data_repository.get_bar_count(), 77)
+        self.assertEqual(list(handler.data), list(other_handler.data))
+        self.assertEqual(list(handler.data), [3.0, 4.0, 5.0])
@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from data.handler.macd_handler_manager import MacdHandlerManager
+from data.model import MacdParams, Symbol, TestConfig
+from data.repository.impl.general_data_repository import GeneralDataRepository
+from data.repository.impl.general_indicator_cache_repository import GeneralIndicatorCacheRepository
+from data.store.bar_store import BarStore
+
+
+class TestGeneralIndicatorCacheRepository(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.data_repository = GeneralDataRepository(symbol=Mock(spec=Symbol, id='symbol1'),
+                                                     test_config=Mock(spec=TestConfig))
+        start = datetime(2024, 1, 1)
+        self.data_repository.save_data(timeframe='1h', data={
+            'datetime': [start + timedelta(hours=i) for i in range(100)],
+            'close': 100 + np.sin(np.arange(100))})
+        self.data_repository.save_data(timeframe='1m', data={
+            'datetime': [start + timedelta(minutes=i) for i in range(6000)], 'close': np.zeros(6000)})
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_lru_evicts_least_recently_used(self):
+        repository = GeneralIndicatorCacheRepository(capacity=2, cache_dir=None)
+        outputs = BarStore(columns={'value': np.zeros(1)})
+        repository.put('a', outputs)
+        repository.put('b', outputs)
+        repository.get('a')
+        repository.put('c', outputs)
+        self.assertIsNotNone(repository.get('a'))
+        self.assertIsNone(repository.get('b'))
+
+    def test_macd_outputs_are_computed_once(self):
+        repository = GeneralIndicatorCacheRepository(capacity=4, cache_dir=self.cache_dir.name)
+        first = MacdHandlerManager(timeframe='1h', size=5, params=MacdParams(12, 26, 9),
+                                   data_repository=self.data_repository, indicator_cache_repository=repository)
+        with patch.object(MacdHandlerManager, '_get_outputs') as mock_get_outputs:
+            MacdHandlerManager(timeframe='1h', size=5, params=MacdParams(12, 26, 9),
+                               data_repository=self.data_repository, indicator_cache_repository=repository)
+            MacdHandlerManager(timeframe='1h', size=5, params=MacdParams(12, 26, 9),
+                               data_repository=self.data_repository,
+                               indicator_cache_repository=GeneralIndicatorCacheRepository(
+                                   capacity=4, cache_dir=self.cache_dir.name))
+            mock_get_outputs.assert_not_called()
+            MacdHandlerManager(timeframe='1h', size=5, params=MacdParams(6, 26, 9),
+                               data_repository=self.data_repository, indicator_cache_repository=repository)
+            mock_get_outputs.assert_called_once()
+
+        uncached = MacdHandlerManager(timeframe='1h', size=5, params=MacdParams(12, 26, 9),
+                                      data_repository=self.data_repository)
+        for hour in range(20):
+            first.update(bar_index=hour * 60)
+            uncached.update(bar_index=hour * 60)
+        self.assertEqual(list(first.get_data_handler().macd), list(uncached.get_data_handler().macd))
+        self.assertEqual(list(first.get_data_handler().signal), list(uncached.get_data_handler().signal))
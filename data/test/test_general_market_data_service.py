@@ -0,0 +1,161 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from common.http.api import BAR_DATA_CONTENT_TYPE
+from common.http.dto import SymbolDto
+from common.http.response import RawResponse
+from data.repository.impl.local_cache_repository import LocalCacheRepository
+from data.service.impl.general_market_data_service import GeneralMarketDataService
+from data.store.bar_file import encode_bar_store
+from data.store.bar_store import BarStore
+
+
+def _bar_data_response(request):
+    minutes = int((request.end_date - request.start_date).total_seconds() // 60) + 1
+    bar_datetime = [request.start_date + timedelta(minutes=i) for i in range(minutes)]
+    return Mock(data={'datetime': bar_datetime, 'close': [float(dt.minute) for dt in bar_datetime]})
+
+
+class TestGeneralMarketDataService(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_repository = LocalCacheRepository(cache_dir=self.cache_dir.name)
+        self.service = GeneralMarketDataService(token='token', cache_repository=self.cache_repository)
+        self.start = datetime(2024, 1, 1)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    @patch('data.service.impl.general_market_data_service.get_bar_data')
+    def test_get_bar_data_is_served_from_cache(self, mock_get_bar_data):
+        mock_get_bar_data.side_effect = lambda token, request, base_url, session: _bar_data_response(request)
+        end = self.start + timedelta(minutes=59)
+
+        first = self.service.get_bar_data('symbol1', '1m', self.start, end)
+        second = self.service.get_bar_data('symbol1', '1m', self.start + timedelta(minutes=10), end)
+
+        self.assertEqual(mock_get_bar_data.call_count, 1)
+        self.assertEqual(len(first), 60)
+        self.assertEqual(len(second), 50)
+        self.assertEqual(second.columns['datetime'][0], np.datetime64(self.start + timedelta(minutes=10)))
+
+    @patch('data.service.impl.general_market_data_service.get_bar_data')
+    def test_get_bar_data_fetches_only_missing_ranges(self, mock_get_bar_data):
+        mock_get_bar_data.side_effect = lambda token, request, base_url, session: _bar_data_response(request)
+        self.service.get_bar_data('symbol1', '1m', self.start + timedelta(minutes=10),
+                                  self.start + timedelta(minutes=20))
+
+        result = self.service.get_bar_data('symbol1', '1m', self.start, self.start + timedelta(minutes=30))
+
+        requests = [call.kwargs['request'] for call in mock_get_bar_data.call_args_list[1:]]
+        self.assertEqual([(request.start_date, request.end_date) for request in requests],
+                         [(self.start, self.start + timedelta(minutes=10)),
+                          (self.start + timedelta(minutes=20), self.start + timedelta(minutes=30))])
+        self.assertEqual(len(result), 31)
+        self.assertTrue(np.all(np.diff(result.columns['datetime']) == np.timedelta64(1, 'm')))
+
+    @patch('data.service.impl.general_market_data_service.get_bar_data')
+    def test_get_bar_data_decodes_binary_responses(self, mock_get_bar_data):
+        mock_get_bar_data.side_effect = lambda token, request, base_url, session: RawResponse(
+            content_type=BAR_DATA_CONTENT_TYPE,
+            content=encode_bar_store(store=BarStore.from_dict(data=_bar_data_response(request).data)))
+
+        result = self.service.get_bar_data('symbol1', '1m', self.start, self.start + timedelta(minutes=9))
+
+        self.assertEqual(len(result), 10)
+        np.testing.assert_array_equal(result.columns['close'], np.arange(10.0))
+
+    @patch('data.service.impl.general_market_data_service.get_bar_data')
+    def test_get_bar_data_downloads_long_ranges_in_pages(self, mock_get_bar_data):
+        mock_get_bar_data.side_effect = lambda token, request, base_url, session: _bar_data_response(request)
+        service = GeneralMarketDataService(token='token', cache_repository=self.cache_repository, page_bars=20)
+
+        result = service.get_bar_data('symbol1', '1m', self.start, self.start + timedelta(minutes=90))
+
+        requests = sorted((call.kwargs['request'] for call in mock_get_bar_data.call_args_list),
+                          key=lambda request: request.start_date)
+        self.assertEqual([(request.start_date, request.end_date) for request in requests],
+                         [(self.start + timedelta(minutes=start), self.start + timedelta(minutes=end))
+                          for start, end in [(0, 20), (20, 40), (40, 60), (60, 80), (80, 90)]])
+        self.assertEqual(len(result), 91)
+        self.assertTrue(np.all(np.diff(result.columns['datetime']) == np.timedelta64(1, 'm')))
+        self.assertEqual(self.cache_repository.load_bar_data_pages('symbol1', '1m'), [])
+
+    @patch('data.service.impl.general_market_data_service.get_bar_data')
+    def test_get_bar_data_resumes_interrupted_download(self, mock_get_bar_data):
+        def fail_third_page(token, request, base_url, session):
+            if request.start_date == self.start + timedelta(minutes=40):
+                raise RuntimeError('Connection reset')
+            return _bar_data_response(request)
+
+        mock_get_bar_data.side_effect = fail_third_page
+        service = GeneralMarketDataService(token='token', cache_repository=self.cache_repository, page_bars=20)
+        with self.assertRaises(RuntimeError):
+            service.get_bar_data('symbol1', '1m', self.start, self.start + timedelta(minutes=90))
+        self.assertEqual(len(self.cache_repository.load_bar_data_pages('symbol1', '1m')), 4)
+
+        mock_get_bar_data.reset_mock(side_effect=True)
+        mock_get_bar_data.side_effect = lambda token, request, base_url, session: _bar_data_response(request)
+        result = service.get_bar_data('symbol1', '1m', self.start, self.start + timedelta(minutes=90))
+
+        request = mock_get_bar_data.call_args.kwargs['request']
+        mock_get_bar_data.assert_called_once()
+        self.assertEqual((request.start_date, request.end_date),
+                         (self.start + timedelta(minutes=40), self.start + timedelta(minutes=60)))
+        self.assertEqual(len(result), 91)
+        self.assertEqual(self.cache_repository.load_bar_data_pages('symbol1', '1m'), [])
+
+    @patch('data.service.impl.general_market_data_service.get_bar_data')
+    def test_warm_cache_past_the_last_bar_makes_no_request(self, mock_get_bar_data):
+        last_bar = self.start + timedelta(minutes=30)
+
+        def get_available_bar_data(token, request, base_url, session):
+            return _bar_data_response(Mock(start_date=request.start_date, end_date=min(request.end_date, last_bar)))
+
+        mock_get_bar_data.side_effect = get_available_bar_data
+        end = self.start + timedelta(minutes=59)
+        first = self.service.get_bar_data('symbol1', '1m', self.start, end)
+        second = self.service.get_bar_data('symbol1', '1m', self.start + timedelta(minutes=10), end)
+
+        mock_get_bar_data.assert_called_once()
+        self.assertEqual(self.cache_repository.load_bar_data('symbol1', '1m').ranges, [(self.start, end)])
+        self.assertEqual((len(first), len(second)), (31, 21))
+
+    @patch('data.service.impl.general_market_data_service.get_bar_data')
+    def test_get_bar_data_never_covers_past_now(self, mock_get_bar_data):
+        mock_get_bar_data.side_effect = lambda token, request, base_url, session: _bar_data_response(request)
+        now = self.start + timedelta(minutes=5)
+        service = GeneralMarketDataService(token='token', cache_repository=self.cache_repository, clock=lambda: now)
+
+        service.get_bar_data('symbol1', '1m', self.start, self.start + timedelta(minutes=10))
+        service.get_bar_data('symbol1', '1m', self.start, self.start + timedelta(minutes=10))
+
+        self.assertEqual(self.cache_repository.load_bar_data('symbol1', '1m').ranges, [(self.start, now)])
+        request = mock_get_bar_data.call_args.kwargs['request']
+        self.assertEqual((request.start_date, request.end_date), (now, self.start + timedelta(minutes=10)))
+
+    @patch('data.service.impl.general_market_data_service.get_bar_data')
+    def test_requests_share_a_session_sized_to_fetch_concurrency(self, mock_get_bar_data):
+        mock_get_bar_data.side_effect = lambda token, request, base_url, session: _bar_data_response(request)
+        service = GeneralMarketDataService(token='token', cache_repository=None, fetch_concurrency=3)
+
+        service.get_bar_data('symbol1', '1m', self.start, self.start + timedelta(minutes=9))
+
+        self.assertIs(mock_get_bar_data.call_args.kwargs['session'], service.session)
+        adapter = service.session.get_adapter('http://localhost')
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 3)
+
+    @patch('data.service.impl.general_market_data_service.get_symbol')
+    def test_get_symbol_is_cached(self, mock_get_symbol):
+        mock_get_symbol.return_value = Mock(data=SymbolDto(symbolId='symbol1', minimumTickSize=0.01, multiplier=10,
+                                                           marginRate=0.1, upperLimit=0.1, lowerLimit=-0.1,
+                                                           commissionFee=1.0, commissionRate=0.0001))
+        first = self.service.get_symbol('symbol1')
+        second = GeneralMarketDataService(token='token', cache_repository=self.cache_repository).get_symbol('symbol1')
+
+        mock_get_symbol.assert_called_once()
+        self.assertEqual(first, second)
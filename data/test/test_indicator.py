@@ -0,0 +1,55 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from data.handler.macd_handler_manager import MacdHandlerManager
+from data.indicator.ema import Ema
+from data.indicator.macd import Macd
+from data.model import MacdParams, Symbol, TestConfig
+from data.repository.impl.general_data_repository import GeneralDataRepository
+
+
+class TestIndicator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 2000))
+
+    def test_ema_matches_pandas(self):
+        values = self.close.copy()
+        values[[5, 6, 300]] = np.nan
+        values[100:110] = 42.0
+        ema = Ema(period=12)
+        result = [ema.update(value=value) for value in values.tolist()]
+        expected = pd.Series(values).ewm(span=12, adjust=False).mean().to_numpy()
+        np.testing.assert_array_equal(result, expected)
+
+    def test_macd_matches_pandas(self):
+        macd = Macd(fast_period=12, slow_period=26, signal_period=9)
+        result = np.array([macd.update(value=value) for value in self.close.tolist()])
+        close = pd.Series(self.close)
+        expected_macd = (close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean())
+        expected_signal = expected_macd.ewm(span=9, adjust=False).mean()
+        np.testing.assert_array_equal(result[:, 0], expected_macd.to_numpy())
+        np.testing.assert_array_equal(result[:, 1], expected_signal.to_numpy())
+
+    def test_macd_handler_manager_advances_with_bars(self):
+        repository = GeneralDataRepository(symbol=Mock(spec=Symbol, id='symbol1'),
+                                           test_config=Mock(spec=TestConfig))
+        start = datetime(2024, 1, 1)
+        repository.save_data(timeframe='15m', data={'datetime': [start + timedelta(minutes=15 * i) for i in range(50)],
+                                                    'close': self.close[:50]})
+        repository.save_data(timeframe='1m', data={'datetime': [start + timedelta(minutes=i) for i in range(750)],
+                                                   'close': np.zeros(750)})
+        manager = MacdHandlerManager(timeframe='15m', size=3, params=MacdParams(12, 26, 9),
+                                     data_repository=repository)
+        for minute in range(0, 15 * 10, 5):
+            manager.update(bar_index=minute)
+
+        handler = manager.get_data_handler()
+        macd = Macd(fast_period=12, slow_period=26, signal_period=9)
+        expected = [macd.update(value=value) for value in self.close[:10].tolist()][-3:]
+        self.assertEqual(list(handler.macd), [value[0] for value in expected])
+        self.assertEqual(list(handler.signal), [value[1] for value in expected])
@@ -0,0 +1,25 @@
+import unittest
+
+import numpy as np
+
+from data.store.min_max_tree import MinMaxTree
+
+
+class TestMinMaxTree(unittest.TestCase):
+    def test_find_first_matches_linear_scan(self):
+        rng = np.random.default_rng(0)
+        for length in (1, 2, 5, 16, 37):
+            values = rng.normal(size=length).round(1)
+            tree = MinMaxTree(values=values)
+            for start in range(length + 1):
+                for value in (-1.0, 0.0, 0.5):
+                    at_most = np.flatnonzero(values[start:] <= value)
+                    at_least = np.flatnonzero(values[start:] >= value)
+                    self.assertEqual(tree.find_first_at_most(start=start, value=value),
+                                     start + at_most[0] if len(at_most) else length)
+                    self.assertEqual(tree.find_first_at_least(start=start, value=value),
+                                     start + at_least[0] if len(at_least) else length)
+
+    def test_empty(self):
+        tree = MinMaxTree(values=np.empty(0))
+        self.assertEqual(tree.find_first_at_most(start=0, value=1.0), 0)
@@ -0,0 +1,43 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+
+from data.model import Symbol, SharedBarDataHandle
+from data.service.impl.shared_memory_market_data_service import SharedMemoryMarketDataService
+from data.store.bar_store import BarStore
+from data.store.shared_bar_store import publish_bar_store
+
+
+class TestSharedMemoryMarketDataService(unittest.TestCase):
+    def setUp(self):
+        self.start = datetime(2024, 1, 1)
+        store = BarStore.from_dict({'datetime': [self.start + timedelta(minutes=i) for i in range(10)],
+                                    'close': [float(i) for i in range(10)]})
+        self.shared_memory = publish_bar_store(store=store)
+        self.symbol = Mock(spec=Symbol, id='symbol1')
+        self.service = SharedMemoryMarketDataService(
+            handle=SharedBarDataHandle(symbols={'symbol1': self.symbol},
+                                       shared_memory_names={'symbol1': {'1m': self.shared_memory.name}}))
+
+    def tearDown(self):
+        self.service.close()
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+    def test_get_bar_data_reads_published_data(self):
+        result = self.service.get_bar_data('symbol1', '1m', self.start + timedelta(minutes=2),
+                                           self.start + timedelta(minutes=4))
+        np.testing.assert_array_equal(result.columns['close'], [2.0, 3.0, 4.0])
+
+    def test_get_bar_data_unpublished_timeframe(self):
+        with self.assertRaises(RuntimeError):
+            self.service.get_bar_data('symbol1', '15m', self.start, self.start)
+        with self.assertRaises(RuntimeError):
+            self.service.get_bar_data('symbol2', '1m', self.start, self.start)
+
+    def test_get_symbol(self):
+        self.assertIs(self.service.get_symbol('symbol1'), self.symbol)
+        with self.assertRaises(RuntimeError):
+            self.service.get_symbol('symbol2')
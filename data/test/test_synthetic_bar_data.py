@@ -0,0 +1,42 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from data.store.synthetic_bar_data import generate_bar_data, generate_symbol
+
+
+class TestSyntheticBarData(unittest.TestCase):
+    def setUp(self):
+        self.store = generate_bar_data('symbol1', '1m', datetime(2024, 1, 1), datetime(2024, 1, 31))
+
+    def test_bars_are_valid_and_on_weekdays(self):
+        columns = self.store.columns
+        self.assertEqual(len(self.store), 23 * 1440 - 1439)
+        self.assertTrue(np.all(columns['high'] >= np.maximum(columns['open'], columns['close'])))
+        self.assertTrue(np.all(columns['low'] <= np.minimum(columns['open'], columns['close'])))
+        self.assertTrue(np.all(columns['bid'] < columns['ask']))
+        weekday = (columns['datetime'].astype('datetime64[D]').astype(np.int64) + 3) % 7
+        self.assertTrue(np.all(weekday < 5))
+        self.assertLess(np.abs(columns['percent_change']).max(), 0.1)
+
+    def test_ranges_are_reproducible(self):
+        window = generate_bar_data('symbol1', '1m', datetime(2024, 1, 10, 12), datetime(2024, 1, 12))
+        start = int(np.searchsorted(self.store.columns['datetime'], window.columns['datetime'][0]))
+        for name, column in window.columns.items():
+            np.testing.assert_array_equal(column, self.store.columns[name][start:start + len(window)])
+        other = generate_bar_data('symbol2', '1m', datetime(2024, 1, 1), datetime(2024, 1, 31))
+        self.assertFalse(np.array_equal(other.columns['close'], self.store.columns['close']))
+        self.assertEqual(generate_symbol('symbol1'), generate_symbol('symbol1'))
+
+    def test_higher_timeframes_aggregate_1m_bars(self):
+        bars_15m = generate_bar_data('symbol1', '15m', datetime(2024, 1, 1), datetime(2024, 1, 31))
+        columns = self.store.columns
+        np.testing.assert_array_equal(bars_15m.columns['datetime'], columns['datetime'][::15])
+        np.testing.assert_array_equal(bars_15m.columns['open'], columns['open'][::15])
+        np.testing.assert_array_equal(bars_15m.columns['close'][:-1], columns['close'][14::15])
+        np.testing.assert_array_equal(bars_15m.columns['high'][:-1], columns['high'][:-1].reshape(-1, 15).max(axis=1))
+
+    def test_unsupported_timeframe(self):
+        with self.assertRaises(ValueError):
+            generate_bar_data('symbol1', '2m', datetime(2024, 1, 1), datetime(2024, 1, 2))
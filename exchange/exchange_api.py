@@ -1,3 +1,5 @@
+import numpy as np
+
 from broker.service.order_service import OrderService
 from broker.service.risk_service import RiskService
 from exchange.service.clearing_service import ClearingService
@@ -32,3 +34,6 @@ class ExchangeApi:
 
     def update_account_balance_on_bar(self) -> None:
         self.exchange_service.update_account_balance_on_bar()
+
+    def update_account_balance_until(self, stop: int) -> np.ndarray:
+        return self.exchange_service.update_account_balance_until(stop=stop, risk_service=self.risk_service)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 from broker.model import Order
 
@@ -7,3 +8,7 @@ class ClearingService(ABC):
     @abstractmethod
     def clear_order(self, order: Order) -> None:
         pass
+
+    @abstractmethod
+    def clear_orders(self, orders: List[Order]) -> None:
+        pass
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from broker.service.order_service import OrderService
 from broker.service.risk_service import RiskService
 from exchange.service.clearing_service import ClearingService
@@ -22,3 +24,10 @@ class ExchangeService(ABC):
     @abstractmethod
     def update_account_balance_on_bar(self) -> None:
         pass
+
+    # Does what update_account_balance_on_bar and examine_and_force_close_account do on every bar from the current one
+    # up to stop, stopping early before a bar that could force close the account. Returns the balances of the bars it
+    # covered.
+    @abstractmethod
+    def update_account_balance_until(self, stop: int, risk_service: RiskService) -> np.ndarray:
+        pass
@@ -1,5 +1,6 @@
-import logging
-from typing import List, Optional
+from typing import List, Optional, Dict
+
+import numpy as np
 
 from broker.enums import OrderStatus, OrderType, OrderDirection
 from broker.model import Order, Position
@@ -7,8 +8,13 @@ from broker.repository.account_repository import AccountRepository
 from broker.repository.order_repository import OrderRepository
 from broker.service.order_service import OrderService
 from broker.service.risk_service import RiskService
+from common.journal.event import EventType
+from common.journal.event_journal import EventJournal
+from common.journal.impl.logging_event_journal import LoggingEventJournal
 from data.model import Symbol
 from data.repository.data_repository import DataRepository
+from data.store.min_max_tree import MinMaxTree
+from data.store.timeframe_alignment import TimeframeAlignment
 from exchange.service.clearing_service import ClearingService
 from exchange.service.exchange_service import ExchangeService
 from exchange.service.match_service import MatchService
@@ -18,24 +24,33 @@ from exchange.service.match_validation_service import MatchValidationService
 class GeneralExchangeService(ExchangeService):
 
     def __init__(self, data_repository: DataRepository, order_repository: OrderRepository,
-                 account_repository: AccountRepository):
+                 account_repository: AccountRepository, journal: Optional[EventJournal] = None):
         self.data_repository: DataRepository = data_repository
         self.order_repository: OrderRepository = order_repository
         self.account_repository: AccountRepository = account_repository
+        self.journal: EventJournal = journal if journal is not None else LoggingEventJournal()
 
     def match_and_clear_all_orders(self, match_service: MatchService, clearing_service: ClearingService,
                                    risk_service: RiskService, order_service: OrderService,
                                    match_validation_service: MatchValidationService) -> None:
-        pending_orders: List[Order] = self.order_repository.get_order_by_status(status=OrderStatus.PENDING)
-        for order in pending_orders:
-            if not risk_service.validate_account_risk():
+        if self.order_repository.get_order_count_by_status(status=OrderStatus.PENDING) == 0:
+            return
+        if not risk_service.validate_account_risk():
+            self.force_close_account(order_service=order_service, match_service=match_service,
+                                     clearing_service=clearing_service)
+            return
+
+        triggered_orders: List[Order] = match_service.get_triggered_orders()
+        is_valid_orders: List[bool] = match_validation_service.validate_matches(orders=triggered_orders)
+        valid_orders: List[Order] = [order for order, is_valid in zip(triggered_orders, is_valid_orders) if is_valid]
+        # The account is checked again after each fill while later pending orders remain, so fills that breach the
+        # margin limit force close the account on the bar they happen.
+        for order in match_service.iter_matched_orders(orders=valid_orders):
+            clearing_service.clear_order(order=order)
+            if not risk_service.validate_account_risk() and self._has_later_pending_order(order_id=order.id):
                 self.force_close_account(order_service=order_service, match_service=match_service,
                                          clearing_service=clearing_service)
                 return
-            if not match_validation_service.validate_match(order=order):
-                continue
-            match_service.match_order(order=order)
-            clearing_service.clear_order(order=order)
 
     def examine_and_force_close_account(self, risk_service: RiskService, match_service: MatchService,
                                         clearing_service: ClearingService, order_service: OrderService) -> None:
@@ -43,42 +58,80 @@ class GeneralExchangeService(ExchangeService):
             self.force_close_account(order_service=order_service, match_service=match_service,
                                      clearing_service=clearing_service)
 
+    # Only symbols with an open position are marked, a symbol without a bar of its own keeps its last close.
     def update_account_balance_on_bar(self) -> None:
-        bar_close: float = self.data_repository.get_current_bar_data(name="close", timeframe="1m")
-        position: Optional[Position] = self.account_repository.get_position()
-        symbol: Symbol = self.data_repository.get_symbol()
-        if position is None:
+        positions: Dict[str, Position] = self.account_repository.get_positions()
+        if len(positions) == 0:
             return
-        if position.direction == OrderDirection.BUY:
-            unrealized_pnl: float = (bar_close - position.average_price) * position.amount * symbol.multiplier
-        else:
-            unrealized_pnl: float = (position.average_price - bar_close) * position.amount * symbol.multiplier
+        unrealized_pnl: float = 0
+        for symbol_id, position in positions.items():
+            bar_close: float = self.data_repository.get_current_bar_data(name="close", timeframe="1m",
+                                                                         symbol_id=symbol_id)
+            unrealized_pnl += self._get_unrealized_pnl(position=position, bar_close=bar_close)
         self.account_repository.set_balance(balance=unrealized_pnl + self.account_repository.get_equity())
 
+    def update_account_balance_until(self, stop: int, risk_service: RiskService) -> np.ndarray:
+        start: int = self.data_repository.get_bar_count()
+        positions: Dict[str, Position] = self.account_repository.get_positions()
+        # With several positions no single price bounds the span, the exact check below finds its end.
+        if len(positions) == 1:
+            stop = min(stop, self._get_next_liquidation_bar(start=start, position=next(iter(positions.values())),
+                                                            risk_service=risk_service))
+        if stop <= start:
+            return np.empty(0)
+
+        # Bar i is marked to the close of bar i + 1, as update_account_balance_on_bar runs after the bar count moved.
+        if len(positions) == 0:
+            balances: np.ndarray = np.full(stop - start, self.account_repository.get_balance())
+        else:
+            unrealized_pnl: np.ndarray = np.zeros(stop - start)
+            for symbol_id, position in positions.items():
+                alignment: TimeframeAlignment = self.data_repository.get_alignment(timeframe="1m",
+                                                                                   symbol_id=symbol_id)
+                bar_close: np.ndarray = self.data_repository.get_all_data(
+                    name="close", timeframe="1m", symbol_id=symbol_id)[alignment.bar_index[start + 1:stop + 1]]
+                unrealized_pnl += self._get_unrealized_pnl(position=position, bar_close=bar_close)
+            balances: np.ndarray = unrealized_pnl + self.account_repository.get_equity()
+
+        # The lookahead only bounds the span, the exact check decides where it ends.
+        is_valid: np.ndarray = risk_service.validate_account_risk_on_balances(balances=balances)
+        balances = balances[:len(balances) if is_valid.all() else int(np.argmin(is_valid))]
+        if len(positions) > 0 and len(balances) > 0:
+            self.account_repository.set_balance(balance=float(balances[-1]))
+        return balances
+
     def force_close_account(self, order_service: OrderService, match_service: MatchService,
                             clearing_service: ClearingService) -> None:
         self._cancel_all_orders(order_service=order_service)
-        self._force_close_position(order_service=order_service, match_service=match_service,
-                                   clearing_service=clearing_service)
+        self._force_close_positions(order_service=order_service, match_service=match_service,
+                                    clearing_service=clearing_service)
+
+    def _has_later_pending_order(self, order_id: int) -> bool:
+        pending_orders: List[Order] = self.order_repository.get_order_by_status(status=OrderStatus.PENDING)
+        return len(pending_orders) > 0 and pending_orders[-1].id > order_id
 
     def _cancel_all_orders(self, order_service: OrderService) -> None:
         pending_orders: List[Order] = self.order_repository.get_order_by_status(status=OrderStatus.PENDING)
         for order in pending_orders:
             order_service.cancel_order(order_id=order.id)
 
-    def _force_close_position(self, order_service: OrderService, match_service: MatchService,
-                              clearing_service: ClearingService) -> None:
-        position: Optional[Position] = self.account_repository.get_position()
-        if position is None:
-            return
+    def _force_close_positions(self, order_service: OrderService, match_service: MatchService,
+                               clearing_service: ClearingService) -> None:
+        for position in list(self.account_repository.get_positions().values()):
+            self._force_close_position(position=position, order_service=order_service, match_service=match_service,
+                                       clearing_service=clearing_service)
 
+    def _force_close_position(self, position: Position, order_service: OrderService, match_service: MatchService,
+                              clearing_service: ClearingService) -> None:
         direction: OrderDirection = OrderDirection.BUY if position.direction == OrderDirection.SELL \
             else OrderDirection.SELL
 
         if direction == OrderDirection.BUY:
-            price: float = self.data_repository.get_current_bar_data(name="ask", timeframe="1m")
+            price: float = self.data_repository.get_current_bar_data(name="ask", timeframe="1m",
+                                                                     symbol_id=position.symbol_id)
         else:
-            price: float = self.data_repository.get_current_bar_data(name="bid", timeframe="1m")
+            price: float = self.data_repository.get_current_bar_data(name="bid", timeframe="1m",
+                                                                     symbol_id=position.symbol_id)
 
         order: Optional[Order] = order_service.create_order(symbol_id=position.symbol_id, price=price,
                                                             amount=position.amount, direction=direction,
@@ -87,7 +140,37 @@ class GeneralExchangeService(ExchangeService):
         match_service.match_order(order=order)
 
         if order.status != OrderStatus.FILLED:
-            logging.error(f"Force close position failed: {order}")
+            self.journal.append(EventType.FORCE_CLOSE_FAILED, order_id=order.id, price=price,
+                                amount=position.amount if direction == OrderDirection.BUY else -position.amount)
             raise RuntimeError(f"Force close position failed: {order}")
 
         clearing_service.clear_order(order=order)
+
+    # First bar whose closing mark could bring the balance down to the liquidation balance. The price is found on a
+    # range index over the symbol's 1m closes, with a little slack so rounding never makes it skip past the real bar.
+    def _get_next_liquidation_bar(self, start: int, position: Position, risk_service: RiskService) -> int:
+        tree: MinMaxTree = self.data_repository.get_min_max_tree(name="close", timeframe="1m",
+                                                                 symbol_id=position.symbol_id)
+        alignment: TimeframeAlignment = self.data_repository.get_alignment(timeframe="1m",
+                                                                           symbol_id=position.symbol_id)
+        symbol: Symbol = self.data_repository.get_symbol(symbol_id=position.symbol_id)
+        price_move: float = ((risk_service.get_liquidation_balance() - self.account_repository.get_equity()) /
+                             (position.amount * symbol.multiplier))
+        symbol_start: int = int(alignment.bar_index[start + 1])
+        if position.direction == OrderDirection.BUY:
+            liquidation_price: float = position.average_price + price_move
+            slack: float = 1e-9 * max(abs(liquidation_price), 1.0)
+            symbol_bar: int = tree.find_first_at_most(start=symbol_start, value=liquidation_price + slack)
+        else:
+            liquidation_price: float = position.average_price - price_move
+            slack: float = 1e-9 * max(abs(liquidation_price), 1.0)
+            symbol_bar: int = tree.find_first_at_least(start=symbol_start, value=liquidation_price - slack)
+        if symbol_bar >= len(alignment.first_1m_index):
+            return len(alignment.bar_index) - 1
+        return max(int(alignment.first_1m_index[symbol_bar]), start + 1) - 1
+
+    def _get_unrealized_pnl(self, position: Position, bar_close: float | np.ndarray) -> float | np.ndarray:
+        symbol: Symbol = self.data_repository.get_symbol(symbol_id=position.symbol_id)
+        if position.direction == OrderDirection.BUY:
+            return (bar_close - position.average_price) * position.amount * symbol.multiplier
+        return (position.average_price - bar_close) * position.amount * symbol.multiplier
@@ -1,9 +1,14 @@
-import logging
-from typing import Optional, Tuple
+from datetime import datetime
+from typing import Optional, Tuple, List, Dict, Iterator
+
+import numpy as np
 
 from broker.enums import OrderDirection, OrderType, OrderStatus
 from broker.model import Order
 from broker.repository.order_repository import OrderRepository
+from common.journal.event import EventType
+from common.journal.event_journal import EventJournal
+from common.journal.impl.logging_event_journal import LoggingEventJournal
 from data.model import TestConfig, Symbol
 from data.repository.data_repository import DataRepository
 from exchange.dto import Ohlc
@@ -11,9 +16,11 @@ from exchange.service.match_service import MatchService
 
 
 class GeneralMatchService(MatchService):
-    def __init__(self, data_repository: DataRepository, order_repository: OrderRepository):
+    def __init__(self, data_repository: DataRepository, order_repository: OrderRepository,
+                 journal: Optional[EventJournal] = None):
         self.data_repository: DataRepository = data_repository
         self.order_repository: OrderRepository = order_repository
+        self.journal: EventJournal = journal if journal is not None else LoggingEventJournal()
 
     def match_order(self, order: Order) -> bool:
         if order.direction == OrderDirection.BUY and order.type == OrderType.LMT:
@@ -25,10 +32,80 @@ class GeneralMatchService(MatchService):
         elif order.direction == OrderDirection.SELL and order.type == OrderType.STP:
             return self._match_stp_sell_order(order=order)
 
+    def match_orders(self, orders: List[Order]) -> List[Order]:
+        return list(self.iter_matched_orders(orders=orders))
+
+    # Orders may be for different symbols, each is matched against its own symbol's bar. Match prices are computed
+    # for all the orders up front.
+    def iter_matched_orders(self, orders: List[Order]) -> Iterator[Order]:
+        if len(orders) == 0:
+            return
+        bars: Dict[str, Tuple[float, float, float, float, float]] = {}
+        matched_at: Dict[str, datetime] = {}
+        for order in orders:
+            if order.symbol_id not in bars:
+                bar_open, bar_high, bar_low, _ = self._get_ohlc(symbol_id=order.symbol_id)
+                bars[order.symbol_id] = (bar_open, bar_high, bar_low,
+                                         *self._get_slippage_and_spread(symbol_id=order.symbol_id))
+                matched_at[order.symbol_id] = self.data_repository.get_current_bar_data(
+                    name="datetime", timeframe="1m", symbol_id=order.symbol_id)
+        bar_open, bar_high, bar_low, slippage, spread = np.array([bars[order.symbol_id] for order in orders],
+                                                                 dtype=np.float64).T
+
+        price: np.ndarray = np.array([order.price for order in orders], dtype=np.float64)
+        is_buy: np.ndarray = np.array([order.direction == OrderDirection.BUY for order in orders])
+        is_lmt: np.ndarray = np.array([order.type == OrderType.LMT for order in orders])
+        side: np.ndarray = np.where(is_buy, 1.0, -1.0)
+        side_low: np.ndarray = bar_low + side * spread
+        side_high: np.ndarray = bar_high + side * spread
+
+        # Buy limits and sell stops trigger when the market trades down to the price, the others when it trades up.
+        triggers_below: np.ndarray = is_buy == is_lmt
+        touched: np.ndarray = np.where(triggers_below, side_low <= price, side_high >= price)
+        gapped: np.ndarray = np.where(triggers_below, side_high <= price, side_low >= price)
+        match_price: np.ndarray = np.where(gapped, bar_open + side * spread, price) + side * slippage
+
+        for index in np.flatnonzero(touched | gapped):
+            order: Order = orders[index]
+            self._fill_order(order=order, match_price=float(match_price[index]),
+                             matched_at=matched_at[order.symbol_id])
+            yield order
+
+    # Only symbols with pending orders and a bar of their own at the current bar count are looked at.
+    def get_triggered_orders(self) -> List[Order]:
+        orders: List[Order] = []
+        for symbol_id in self.order_repository.get_pending_symbol_ids():
+            if self.data_repository.has_current_bar(symbol_id=symbol_id):
+                orders += self._get_triggered_symbol_orders(symbol_id=symbol_id)
+        orders.sort(key=lambda order: order.id)
+        return orders
+
+    def _get_triggered_symbol_orders(self, symbol_id: str) -> List[Order]:
+        _, bar_high, bar_low, _ = self._get_ohlc(symbol_id=symbol_id)
+        _, spread = self._get_slippage_and_spread(symbol_id=symbol_id)
+        orders: List[Order] = []
+        orders += self.order_repository.get_pending_orders_by_price(symbol_id=symbol_id,
+                                                                    direction=OrderDirection.BUY,
+                                                                    order_type=OrderType.LMT,
+                                                                    min_price=bar_low + spread)
+        orders += self.order_repository.get_pending_orders_by_price(symbol_id=symbol_id,
+                                                                    direction=OrderDirection.SELL,
+                                                                    order_type=OrderType.LMT,
+                                                                    max_price=bar_high - spread)
+        orders += self.order_repository.get_pending_orders_by_price(symbol_id=symbol_id,
+                                                                    direction=OrderDirection.BUY,
+                                                                    order_type=OrderType.STP,
+                                                                    max_price=bar_high + spread)
+        orders += self.order_repository.get_pending_orders_by_price(symbol_id=symbol_id,
+                                                                    direction=OrderDirection.SELL,
+                                                                    order_type=OrderType.STP,
+                                                                    min_price=bar_low - spread)
+        return orders
+
     def _match_lmt_buy_order(self, order: Order) -> bool:
         match_price: Optional[float] = None
-        bar_open, bar_high, bar_low, _ = self._get_ohlc()
-        slippage, spread = self._get_slippage_and_spread()
+        bar_open, bar_high, bar_low, _ = self._get_ohlc(symbol_id=order.symbol_id)
+        slippage, spread = self._get_slippage_and_spread(symbol_id=order.symbol_id)
 
         if bar_low + spread <= order.price:
             match_price = order.price
@@ -45,8 +122,8 @@ class GeneralMatchService(MatchService):
 
     def _match_lmt_sell_order(self, order: Order) -> bool:
         match_price: Optional[float] = None
-        bar_open, bar_high, bar_low, _ = self._get_ohlc()
-        slippage, spread = self._get_slippage_and_spread()
+        bar_open, bar_high, bar_low, _ = self._get_ohlc(symbol_id=order.symbol_id)
+        slippage, spread = self._get_slippage_and_spread(symbol_id=order.symbol_id)
 
         if bar_high - spread >= order.price:
             match_price = order.price
@@ -63,8 +140,8 @@ class GeneralMatchService(MatchService):
 
     def _match_stp_buy_order(self, order: Order) -> bool:
         match_price: Optional[float] = None
-        bar_open, bar_high, bar_low, _ = self._get_ohlc()
-        slippage, spread = self._get_slippage_and_spread()
+        bar_open, bar_high, bar_low, _ = self._get_ohlc(symbol_id=order.symbol_id)
+        slippage, spread = self._get_slippage_and_spread(symbol_id=order.symbol_id)
 
         if bar_high + spread >= order.price:
             match_price = order.price
@@ -81,8 +158,8 @@ class GeneralMatchService(MatchService):
 
     def _match_stp_sell_order(self, order: Order) -> bool:
         match_price: Optional[float] = None
-        bar_open, bar_high, bar_low, _ = self._get_ohlc()
-        slippage, spread = self._get_slippage_and_spread()
+        bar_open, bar_high, bar_low, _ = self._get_ohlc(symbol_id=order.symbol_id)
+        slippage, spread = self._get_slippage_and_spread(symbol_id=order.symbol_id)
 
         if bar_low - spread <= order.price:
             match_price = order.price
@@ -97,11 +174,12 @@ class GeneralMatchService(MatchService):
         self._update_matched_order(order=order, match_price=match_price)
         return True
 
-    def _get_ohlc(self) -> Ohlc:
-        bar_open: float = self.data_repository.get_current_bar_data(name="open", timeframe="1m")
-        bar_high: float = self.data_repository.get_current_bar_data(name="high", timeframe="1m")
-        bar_low: float = self.data_repository.get_current_bar_data(name="low", timeframe="1m")
-        bar_close: float = self.data_repository.get_current_bar_data(name="close", timeframe="1m")
+    def _get_ohlc(self, symbol_id: str) -> Ohlc:
+        bar_open: float = self.data_repository.get_current_bar_data(name="open", timeframe="1m", symbol_id=symbol_id)
+        bar_high: float = self.data_repository.get_current_bar_data(name="high", timeframe="1m", symbol_id=symbol_id)
+        bar_low: float = self.data_repository.get_current_bar_data(name="low", timeframe="1m", symbol_id=symbol_id)
+        bar_close: float = self.data_repository.get_current_bar_data(name="close", timeframe="1m",
+                                                                     symbol_id=symbol_id)
 
         assert bar_open is not None
         assert bar_high is not None
@@ -111,14 +189,19 @@ class GeneralMatchService(MatchService):
         return Ohlc(open=bar_open, high=bar_high, low=bar_low, close=bar_close)
 
     def _update_matched_order(self, order: Order, match_price: float) -> None:
-        logging.info(f"Order {order.id} matched at {match_price}")
-        order.updated_at = self.data_repository.get_current_bar_data(name="datetime", timeframe="1m")
+        self._fill_order(order=order, match_price=match_price,
+                         matched_at=self.data_repository.get_current_bar_data(name="datetime", timeframe="1m",
+                                                                              symbol_id=order.symbol_id))
+
+    def _fill_order(self, order: Order, match_price: float, matched_at: datetime) -> None:
+        self.journal.append(EventType.ORDER_MATCHED, order_id=order.id, price=match_price)
+        order.updated_at = matched_at
         order.execution_price = match_price
-        order.status = OrderStatus.FILLED
+        self.order_repository.update_order_status(order_id=order.id, status=OrderStatus.FILLED)
 
-    def _get_slippage_and_spread(self) -> Tuple[float, float]:
+    def _get_slippage_and_spread(self, symbol_id: str) -> Tuple[float, float]:
         test_config: TestConfig = self.data_repository.get_test_config()
 
-        symbol: Symbol = self.data_repository.get_symbol()
+        symbol: Symbol = self.data_repository.get_symbol(symbol_id=symbol_id)
 
         return test_config.slippage * symbol.minimum_tick_size, test_config.spread * symbol.minimum_tick_size
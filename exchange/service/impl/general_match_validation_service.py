@@ -1,7 +1,10 @@
-import logging
+from typing import List, Dict, Tuple, Optional
 
 from broker.enums import OrderDirection
 from broker.model import Order
+from common.journal.event import EventType
+from common.journal.event_journal import EventJournal
+from common.journal.impl.logging_event_journal import LoggingEventJournal
 from data.model import Symbol
 from data.repository.data_repository import DataRepository
 from exchange.service.match_validation_service import MatchValidationService
@@ -9,30 +12,61 @@ from exchange.service.match_validation_service import MatchValidationService
 
 class GeneralMatchValidationService(MatchValidationService):
 
-    def __init__(self, data_repository: DataRepository):
+    def __init__(self, data_repository: DataRepository, journal: Optional[EventJournal] = None):
         self.data_repository: DataRepository = data_repository
+        self.journal: EventJournal = journal if journal is not None else LoggingEventJournal()
 
     def validate_match(self, order: Order) -> bool:
         is_valid_limit: bool = self._validate_limit(order=order)
         is_valid_volume: bool = self._validate_volume(order=order)
         return is_valid_limit and is_valid_volume
 
+    # Loads each symbol's price change, volume and limits once for all of its orders.
+    def validate_matches(self, orders: List[Order]) -> List[bool]:
+        bars: Dict[str, Tuple[float, float, Symbol]] = {}
+        results: List[bool] = []
+        for order in orders:
+            if order.symbol_id not in bars:
+                bars[order.symbol_id] = (self._get_percent_change(symbol_id=order.symbol_id),
+                                         self._get_volume(symbol_id=order.symbol_id),
+                                         self.data_repository.get_symbol(symbol_id=order.symbol_id))
+            percent_change, volume, symbol = bars[order.symbol_id]
+            results.append(self._check_limit(order=order, percent_change=percent_change, symbol=symbol) and
+                           self._check_volume(order=order, volume=volume))
+        return results
+
     def _validate_limit(self, order: Order) -> bool:
-        percent_change: float = self.data_repository.get_current_bar_data(name="percent_change", timeframe="1m")
-        symbol: Symbol = self.data_repository.get_symbol()
+        percent_change: float = self._get_percent_change(symbol_id=order.symbol_id)
+        symbol: Symbol = self.data_repository.get_symbol(symbol_id=order.symbol_id)
+        return self._check_limit(order=order, percent_change=percent_change, symbol=symbol)
+
+    def _validate_volume(self, order: Order) -> bool:
+        volume: float = self._get_volume(symbol_id=order.symbol_id)
+        return self._check_volume(order=order, volume=volume)
+
+    def _get_percent_change(self, symbol_id: str) -> float:
+        return self.data_repository.get_current_bar_data(name="percent_change", timeframe="1m", symbol_id=symbol_id)
+
+    def _get_volume(self, symbol_id: str) -> float:
+        return self.data_repository.get_current_bar_data(name="volume", timeframe="1m", symbol_id=symbol_id)
+
+    def _check_limit(self, order: Order, percent_change: float, symbol: Symbol) -> bool:
         if order.direction == OrderDirection.BUY:
             if percent_change > 0 and percent_change > symbol.upper_limit:
-                logging.info(f"Order {order.id} has been rejected due to upper limit breach")
+                self.journal.append(EventType.ORDER_REJECTED_UPPER_LIMIT, order_id=order.id, value=percent_change,
+                                    limit=symbol.upper_limit)
                 return False
         else:
             if percent_change < 0 and percent_change < symbol.lower_limit:
-                logging.info(f"Order {order.id} has been rejected due to lower limit breach")
+                self.journal.append(EventType.ORDER_REJECTED_LOWER_LIMIT, order_id=order.id, value=percent_change,
+                                    limit=symbol.lower_limit)
                 return False
         return True
 
-    def _validate_volume(self, order: Order) -> bool:
-        volume: float = self.data_repository.get_current_bar_data(name="volume", timeframe="1m")
+    def _check_volume(self, order: Order, volume: float) -> bool:
         if order.amount > volume:
-            logging.info(f"Order {order.id} has been rejected due to insufficient volume")
+            self.journal.append(EventType.ORDER_REJECTED_VOLUME, order_id=order.id,
+                                amount=order.amount if order.direction == OrderDirection.BUY else -order.amount,
+                                value=volume)
             return False
         return True
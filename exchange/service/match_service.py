@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List, Iterator
 
 from broker.model import Order
 
@@ -7,3 +8,19 @@ class MatchService(ABC):
     @abstractmethod
     def match_order(self, order: Order) -> None:
         pass
+
+    # Matches all orders against the current bar and returns the filled ones.
+    @abstractmethod
+    def match_orders(self, orders: List[Order]) -> List[Order]:
+        pass
+
+    # Like match_orders, but fills the orders one at a time as they are iterated. Orders after the point where the
+    # caller stops iterating stay pending.
+    @abstractmethod
+    def iter_matched_orders(self, orders: List[Order]) -> Iterator[Order]:
+        pass
+
+    # Pending orders whose trigger price the current bar reaches, in creation order.
+    @abstractmethod
+    def get_triggered_orders(self) -> List[Order]:
+        pass
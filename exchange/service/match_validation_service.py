@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 from broker.model import Order
 
@@ -7,3 +8,7 @@ class MatchValidationService(ABC):
     @abstractmethod
     def validate_match(self, order: Order) -> bool:
         pass
+
+    @abstractmethod
+    def validate_matches(self, orders: List[Order]) -> List[bool]:
+        pass
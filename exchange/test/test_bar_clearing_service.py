@@ -54,7 +54,7 @@ class TestBarClearingService(unittest.TestCase):
         order = Mock(spec=Order, symbol_id="test", execution_price=10, direction=OrderDirection.SELL, amount=10)
         self.service._update_account_position(order)
         self.mock_account_repository.get_position.assert_called_once()
-        self.mock_account_repository.set_position.assert_called_once_with(position=None)
+        self.mock_account_repository.set_position.assert_called_once_with(symbol_id="test", position=None)
 
     def test_update_position_with_opposite_direction_greater_amount(self):
         self.mock_account_repository.get_position.return_value = Mock(average_price=10, amount=10,
@@ -68,13 +68,13 @@ class TestBarClearingService(unittest.TestCase):
         self.assertEqual(position.direction, OrderDirection.SELL)
 
     def test_update_account_balance_with_no_position(self):
-        self.mock_account_repository.get_position.return_value = None
+        self.mock_account_repository.get_positions.return_value = {}
         self.service._update_account_balance()
         self.mock_account_repository.set_balance.assert_not_called()
 
     def test_update_account_balance_with_buy_position(self):
-        self.mock_account_repository.get_position.return_value = Mock(average_price=10, amount=10,
-                                                                      direction=OrderDirection.BUY)
+        self.mock_account_repository.get_positions.return_value = {
+            'symbol1': Mock(symbol_id='symbol1', average_price=10, amount=10, direction=OrderDirection.BUY)}
         self.mock_data_repository.get_current_bar_data.return_value = 11
         self.mock_data_repository.get_symbol.return_value = Mock(multiplier=1)
         self.mock_account_repository.get_equity.return_value = 100
@@ -82,18 +82,32 @@ class TestBarClearingService(unittest.TestCase):
         self.mock_account_repository.set_balance.assert_called_once_with(balance=110)
 
     def test_update_account_balance_with_sell_position(self):
-        self.mock_account_repository.get_position.return_value = Mock(average_price=10, amount=10,
-                                                                      direction=OrderDirection.SELL)
+        self.mock_account_repository.get_positions.return_value = {
+            'symbol1': Mock(symbol_id='symbol1', average_price=10, amount=10, direction=OrderDirection.SELL)}
         self.mock_data_repository.get_current_bar_data.return_value = 11
         self.mock_data_repository.get_symbol.return_value = Mock(multiplier=1)
         self.mock_account_repository.get_equity.return_value = 100
         self.service._update_account_balance()
         self.mock_account_repository.set_balance.assert_called_once_with(balance=90)
 
+    def test_update_account_balance_with_positions_in_several_symbols(self):
+        self.mock_account_repository.get_positions.return_value = {
+            'symbol1': Mock(symbol_id='symbol1', average_price=10, amount=10, direction=OrderDirection.BUY),
+            'symbol2': Mock(symbol_id='symbol2', average_price=20, amount=1, direction=OrderDirection.SELL)}
+        closes = {'symbol1': 11, 'symbol2': 25}
+        self.mock_data_repository.get_current_bar_data.side_effect = \
+            lambda name, timeframe, symbol_id: closes[symbol_id]
+        self.mock_data_repository.get_symbol.side_effect = lambda symbol_id: Mock(
+            multiplier={'symbol1': 1, 'symbol2': 2}[symbol_id])
+        self.mock_account_repository.get_equity.return_value = 100
+        self.service._update_account_balance()
+        self.mock_account_repository.set_balance.assert_called_once_with(balance=100)
+
     def test_update_account_equity_with_no_position(self):
         self.mock_account_repository.get_equity.return_value = 100
         self.mock_account_repository.get_position.return_value = None
-        order = Mock(spec=Order, execution_price=10, amount=10, direction=OrderDirection.BUY, commissions=10)
+        order = Mock(spec=Order, symbol_id="test", execution_price=10, amount=10, direction=OrderDirection.BUY,
+                     commissions=10)
 
         self.service._update_account_equity(order)
 
@@ -104,8 +118,22 @@ class TestBarClearingService(unittest.TestCase):
         self.mock_account_repository.get_position.return_value = Mock(average_price=10, amount=10,
                                                                       direction=OrderDirection.SELL)
         self.mock_data_repository.get_symbol.return_value = Mock(multiplier=1)
-        order = Mock(spec=Order, id=1, execution_price=10, amount=10, direction=OrderDirection.BUY, commissions=10)
+        order = Mock(spec=Order, id=1, symbol_id="test", execution_price=10, amount=10, direction=OrderDirection.BUY,
+                     commissions=10)
 
         self.service._update_account_equity(order)
 
         self.mock_account_repository.set_equity.assert_has_calls([call(equity=90), call(equity=90.0)])
+
+    def test_update_account_equity_with_reversing_order(self):
+        self.mock_account_repository.get_equity.side_effect = [100, 95]
+        self.mock_account_repository.get_position.return_value = Mock(average_price=10, amount=2,
+                                                                      direction=OrderDirection.SELL)
+        self.mock_data_repository.get_symbol.return_value = Mock(multiplier=1)
+        order = Mock(spec=Order, id=1, symbol_id="test", execution_price=12, amount=5, direction=OrderDirection.BUY,
+                     commissions=5)
+
+        self.service._update_account_equity(order)
+
+        # Only the 2 lots closed are realized, the other 3 open a long position.
+        self.mock_account_repository.set_equity.assert_has_calls([call(equity=95), call(equity=91.0)])
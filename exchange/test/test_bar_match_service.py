@@ -1,4 +1,5 @@
 import unittest
+from datetime import datetime
 from unittest.mock import Mock
 
 from broker.enums import OrderDirection, OrderType
@@ -78,3 +79,49 @@ class TestBarExchangeService(unittest.TestCase):
         order = Mock(symbol_id='symbol1', price=10.0, amount=5, direction=OrderDirection.SELL, type=OrderType.STP)
         result = self.service._match_stp_sell_order(order)
         self.assertFalse(result)
+
+    def test_match_orders_matches_single_order_matching(self):
+        bar = {'open': 10.0, 'high': 10.2, 'low': 9.9, 'close': 10.1, 'datetime': datetime(2024, 1, 1)}
+        self.data_repository.get_current_bar_data.side_effect = lambda name, timeframe, symbol_id: bar[name]
+        self.data_repository.get_test_config.return_value = Mock(spread=1, slippage=1)
+        self.data_repository.get_symbol.return_value = Mock(minimum_tick_size=0.01)
+
+        def make_orders():
+            return [Mock(id=index, symbol_id='symbol1', price=price, amount=1, direction=direction, type=order_type,
+                         execution_price=None)
+                    for index, (price, direction, order_type) in enumerate(
+                        (price, direction, order_type) for price in (9.8, 9.9, 10.0, 10.19, 10.3)
+                        for direction in OrderDirection for order_type in OrderType)]
+
+        expected_orders = make_orders()
+        expected = [order for order in expected_orders if self.service.match_order(order)]
+        filled = self.service.match_orders(make_orders())
+
+        self.assertEqual([order.id for order in filled], [order.id for order in expected])
+        self.assertEqual([order.execution_price for order in filled], [order.execution_price for order in expected])
+        self.assertTrue(all(order.updated_at == bar['datetime'] for order in filled))
+
+    def test_match_orders_empty(self):
+        self.assertEqual(self.service.match_orders([]), [])
+        self.data_repository.get_current_bar_data.assert_not_called()
+
+    def test_get_triggered_orders_queries_each_book_by_bar_range(self):
+        bar = {'open': 10.0, 'high': 10.2, 'low': 9.9, 'close': 10.1}
+        self.data_repository.get_current_bar_data.side_effect = lambda name, timeframe, symbol_id: bar[name]
+        self.data_repository.get_test_config.return_value = Mock(spread=1, slippage=0)
+        self.data_repository.get_symbol.return_value = Mock(minimum_tick_size=0.01)
+        self.data_repository.has_current_bar.side_effect = lambda symbol_id: symbol_id == 'symbol1'
+        self.order_repository.get_pending_symbol_ids.return_value = ['symbol2', 'symbol1']
+        self.order_repository.get_pending_orders_by_price.side_effect = [[Mock(id=3)], [Mock(id=1)], [], [Mock(id=2)]]
+
+        orders = self.service.get_triggered_orders()
+
+        # symbol2 has no bar of its own at this bar count, so its books are not looked at.
+        calls = {(call.kwargs['symbol_id'], call.kwargs['direction'], call.kwargs['order_type']):
+                 (call.kwargs.get('min_price'), call.kwargs.get('max_price'))
+                 for call in self.order_repository.get_pending_orders_by_price.call_args_list}
+        self.assertEqual(calls, {('symbol1', OrderDirection.BUY, OrderType.LMT): (9.9 + 0.01, None),
+                                 ('symbol1', OrderDirection.SELL, OrderType.LMT): (None, 10.2 - 0.01),
+                                 ('symbol1', OrderDirection.BUY, OrderType.STP): (None, 10.2 + 0.01),
+                                 ('symbol1', OrderDirection.SELL, OrderType.STP): (9.9 - 0.01, None)})
+        self.assertEqual([order.id for order in orders], [1, 2, 3])
@@ -0,0 +1,75 @@
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+from broker.enums import OrderDirection, OrderType, OrderStatus
+from broker.model import Order
+from broker.repository.account_repository import AccountRepository
+from broker.repository.impl.general_order_repository import GeneralOrderRepository
+from broker.service.order_service import OrderService
+from broker.service.risk_service import RiskService
+from data.repository.data_repository import DataRepository
+from exchange.service.clearing_service import ClearingService
+from exchange.service.impl.general_exchange_service import GeneralExchangeService
+from exchange.service.impl.general_match_service import GeneralMatchService
+from exchange.service.match_validation_service import MatchValidationService
+
+BAR = {'open': 10.0, 'high': 10.5, 'low': 9.5, 'close': 10.0, 'datetime': datetime(2024, 1, 1, 0, 1)}
+
+
+class TestGeneralExchangeService(unittest.TestCase):
+    def setUp(self):
+        self.data_repository = Mock(spec=DataRepository)
+        self.data_repository.get_current_bar_data.side_effect = lambda name, timeframe, symbol_id=None: BAR[name]
+        self.data_repository.get_test_config.return_value = Mock(spread=0, slippage=0)
+        self.data_repository.get_symbol.return_value = Mock(minimum_tick_size=0.01)
+        self.data_repository.has_current_bar.return_value = True
+        self.order_repository = GeneralOrderRepository()
+        # Two buy limits fill on the bar, the third is priced below it and stays pending.
+        self.orders = [self._save_order(price=price) for price in (10.0, 10.0, 5.0)]
+        self.match_service = GeneralMatchService(data_repository=self.data_repository,
+                                                 order_repository=self.order_repository)
+        self.match_validation_service = Mock(spec=MatchValidationService)
+        self.match_validation_service.validate_matches.side_effect = lambda orders: [True] * len(orders)
+        self.risk_service = Mock(spec=RiskService)
+        self.clearing_service = Mock(spec=ClearingService)
+        self.service = GeneralExchangeService(data_repository=self.data_repository,
+                                              order_repository=self.order_repository,
+                                              account_repository=Mock(spec=AccountRepository))
+        self.service.force_close_account = Mock()
+
+    def _save_order(self, price: float) -> Order:
+        order = Order(id=-1, symbol_id='symbol1', price=price, amount=50, direction=OrderDirection.BUY,
+                      type=OrderType.LMT, status=OrderStatus.PENDING, created_at=datetime(2024, 1, 1),
+                      updated_at=datetime(2024, 1, 1), commissions=None, execution_price=None)
+        self.order_repository.save_order(order)
+        return order
+
+    def _match_and_clear_all_orders(self):
+        self.service.match_and_clear_all_orders(match_service=self.match_service,
+                                                clearing_service=self.clearing_service,
+                                                risk_service=self.risk_service, order_service=Mock(spec=OrderService),
+                                                match_validation_service=self.match_validation_service)
+
+    def test_fills_breaching_the_margin_limit_force_close_on_the_same_bar(self):
+        self.risk_service.validate_account_risk.side_effect = [True, True, False]
+
+        self._match_and_clear_all_orders()
+
+        self.assertEqual([call.kwargs['order'] for call in self.clearing_service.clear_order.call_args_list],
+                         self.orders[:2])
+        self.service.force_close_account.assert_called_once()
+
+    def test_breach_stops_the_batch_before_later_fills(self):
+        self.risk_service.validate_account_risk.side_effect = [True, False]
+
+        self._match_and_clear_all_orders()
+
+        self.clearing_service.clear_order.assert_called_once_with(order=self.orders[0])
+        self.assertEqual([order.status for order in self.orders],
+                         [OrderStatus.FILLED, OrderStatus.PENDING, OrderStatus.PENDING])
+        self.service.force_close_account.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
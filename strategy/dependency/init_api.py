@@ -1,14 +1,19 @@
 from abc import ABC
+from typing import Optional, List
 
 from data.model import DataHandler, IndicatorParams
 
 
 class InitApi(ABC):
-    def subscribe_bar_data(self, timeframe: str) -> bool:
+    def subscribe_bar_data(self, timeframe: str, symbol_id: Optional[str] = None) -> bool:
         pass
 
-    def get_data_handler(self, name: str, timeframe: str, size: int) -> DataHandler:
+    def subscribe_many_bar_data(self, timeframes: List[str], symbol_ids: Optional[List[str]] = None) -> bool:
         pass
 
-    def get_indicator_handler(self, name: str, timeframe: str, size: int, params: IndicatorParams) -> DataHandler:
+    def get_data_handler(self, name: str, timeframe: str, size: int, symbol_id: Optional[str] = None) -> DataHandler:
+        pass
+
+    def get_indicator_handler(self, name: str, timeframe: str, size: int, params: IndicatorParams,
+                              symbol_id: Optional[str] = None) -> DataHandler:
         pass
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+from data.store.bar_store import BarStore
+from strategy.dependency.init_api import InitApi
+
+
+class VectorizedStrategy(ABC):
+    @abstractmethod
+    def __init__(self, _: InitApi):
+        pass
+
+    # One signed target position per bar of the test timeframe: positive is long, negative is short.
+    @abstractmethod
+    def get_target_positions(self, bar_data: BarStore) -> np.ndarray:
+        pass
+
+
+# Turns entry and exit signals into target positions. Any exit flattens the position, and an entry on the same
+# bar as an exit wins.
+def signals_to_positions(long_entries: np.ndarray, long_exits: np.ndarray, amount: int,
+                         short_entries: Optional[np.ndarray] = None,
+                         short_exits: Optional[np.ndarray] = None) -> np.ndarray:
+    targets: np.ndarray = np.full(len(long_entries), np.nan)
+    targets[long_exits] = 0
+    if short_exits is not None:
+        targets[short_exits] = 0
+    targets[long_entries] = amount
+    if short_entries is not None:
+        targets[short_entries] = -amount
+
+    has_target: np.ndarray = ~np.isnan(targets)
+    last_target_index: np.ndarray = np.maximum.accumulate(np.where(has_target, np.arange(len(targets)), -1))
+    positions: np.ndarray = np.where(last_target_index >= 0, targets[np.maximum(last_target_index, 0)], 0)
+    return positions.astype(np.int64)
@@ -0,0 +1,78 @@
+import os
+from typing import Optional, Tuple, BinaryIO
+
+import numpy as np
+
+BALANCE_FILE_NAME: str = 'balance_history.f8'
+EQUITY_FILE_NAME: str = 'equity_history.f8'
+
+
+# Balance and equity of each replayed bar, kept in buffers of capacity bars. Without a directory the buffers double
+# when full. With one a full buffer is appended to a file per history in that directory and reused, so memory stays
+# at capacity bars however long the run is, and the histories are returned as read-only mappings of the files.
+class HistoryBuffer:
+    def __init__(self, capacity: int, directory: Optional[str] = None):
+        self.capacity: int = max(capacity, 1)
+        self.directory: Optional[str] = directory
+        self.balances: np.ndarray = np.empty(self.capacity)
+        self.equities: np.ndarray = np.empty(self.capacity)
+        self.count: int = 0
+        self.spilled_count: int = 0
+        self.balance_file: Optional[BinaryIO] = None
+        self.equity_file: Optional[BinaryIO] = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.balance_file = open(os.path.join(directory, BALANCE_FILE_NAME), 'wb', buffering=0)
+            self.equity_file = open(os.path.join(directory, EQUITY_FILE_NAME), 'wb', buffering=0)
+
+    def __len__(self) -> int:
+        return self.spilled_count + self.count
+
+    def append(self, balance: float, equity: float) -> None:
+        if self.count == self.capacity:
+            self._make_room()
+        self.balances[self.count] = balance
+        self.equities[self.count] = equity
+        self.count += 1
+
+    # Bars marked to their own balance at an unchanged equity.
+    def extend(self, balances: np.ndarray, equity: float) -> None:
+        start: int = 0
+        while start < len(balances):
+            if self.count == self.capacity:
+                self._make_room()
+            stop: int = min(start + self.capacity - self.count, len(balances))
+            self.balances[self.count:self.count + stop - start] = balances[start:stop]
+            self.equities[self.count:self.count + stop - start] = equity
+            self.count += stop - start
+            start = stop
+
+    # Writes out what is left in the buffers and closes the files, nothing can be appended afterwards.
+    def get_histories(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.directory is None:
+            return self.balances[:self.count], self.equities[:self.count]
+        self._spill()
+        self.balance_file.close()
+        self.equity_file.close()
+        return self._map(file_name=BALANCE_FILE_NAME), self._map(file_name=EQUITY_FILE_NAME)
+
+    def _make_room(self) -> None:
+        if self.directory is not None:
+            self._spill()
+            return
+        self.capacity *= 2
+        self.balances = np.concatenate([self.balances, np.empty(self.capacity - len(self.balances))])
+        self.equities = np.concatenate([self.equities, np.empty(self.capacity - len(self.equities))])
+
+    def _spill(self) -> None:
+        self.balance_file.write(self.balances[:self.count].tobytes())
+        self.equity_file.write(self.equities[:self.count].tobytes())
+        self.spilled_count += self.count
+        self.count = 0
+
+    # An empty file cannot be mapped.
+    def _map(self, file_name: str) -> np.ndarray:
+        if self.spilled_count == 0:
+            return np.empty(0)
+        return np.memmap(os.path.join(self.directory, file_name), dtype=np.float64, mode='r',
+                         shape=(self.spilled_count,))
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Optional, Sequence
+
+import numpy as np
 
 from broker.broker_api import BrokerApi
 from broker.model import Order
@@ -8,6 +10,7 @@ from broker.repository.order_repository import OrderRepository
 from broker.service.order_service import OrderService
 from broker.service.order_validation_service import OrderValidationService
 from broker.service.risk_service import RiskService
+from broker.store.order_table import get_order_columns
 from data.data_api import DataApi
 from data.repository.data_repository import DataRepository
 from data.service.data_service import DataService
@@ -16,6 +19,7 @@ from exchange.service.clearing_service import ClearingService
 from exchange.service.exchange_service import ExchangeService
 from exchange.service.match_service import MatchService
 from exchange.service.match_validation_service import MatchValidationService
+from test_engine.profiler import StageTiming
 
 
 @dataclass
@@ -46,6 +50,14 @@ class ApiContainer:
 
 @dataclass
 class TestResult:
-    order_history: List[Order]
-    balance_history: List[float]
-    equity_history: List[float]
+    order_history: Sequence[Order]
+    balance_history: np.ndarray
+    equity_history: np.ndarray
+    # Only collected when the test config asks to profile.
+    stage_timings: Optional[Dict[str, StageTiming]] = None
+    # Order events of the run as EVENT_DTYPE records, empty unless the test config asks for a journal.
+    events: Optional[np.ndarray] = None
+
+    # The order history as one array per field, see OrderTable.to_columns.
+    def get_order_columns(self) -> Dict[str, np.ndarray]:
+        return get_order_columns(orders=self.order_history)
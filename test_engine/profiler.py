@@ -0,0 +1,84 @@
+import functools
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Callable
+
+# Calls taking up to 2^i ns land in bucket i.
+BUCKET_COUNT: int = 48
+
+
+@dataclass
+class StageTiming:
+    name: str
+    call_count: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+    histogram: List[int] = field(default_factory=lambda: [0] * BUCKET_COUNT)
+
+    def record(self, elapsed_ns: int) -> None:
+        self.call_count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.histogram[min(elapsed_ns.bit_length(), BUCKET_COUNT - 1)] += 1
+
+    def merge(self, other: 'StageTiming') -> None:
+        self.call_count += other.call_count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.histogram = [count + other_count for count, other_count in zip(self.histogram, other.histogram)]
+
+    # Upper bound of the histogram bucket holding the given quantile.
+    def get_quantile_ns(self, quantile: float) -> int:
+        target: float = quantile * self.call_count
+        cumulative: int = 0
+        for bucket, count in enumerate(self.histogram):
+            cumulative += count
+            if count > 0 and cumulative >= target:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+
+# Times methods by shadowing them on the instance with a wrapper, so nothing is timed or paid for on instances
+# that were never wrapped. Nested stages are timed inclusively.
+class StageProfiler:
+    def __init__(self):
+        self.timings: Dict[str, StageTiming] = {}
+
+    def wrap(self, instance: object, prefix: str, method_names: Optional[List[str]] = None) -> None:
+        if method_names is None:
+            method_names = [name for name in dir(type(instance))
+                            if not name.startswith('_') and callable(getattr(type(instance), name))]
+        for method_name in method_names:
+            setattr(instance, method_name, self._time(name=f'{prefix}.{method_name}',
+                                                      method=getattr(instance, method_name)))
+
+    def get_timings(self) -> Dict[str, StageTiming]:
+        return {name: timing for name, timing in self.timings.items() if timing.call_count > 0}
+
+    def _time(self, name: str, method: Callable) -> Callable:
+        timing: StageTiming = self.timings.setdefault(name, StageTiming(name=name))
+        perf_counter_ns: Callable[[], int] = time.perf_counter_ns
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start: int = perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timing.record(perf_counter_ns() - start)
+
+        return timed
+
+
+def format_stage_timings(timings: Dict[str, StageTiming], total_ns: Optional[int] = None) -> str:
+    lines: List[str] = [f'{"stage":<58}{"calls":>10}{"total s":>10}{"share":>8}{"mean us":>10}{"p50 us":>10}'
+                        f'{"p99 us":>10}{"max us":>10}']
+    total_ns = total_ns or max((timing.total_ns for timing in timings.values()), default=0)
+    for timing in sorted(timings.values(), key=lambda timing: timing.total_ns, reverse=True):
+        share: float = timing.total_ns / total_ns if total_ns else 0.0
+        lines.append(f'{timing.name:<58}{timing.call_count:>10}{timing.total_ns / 1e9:>10.3f}{share:>8.1%}'
+                     f'{timing.total_ns / timing.call_count / 1e3:>10.1f}'
+                     f'{timing.get_quantile_ns(0.5) / 1e3:>10.1f}{timing.get_quantile_ns(0.99) / 1e3:>10.1f}'
+                     f'{timing.max_ns / 1e3:>10.1f}')
+    return '\n'.join(lines)
@@ -0,0 +1,79 @@
+import gc
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.util import Finalize
+from typing import Type, List, Dict, Optional
+
+from data.model import TestConfig, Symbol, SharedBarDataHandle
+from data.service.impl.general_market_data_service import GeneralMarketDataService
+from data.service.impl.shared_memory_market_data_service import SharedMemoryMarketDataService
+from data.service.market_data_service import MarketDataService
+from data.store.bar_store import BarStore
+from data.store.shared_bar_store import publish_bar_store
+from strategy.base_strategy import BaseStrategy
+from test_engine.model import TestResult
+from test_engine.service.impl.general_test_engine_service import GeneralTestEngineService
+from test_engine.service.sweep_service import SweepService
+
+_worker_market_data_service: Optional[SharedMemoryMarketDataService] = None
+
+
+def _init_worker(handle: SharedBarDataHandle) -> None:
+    global _worker_market_data_service
+    _worker_market_data_service = SharedMemoryMarketDataService(handle=handle)
+    Finalize(None, _close_worker, exitpriority=0)
+
+
+# Runs when the worker exits. Engines of finished tests may still hold views of the shared bar data through
+# reference cycles, they are collected first so the shared memory can be closed.
+def _close_worker() -> None:
+    gc.collect()
+    _worker_market_data_service.close()
+
+
+def _run_test(test_config: TestConfig, strategy_constructor: Type[BaseStrategy], params: Dict) -> TestResult:
+    engine: GeneralTestEngineService = GeneralTestEngineService(market_data_service=_worker_market_data_service)
+    return engine.run_test(test_config=test_config, strategy_constructor=partial(strategy_constructor, **params))
+
+
+# Loads the bar data once, publishes it to shared memory and runs one test per parameter set in a process
+# pool. Each parameter set is passed to the strategy constructor as keyword arguments.
+class GeneralSweepService(SweepService):
+    def __init__(self, market_data_service: Optional[MarketDataService] = None, max_workers: Optional[int] = None):
+        self.market_data_service: Optional[MarketDataService] = market_data_service
+        self.max_workers: Optional[int] = max_workers
+
+    def run_sweep(self, test_config: TestConfig, strategy_constructor: Type[BaseStrategy],
+                  strategy_params: List[Dict], timeframes: Optional[List[str]] = None) -> List[TestResult]:
+        market_data_service: MarketDataService = (self.market_data_service or
+                                                  GeneralMarketDataService.from_test_config(test_config=test_config))
+        # A portfolio test fetches the bar data of every one of its symbols, so all of them are published.
+        symbol_ids: List[str] = list(dict.fromkeys([test_config.symbol_id] + (test_config.symbol_ids or [])))
+        symbols: Dict[str, Symbol] = {symbol_id: market_data_service.get_symbol(symbol_id=symbol_id)
+                                      for symbol_id in symbol_ids}
+        shared_memories: Dict[str, Dict[str, SharedMemory]] = {}
+        try:
+            for symbol_id in symbol_ids:
+                shared_memories[symbol_id] = {}
+                for timeframe in dict.fromkeys(['1m', test_config.timeframe] + (timeframes or [])):
+                    bar_data: BarStore = market_data_service.get_bar_data(symbol_id=symbol_id, timeframe=timeframe,
+                                                                          start_date=test_config.start_date,
+                                                                          end_date=test_config.end_date)
+                    shared_memories[symbol_id][timeframe] = publish_bar_store(store=bar_data)
+
+            handle: SharedBarDataHandle = SharedBarDataHandle(
+                symbols=symbols, shared_memory_names={
+                    symbol_id: {timeframe: shared_memory.name for timeframe, shared_memory in
+                                symbol_shared_memories.items()}
+                    for symbol_id, symbol_shared_memories in shared_memories.items()})
+            logging.info(f'Running {len(strategy_params)} tests')
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(handle,)) as executor:
+                return list(executor.map(partial(_run_test, test_config, strategy_constructor), strategy_params))
+        finally:
+            for symbol_shared_memories in shared_memories.values():
+                for shared_memory in symbol_shared_memories.values():
+                    shared_memory.close()
+                    shared_memory.unlink()
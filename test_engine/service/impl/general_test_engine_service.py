@@ -1,6 +1,11 @@
 import logging
-from datetime import datetime
-from typing import Dict, Optional, List, Type
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Type, List, Dict
+
+import numpy as np
 
 from broker.broker_api import BrokerApi
 from broker.repository.account_repository import AccountRepository
@@ -13,16 +18,22 @@ from broker.service.impl.general_risk_service import GeneralRiskService
 from broker.service.order_service import OrderService
 from broker.service.order_validation_service import OrderValidationService
 from broker.service.risk_service import RiskService
-from common.http.api import get_bar_data, get_symbol
-from common.http.dto import SymbolDto
-from common.http.request import GetBarDataRequest, GetSymbolRequest
-from common.http.response import GetBarDataResponse, GetSymbolResponse
+from broker.store.order_table import OrderTable
+from common.journal.event_journal import EventJournal
+from common.journal.impl.buffered_event_journal import BufferedEventJournal
+from common.journal.impl.logging_event_journal import LoggingEventJournal
 from data.data_api import DataApi
 from data.model import TestConfig, Symbol
 from data.repository.data_repository import DataRepository
 from data.repository.impl.general_data_repository import GeneralDataRepository
+from data.repository.impl.general_indicator_cache_repository import GeneralIndicatorCacheRepository
+from data.repository.indicator_cache_repository import IndicatorCacheRepository
 from data.service.data_service import DataService
 from data.service.impl.general_data_service import GeneralDataService
+from data.service.impl.general_market_data_service import GeneralMarketDataService
+from data.service.market_data_service import MarketDataService
+from data.store.bar_file import write_bar_file
+from data.store.bar_store import BarStore
 from exchange.exchange_api import ExchangeApi
 from exchange.service.clearing_service import ClearingService
 from exchange.service.exchange_service import ExchangeService
@@ -33,56 +44,142 @@ from exchange.service.impl.general_match_validation_service import GeneralMatchV
 from exchange.service.match_service import MatchService
 from exchange.service.match_validation_service import MatchValidationService
 from strategy.base_strategy import BaseStrategy
-from test_engine.model import RepositoryContainer, ServiceContainer, ApiContainer
+from test_engine.history_buffer import HistoryBuffer
+from test_engine.model import RepositoryContainer, ServiceContainer, ApiContainer, TestResult
+from test_engine.profiler import StageProfiler, StageTiming, format_stage_timings
 from test_engine.service.test_engine_service import TestEngineService
 
 
 class GeneralTestEngineService(TestEngineService):
-    def __init__(self):
+    def __init__(self, market_data_service: Optional[MarketDataService] = None,
+                 indicator_cache_repository: Optional[IndicatorCacheRepository] = None):
+        self.market_data_service: Optional[MarketDataService] = market_data_service
+        self.indicator_cache_repository: Optional[IndicatorCacheRepository] = indicator_cache_repository
         self.api_container: Optional[ApiContainer] = None
         self.repository_container: Optional[RepositoryContainer] = None
         self.service_container: Optional[ServiceContainer] = None
+        self.journal: Optional[EventJournal] = None
         self.test_config: Optional[TestConfig] = None
-        self.strategy_timeframe_datetime: Optional[List[datetime]] = None
+        self.spill_dir: Optional[str] = None
+        self.strategy_bar_first_1m_index: Optional[np.ndarray] = None
         self.strategy_timeframe_bar_count: int = 0
-        self.balance_history: List[float] = []
-        self.equity_history: List[float] = []
+        self.balance_history: np.ndarray = np.empty(0)
+        self.equity_history: np.ndarray = np.empty(0)
+        self.history: Optional[HistoryBuffer] = None
+        self.replayed_bar_count: int = 0
 
-    def run_test(self, test_config: TestConfig, strategy_constructor: Type[BaseStrategy]) -> None:
+    def run_test(self, test_config: TestConfig, strategy_constructor: Type[BaseStrategy]) -> TestResult:
         self.test_config: TestConfig = test_config
+        if self.market_data_service is None:
+            self.market_data_service = GeneralMarketDataService.from_test_config(test_config=test_config)
         self._init_containers()
         strategy: BaseStrategy = strategy_constructor(_=self.api_container.data_api)
-        self.strategy_timeframe_datetime = (
-            self.repository_container.data_repository.get_all_data(name="datetime",
-                                                                   timeframe=self.test_config.timeframe))
+        self.strategy_bar_first_1m_index = self._get_strategy_bar_first_1m_index()
+
+        # The last 1m bar is never replayed, the account is marked to it on the bar before.
+        bar_count_1m: int = len(self.repository_container.data_repository.get_clock())
+        replay_stop: int = max(bar_count_1m - 1, 0)
+        self.history = self._init_history(replay_stop=replay_stop)
+        self.replayed_bar_count = 0
+        profiler: Optional[StageProfiler] = self._init_profiler(strategy=strategy) if self.test_config.profile else None
 
-        datetime_1m: List[datetime] = self.repository_container.data_repository.get_all_data(name="datetime",
-                                                                                             timeframe="1m")
         logging.info('Starting test')
-        for index, dt in enumerate(datetime_1m):
-            if index == len(datetime_1m) - 1:
-                logging.critical('Test finished')
-                break
-            try:
-                self._update_strategy(current_datetime=dt, strategy=strategy)
-                self.api_container.data_api.update_on_bar()
-                self.api_container.exchange_api.update_account_balance_on_bar()
-                self.api_container.exchange_api.examine_and_force_close_account()
-                self.balance_history.append(self.repository_container.account_repository.get_balance())
-                self.equity_history.append(self.repository_container.account_repository.get_equity())
-
-            except (IndexError,):
-                logging.critical('Strategy backtest timeframe reached limit, test finished')
-                break
-
-    def _update_strategy(self, current_datetime: datetime, strategy: BaseStrategy) -> None:
-        strategy_datetime: datetime = self.strategy_timeframe_datetime[self.strategy_timeframe_bar_count]
-        if current_datetime >= strategy_datetime:
+        start_ns: int = time.perf_counter_ns()
+        try:
+            while self.replayed_bar_count < replay_stop:
+                if not self.test_config.fast_forward or not self._fast_forward(stop=replay_stop):
+                    self._replay_bar(strategy=strategy)
+            logging.critical('Test finished')
+        except (IndexError,):
+            logging.critical('Strategy backtest timeframe reached limit, test finished')
+        finally:
+            events: np.ndarray = self.journal.get_records()
+            self.journal.close()
+        elapsed_ns: int = time.perf_counter_ns() - start_ns
+        self.balance_history, self.equity_history = self.history.get_histories()
+
+        stage_timings: Optional[Dict[str, StageTiming]] = None
+        if profiler is not None:
+            stage_timings = profiler.get_timings()
+            logging.critical(f'Stage timings over {elapsed_ns / 1e9:.3f}s and {self.replayed_bar_count} bars:\n'
+                             f'{format_stage_timings(timings=stage_timings, total_ns=elapsed_ns)}')
+        return TestResult(order_history=self.repository_container.order_repository.get_all_orders(),
+                          balance_history=self.balance_history, equity_history=self.equity_history,
+                          stage_timings=stage_timings, events=events)
+
+    # The stages of a bar are the strategy, the api calls the engine makes and every service method below them.
+    def _init_profiler(self, strategy: BaseStrategy) -> StageProfiler:
+        profiler: StageProfiler = StageProfiler()
+        profiler.wrap(instance=strategy, prefix='strategy', method_names=['on_bar'])
+        for name, api in vars(self.api_container).items():
+            profiler.wrap(instance=api, prefix=name)
+        for name, service in vars(self.service_container).items():
+            profiler.wrap(instance=service, prefix=name)
+        return profiler
+
+    # Until the next strategy bar nothing can match, so the bars before it only mark the account to their close.
+    # They are skipped up to the first one that could force close the account.
+    def _fast_forward(self, stop: int) -> bool:
+        if self.strategy_timeframe_bar_count >= len(self.strategy_bar_first_1m_index):
+            return False
+        skip_stop: int = min(int(self.strategy_bar_first_1m_index[self.strategy_timeframe_bar_count]), stop)
+        if skip_stop <= self.replayed_bar_count:
+            return False
+        balances: np.ndarray = self.api_container.exchange_api.update_account_balance_until(stop=skip_stop)
+        if len(balances) == 0:
+            return False
+
+        skip_stop = self.replayed_bar_count + len(balances)
+        self.api_container.data_api.fast_forward(bar_count=skip_stop)
+        self.history.extend(balances=balances, equity=self.repository_container.account_repository.get_equity())
+        self.replayed_bar_count = skip_stop
+        return True
+
+    # Strategy bars of all symbols merged, each starting on the first 1m bar of the clock at or after its start.
+    def _get_strategy_bar_first_1m_index(self) -> np.ndarray:
+        data_repository: DataRepository = self.repository_container.data_repository
+        bar_datetime: np.ndarray = np.unique(np.concatenate([
+            data_repository.get_all_data(name="datetime", timeframe=self.test_config.timeframe, symbol_id=symbol_id)
+            for symbol_id in data_repository.get_symbol_ids()]))
+        return np.searchsorted(data_repository.get_clock(), bar_datetime, side='left')
+
+    def _replay_bar(self, strategy: BaseStrategy) -> None:
+        self.journal.set_bar_index(self.replayed_bar_count)
+        self._update_strategy(bar_index=self.replayed_bar_count, strategy=strategy)
+        self.api_container.data_api.update_on_bar()
+        self.api_container.exchange_api.update_account_balance_on_bar()
+        self.api_container.exchange_api.examine_and_force_close_account()
+        self.history.append(balance=self.repository_container.account_repository.get_balance(),
+                            equity=self.repository_container.account_repository.get_equity())
+        self.replayed_bar_count += 1
+
+    def _update_strategy(self, bar_index: int, strategy: BaseStrategy) -> None:
+        if bar_index >= self.strategy_bar_first_1m_index[self.strategy_timeframe_bar_count]:
             self.strategy_timeframe_bar_count += 1
             strategy.on_bar(broker=self.api_container.broker_api)
             self.api_container.exchange_api.match_and_clear_all_orders()
 
+    # Without a spill directory the histories are allocated for the whole run.
+    def _init_history(self, replay_stop: int) -> HistoryBuffer:
+        if self.spill_dir is None:
+            return HistoryBuffer(capacity=replay_stop)
+        return HistoryBuffer(capacity=min(self.test_config.history_chunk_size, replay_stop),
+                             directory=os.path.join(self.spill_dir, 'history'))
+
+    # Each run spills to its own directory, so runs sharing a test config do not overwrite each other's files.
+    def _init_spill_dir(self) -> Optional[str]:
+        if self.test_config.spill_dir is None:
+            return None
+        os.makedirs(self.test_config.spill_dir, exist_ok=True)
+        return tempfile.mkdtemp(prefix='run-', dir=self.test_config.spill_dir)
+
     def _init_containers(self) -> None:
+        self.spill_dir = self._init_spill_dir()
+        if self.test_config.journal or self.test_config.journal_path is not None:
+            self.journal = BufferedEventJournal(capacity=self.test_config.journal_capacity,
+                                                path=self.test_config.journal_path)
+        else:
+            self.journal = LoggingEventJournal()
         self.repository_container: RepositoryContainer = self._init_repository_container()
         self.service_container: ServiceContainer = self._init_service_container()
         self.api_container: ApiContainer = self._init_api_container()
@@ -105,87 +202,116 @@ class GeneralTestEngineService(TestEngineService):
     def _init_service_container(self) -> ServiceContainer:
         logging.info('Initializing service container')
         order_service: OrderService = GeneralOrderService(order_repository=self.repository_container.order_repository,
-                                                          data_repository=self.repository_container.data_repository)
+                                                          data_repository=self.repository_container.data_repository,
+                                                          journal=self.journal)
         order_validation_service: OrderValidationService = GeneralOrderValidationService(
             order_repository=self.repository_container.order_repository,
-            data_repository=self.repository_container.data_repository)
+            data_repository=self.repository_container.data_repository, journal=self.journal)
         risk_service: RiskService = GeneralRiskService(account_repository=self.repository_container.account_repository,
                                                        order_repository=self.repository_container.order_repository,
-                                                       data_repository=self.repository_container.data_repository)
-        data_service: DataService = GeneralDataService(data_repository=self.repository_container.data_repository)
+                                                       data_repository=self.repository_container.data_repository,
+                                                       consistency_check=self.test_config.margin_consistency_check,
+                                                       journal=self.journal)
+        data_service: DataService = GeneralDataService(data_repository=self.repository_container.data_repository,
+                                                       market_data_service=self.market_data_service,
+                                                       indicator_cache_repository=self._init_indicator_cache())
         clearing_service: ClearingService = GeneralClearingService(
             account_repository=self.repository_container.account_repository,
-            data_repository=self.repository_container.data_repository)
+            data_repository=self.repository_container.data_repository, journal=self.journal)
         exchange_service: ExchangeService = GeneralExchangeService(
             data_repository=self.repository_container.data_repository,
             order_repository=self.repository_container.order_repository,
-            account_repository=self.repository_container.account_repository)
+            account_repository=self.repository_container.account_repository, journal=self.journal)
         match_service: MatchService = GeneralMatchService(data_repository=self.repository_container.data_repository,
-                                                          order_repository=self.repository_container.order_repository)
+                                                          order_repository=self.repository_container.order_repository,
+                                                          journal=self.journal)
         match_validation_service: MatchValidationService = GeneralMatchValidationService(
-            data_repository=self.repository_container.data_repository)
+            data_repository=self.repository_container.data_repository, journal=self.journal)
         return ServiceContainer(order_service=order_service, order_validation_service=order_validation_service,
                                 risk_service=risk_service, data_service=data_service, clearing_service=clearing_service,
                                 exchange_service=exchange_service, match_service=match_service,
                                 match_validation_service=match_validation_service)
 
+    # An injected repository is used as is, otherwise the engine keeps its own for its runs when the test config
+    # asks for one.
+    def _init_indicator_cache(self) -> Optional[IndicatorCacheRepository]:
+        if self.indicator_cache_repository is None and self.test_config.indicator_cache_size > 0:
+            self.indicator_cache_repository = GeneralIndicatorCacheRepository(
+                capacity=self.test_config.indicator_cache_size, cache_dir=self.test_config.cache_dir)
+        return self.indicator_cache_repository
+
     def _init_repository_container(self) -> RepositoryContainer:
-        order_repository: OrderRepository = GeneralOrderRepository()
+        order_repository: OrderRepository = GeneralOrderRepository(
+            order_table=OrderTable() if self.test_config.order_table else None)
         account_repository: AccountRepository = GeneralAccountRepository(initial_equity=self.test_config.initial_equity)
-        data_repository: DataRepository = GeneralDataRepository(symbol=self._fetch_symbol(),
-                                                                test_config=self.test_config)
-        data_repository.save_data(timeframe='1m', data=self._fetch_1m_bar_data())
-        data_repository.save_data(timeframe=self.test_config.timeframe, data=self._fetch_test_data())
+        symbol_ids: List[str] = self._get_symbol_ids()
+
+        # Every request is in flight at once, so startup waits for the slowest one rather than for all of them.
+        with ThreadPoolExecutor(max_workers=self.test_config.fetch_concurrency) as executor:
+            symbols: Dict[str, Future] = {symbol_id: executor.submit(self._fetch_symbol, symbol_id)
+                                          for symbol_id in symbol_ids}
+            bar_data_1m: Dict[str, Future] = {symbol_id: executor.submit(self._fetch_1m_bar_data, symbol_id)
+                                              for symbol_id in symbol_ids}
+            test_data: Dict[str, Future] = {symbol_id: executor.submit(self._fetch_test_data, symbol_id)
+                                            for symbol_id in symbol_ids}
+
+            data_repository: DataRepository = GeneralDataRepository(
+                symbol=symbols[self.test_config.symbol_id].result(), test_config=self.test_config)
+            for symbol_id in symbol_ids:
+                data_repository.add_symbol(symbol=symbols[symbol_id].result())
+                self._save_data(data_repository=data_repository, timeframe='1m', data=bar_data_1m[symbol_id].result(),
+                                symbol_id=symbol_id)
+                self._save_data(data_repository=data_repository, timeframe=self.test_config.timeframe,
+                                data=test_data[symbol_id].result(), symbol_id=symbol_id)
         return RepositoryContainer(order_repository=order_repository, account_repository=account_repository,
                                    data_repository=data_repository)
 
-    def _fetch_symbol(self) -> Symbol:
-        symbol_id: str = self.test_config.symbol_id
-        request: GetSymbolRequest = GetSymbolRequest(symbol_id=symbol_id)
+    # With a spill directory the bars are written to a bar file there and replayed from its memory mapping, so only
+    # the pages the replay touches are in memory and the OS can drop them once it has moved on.
+    def _save_data(self, data_repository: DataRepository, timeframe: str, data: Optional[BarStore],
+                   symbol_id: str) -> None:
+        if self.spill_dir is None or data is None:
+            data_repository.save_data(timeframe=timeframe, data=data, symbol_id=symbol_id)
+            return
+        path: str = os.path.join(self.spill_dir, 'bars', symbol_id, f'{timeframe}.wtb')
+        write_bar_file(path=path, store=data)
+        data_repository.open_data(timeframe=timeframe, path=path, symbol_id=symbol_id)
+
+    def _get_symbol_ids(self) -> List[str]:
+        symbol_ids: List[str] = [self.test_config.symbol_id]
+        for symbol_id in self.test_config.symbol_ids or []:
+            if symbol_id not in symbol_ids:
+                symbol_ids.append(symbol_id)
+        return symbol_ids
+
+    def _fetch_symbol(self, symbol_id: str) -> Symbol:
         try:
-            logging.info('Fetching symbol')
-            response: GetSymbolResponse = get_symbol(request=request, token=self.test_config.token)
-            symbol_dto: SymbolDto = response.data
-            symbol: Symbol = Symbol(id=symbol_dto.symbolId, minimum_tick_size=symbol_dto.minimumTickSize,
-                                    multiplier=symbol_dto.multiplier, commission_fee=symbol_dto.commissionFee,
-                                    commission_rate=symbol_dto.commissionRate, margin_rate=symbol_dto.marginRate,
-                                    upper_limit=symbol_dto.upperLimit, lower_limit=symbol_dto.lowerLimit)
-            return symbol
+            logging.info(f'Fetching symbol {symbol_id}')
+            return self.market_data_service.get_symbol(symbol_id=symbol_id)
         except (Exception,):
-            logging.error('Failed to fetch symbol')
-            raise RuntimeError('Failed to fetch symbol')
-
-    def _fetch_1m_bar_data(self) -> Dict:
-        token: str = self.test_config.token
-        symbol_id: str = self.test_config.symbol_id
-        start_date: datetime = self.test_config.start_date
-        end_date: datetime = self.test_config.end_date
-        request: GetBarDataRequest = GetBarDataRequest(symbol_id=symbol_id, start_date=start_date, end_date=end_date,
-                                                       timeframe='1m')
+            logging.error(f'Failed to fetch symbol {symbol_id}')
+            raise RuntimeError(f'Failed to fetch symbol {symbol_id}')
 
+    def _fetch_1m_bar_data(self, symbol_id: str) -> BarStore:
         try:
-            logging.info('Fetching 1m bar data')
-            response: GetBarDataResponse = get_bar_data(token=token, request=request)
-            return response.data
+            logging.info(f'Fetching 1m bar data of {symbol_id}')
+            return self.market_data_service.get_bar_data(symbol_id=symbol_id, timeframe='1m',
+                                                         start_date=self.test_config.start_date,
+                                                         end_date=self.test_config.end_date)
         except (Exception,):
-            logging.error('Failed to fetch 1m bar data')
-            raise RuntimeError('Failed to fetch 1m bar data')
+            logging.error(f'Failed to fetch 1m bar data of {symbol_id}')
+            raise RuntimeError(f'Failed to fetch 1m bar data of {symbol_id}')
 
-    def _fetch_test_data(self) -> Optional[Dict]:
+    def _fetch_test_data(self, symbol_id: str) -> Optional[BarStore]:
         if self.test_config.timeframe == "1m":
             return None
 
-        token: str = self.test_config.token
-        symbol_id: str = self.test_config.symbol_id
-        start_date: datetime = self.test_config.start_date
-        end_date: datetime = self.test_config.end_date
         timeframe: str = self.test_config.timeframe
-        request: GetBarDataRequest = GetBarDataRequest(symbol_id=symbol_id, start_date=start_date, end_date=end_date,
-                                                       timeframe=timeframe)
         try:
-            logging.info(f'Fetching {timeframe} bar data')
-            response: GetBarDataResponse = get_bar_data(token=token, request=request)
-            return response.data
+            logging.info(f'Fetching {timeframe} bar data of {symbol_id}')
+            return self.market_data_service.get_bar_data(symbol_id=symbol_id, timeframe=timeframe,
+                                                         start_date=self.test_config.start_date,
+                                                         end_date=self.test_config.end_date)
         except (Exception,):
-            logging.error(f'Failed to fetch {timeframe} bar data')
-            raise RuntimeError(f'Failed to fetch {timeframe} bar data')
+            logging.error(f'Failed to fetch {timeframe} bar data of {symbol_id}')
+            raise RuntimeError(f'Failed to fetch {timeframe} bar data of {symbol_id}')
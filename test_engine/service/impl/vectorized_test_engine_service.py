@@ -0,0 +1,123 @@
+import logging
+from typing import Optional, Type, List
+
+import numpy as np
+
+from broker.enums import OrderDirection, OrderType, OrderStatus
+from broker.model import Order
+from data.model import TestConfig, Symbol
+from data.repository.data_repository import DataRepository
+from data.repository.indicator_cache_repository import IndicatorCacheRepository
+from data.service.impl.general_market_data_service import GeneralMarketDataService
+from data.service.market_data_service import MarketDataService
+from data.store.bar_store import BarStore
+from strategy.vectorized_strategy import VectorizedStrategy
+from test_engine.model import TestResult
+from test_engine.service.impl.general_test_engine_service import GeneralTestEngineService
+
+
+# Runs strategies that return target positions over the whole series. Position changes are filled at the open
+# of the first 1m bar of their strategy bar, crossing the spread plus slippage like a marketable limit order,
+# and commissions follow GeneralClearingService. Margin calls are not simulated, so screened candidates should
+# be confirmed with GeneralTestEngineService.
+class VectorizedTestEngineService(GeneralTestEngineService):
+    def __init__(self, market_data_service: Optional[MarketDataService] = None,
+                 indicator_cache_repository: Optional[IndicatorCacheRepository] = None):
+        super().__init__(market_data_service=market_data_service,
+                         indicator_cache_repository=indicator_cache_repository)
+        self.order_history: List[Order] = []
+
+    def run_test(self, test_config: TestConfig, strategy_constructor: Type[VectorizedStrategy]) -> TestResult:
+        self.test_config: TestConfig = test_config
+        if self.market_data_service is None:
+            self.market_data_service = GeneralMarketDataService.from_test_config(test_config=test_config)
+        self._init_containers()
+        data_repository: DataRepository = self.repository_container.data_repository
+        if len(data_repository.get_symbol_ids()) > 1:
+            raise RuntimeError('Vectorized tests trade a single symbol')
+        strategy: VectorizedStrategy = strategy_constructor(_=self.api_container.data_api)
+
+        strategy_bar_data: BarStore = data_repository.get_bar_store(timeframe=test_config.timeframe)
+        target_positions: np.ndarray = np.asarray(strategy.get_target_positions(bar_data=strategy_bar_data),
+                                                  dtype=np.int64)
+        if len(target_positions) != len(strategy_bar_data):
+            raise RuntimeError(f'Expected {len(strategy_bar_data)} target positions, got {len(target_positions)}')
+
+        bar_data: BarStore = data_repository.get_bar_store(timeframe='1m')
+        execution_index: np.ndarray = data_repository.get_alignment(timeframe=test_config.timeframe).first_1m_index
+        replay_stop: int = max(len(bar_data) - 1, 0)
+        if len(execution_index) > 0:
+            replay_stop = min(replay_stop, int(execution_index[-1]) + 1)
+        is_replayed: np.ndarray = execution_index < replay_stop
+
+        positions: np.ndarray = np.zeros(replay_stop, dtype=np.int64)
+        has_target: np.ndarray = np.zeros(replay_stop, dtype=bool)
+        positions[execution_index[is_replayed]] = target_positions[is_replayed]
+        has_target[execution_index[is_replayed]] = True
+        last_target_index: np.ndarray = np.maximum.accumulate(np.where(has_target, np.arange(replay_stop), -1))
+        positions = np.where(last_target_index >= 0, positions[np.maximum(last_target_index, 0)], 0)
+
+        logging.info('Starting vectorized test')
+        self._simulate(bar_data=bar_data, positions=positions)
+        self.journal.close()
+        return TestResult(order_history=self.order_history, balance_history=self.balance_history,
+                          equity_history=self.equity_history)
+
+    def _simulate(self, bar_data: BarStore, positions: np.ndarray) -> None:
+        symbol: Symbol = self.repository_container.data_repository.get_symbol()
+        replay_stop: int = len(positions)
+        tick_cost: float = (self.test_config.spread + self.test_config.slippage) * symbol.minimum_tick_size
+
+        trades: np.ndarray = np.diff(positions, prepend=0)
+        trade_index: np.ndarray = np.flatnonzero(trades)
+        trade_amount: np.ndarray = trades[trade_index]
+        fill_price: np.ndarray = bar_data.columns['open'][trade_index] + np.sign(trade_amount) * tick_cost
+        commissions: np.ndarray = (symbol.commission_rate * np.abs(trade_amount) * fill_price * symbol.multiplier +
+                                   symbol.commission_fee * np.abs(trade_amount))
+
+        cash_flow: np.ndarray = np.zeros(replay_stop)
+        cash_flow[trade_index] = -trade_amount * fill_price * symbol.multiplier - commissions
+        # The account is marked on the bar after the one being replayed, as in the event engine.
+        mark_price: np.ndarray = bar_data.columns['close'][1:replay_stop + 1]
+        self.balance_history = self.test_config.initial_equity + np.cumsum(cash_flow) + (
+                positions * mark_price * symbol.multiplier)
+
+        average_price: np.ndarray = self._get_average_prices(trade_index=trade_index, trade_amount=trade_amount,
+                                                             fill_price=fill_price, positions=positions)
+        self.equity_history = self.balance_history - positions * (mark_price - average_price) * symbol.multiplier
+        self.replayed_bar_count = replay_stop
+        self.order_history = self._get_order_history(bar_data=bar_data, symbol=symbol, trade_index=trade_index,
+                                                     trade_amount=trade_amount, fill_price=fill_price,
+                                                     commissions=commissions)
+
+    # Average entry prices only change on trades, so they are tracked trade by trade and forward filled.
+    @staticmethod
+    def _get_average_prices(trade_index: np.ndarray, trade_amount: np.ndarray, fill_price: np.ndarray,
+                            positions: np.ndarray) -> np.ndarray:
+        trade_average_price: np.ndarray = np.zeros(len(trade_index))
+        position: int = 0
+        average_price: float = 0.0
+        for i, (amount, price) in enumerate(zip(trade_amount.tolist(), fill_price.tolist())):
+            new_position: int = position + amount
+            if new_position == 0:
+                average_price = 0.0
+            elif position == 0 or (position > 0) != (new_position > 0):
+                average_price = price
+            elif (amount > 0) == (position > 0):
+                average_price = (average_price * abs(position) + price * abs(amount)) / abs(new_position)
+            position = new_position
+            trade_average_price[i] = average_price
+
+        trade_number: np.ndarray = np.searchsorted(trade_index, np.arange(len(positions)), side='right') - 1
+        return np.where(trade_number >= 0, trade_average_price[np.maximum(trade_number, 0)], 0.0)
+
+    @staticmethod
+    def _get_order_history(bar_data: BarStore, symbol: Symbol, trade_index: np.ndarray, trade_amount: np.ndarray,
+                           fill_price: np.ndarray, commissions: np.ndarray) -> List[Order]:
+        trade_datetime: List = bar_data.columns['datetime'][trade_index].tolist()
+        return [Order(id=order_id, symbol_id=symbol.id, price=price, amount=abs(amount),
+                      direction=OrderDirection.BUY if amount > 0 else OrderDirection.SELL, type=OrderType.LMT,
+                      status=OrderStatus.FILLED, created_at=dt, updated_at=dt, commissions=commission,
+                      execution_price=price)
+                for order_id, (amount, price, commission, dt) in
+                enumerate(zip(trade_amount.tolist(), fill_price.tolist(), commissions.tolist(), trade_datetime))]
@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import Type, List, Dict, Optional
+
+from data.model import TestConfig
+from strategy.base_strategy import BaseStrategy
+from test_engine.model import TestResult
+
+
+class SweepService(ABC):
+    @abstractmethod
+    def run_sweep(self, test_config: TestConfig, strategy_constructor: Type[BaseStrategy],
+                  strategy_params: List[Dict], timeframes: Optional[List[str]] = None) -> List[TestResult]:
+        pass
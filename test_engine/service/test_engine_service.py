@@ -1,9 +1,11 @@
 from abc import ABC
+from typing import Type
 
 from data.model import TestConfig
 from strategy.base_strategy import BaseStrategy
+from test_engine.model import TestResult
 
 
 class TestEngineService(ABC):
-    def run_test(self, test_config: TestConfig, strategy: BaseStrategy) -> None:
+    def run_test(self, test_config: TestConfig, strategy_constructor: Type[BaseStrategy]) -> TestResult:
         pass
@@ -0,0 +1,67 @@
+import unittest
+from datetime import datetime
+from functools import partial
+
+import numpy as np
+
+from broker.enums import OrderDirection, OrderType
+from data.model import TestConfig
+from data.service.impl.synthetic_market_data_service import SyntheticMarketDataService
+from strategy.base_strategy import BaseStrategy
+from test_engine.service.impl.general_sweep_service import GeneralSweepService
+from test_engine.service.impl.general_test_engine_service import GeneralTestEngineService
+
+
+class RoundTripStrategy(BaseStrategy):
+    def __init__(self, _, amount):
+        self.amount = amount
+        self.bar_count = 0
+
+    def on_bar(self, broker):
+        self.bar_count += 1
+        if self.bar_count == 2:
+            broker.create_order('SWEEP', 1_000_000.0, self.amount, OrderDirection.BUY, OrderType.LMT)
+        if self.bar_count == 30:
+            broker.create_order('SWEEP', 0.01, self.amount, OrderDirection.SELL, OrderType.LMT)
+
+
+class TestGeneralSweepService(unittest.TestCase):
+    def setUp(self):
+        self.test_config = TestConfig(token='', symbol_id='SWEEP', start_date=datetime(2024, 1, 2, 9),
+                                      end_date=datetime(2024, 1, 2, 10, 59), timeframe='1m',
+                                      initial_equity=10_000_000.0, cache_dir=None)
+        self.market_data_service = SyntheticMarketDataService(seed=1)
+
+    def test_run_sweep_matches_single_runs(self):
+        strategy_params = [{'amount': 1}, {'amount': 3}]
+        service = GeneralSweepService(market_data_service=self.market_data_service, max_workers=1)
+
+        results = service.run_sweep(test_config=self.test_config, strategy_constructor=RoundTripStrategy,
+                                    strategy_params=strategy_params)
+
+        self.assertEqual(len(results), 2)
+        for result, params in zip(results, strategy_params):
+            engine = GeneralTestEngineService(market_data_service=self.market_data_service)
+            expected = engine.run_test(test_config=self.test_config,
+                                       strategy_constructor=partial(RoundTripStrategy, **params))
+            self.assertEqual([order.amount for order in result.order_history], [params['amount']] * 2)
+            np.testing.assert_array_equal(result.balance_history, expected.balance_history)
+            np.testing.assert_array_equal(result.equity_history, expected.equity_history)
+        self.assertNotEqual(results[0].balance_history[-1], results[1].balance_history[-1])
+
+    def test_run_sweep_publishes_every_portfolio_symbol(self):
+        self.test_config.symbol_ids = ['SWEEP', 'OTHER']
+        service = GeneralSweepService(market_data_service=self.market_data_service, max_workers=1)
+
+        result, = service.run_sweep(test_config=self.test_config, strategy_constructor=RoundTripStrategy,
+                                    strategy_params=[{'amount': 2}])
+
+        engine = GeneralTestEngineService(market_data_service=self.market_data_service)
+        expected = engine.run_test(test_config=self.test_config,
+                                   strategy_constructor=partial(RoundTripStrategy, amount=2))
+        np.testing.assert_array_equal(result.balance_history, expected.balance_history)
+        np.testing.assert_array_equal(result.equity_history, expected.equity_history)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+
+from broker.enums import OrderDirection, OrderType
+from common.journal.event import EventType
+from data.model import Symbol, TestConfig
+from data.repository.impl.general_indicator_cache_repository import GeneralIndicatorCacheRepository
+from data.service.market_data_service import MarketDataService
+from data.store.bar_store import BarStore
+from strategy.base_strategy import BaseStrategy
+from test_engine.service.impl.general_test_engine_service import GeneralTestEngineService
+
+
+class RoundTripStrategy(BaseStrategy):
+    def __init__(self, _):
+        self.bar_count = 0
+
+    def on_bar(self, broker):
+        self.bar_count += 1
+        if self.bar_count == 2:
+            broker.create_order('symbol1', 100.0, 1, OrderDirection.BUY, OrderType.LMT)
+        if self.bar_count == 3:
+            broker.create_order('symbol1', 1.0, 1, OrderDirection.SELL, OrderType.LMT)
+
+
+class LeveredStrategy(BaseStrategy):
+    def __init__(self, _):
+        self.bar_count = 0
+
+    def on_bar(self, broker):
+        self.bar_count += 1
+        if self.bar_count % 4 == 1:
+            broker.create_order('symbol1', 11.6, 55, OrderDirection.BUY, OrderType.LMT)
+        if self.bar_count % 4 == 3:
+            broker.create_order('symbol1', 1.0, 55, OrderDirection.SELL, OrderType.LMT)
+
+
+class PortfolioStrategy(BaseStrategy):
+    def __init__(self, _):
+        self.bar_count = 0
+
+    def on_bar(self, broker):
+        self.bar_count += 1
+        if self.bar_count == 1:
+            broker.create_order('symbol1', 100.0, 1, OrderDirection.BUY, OrderType.LMT)
+        if self.bar_count == 5:
+            broker.create_order('symbol2', 100.0, 2, OrderDirection.BUY, OrderType.LMT)
+        if self.bar_count == 10:
+            broker.create_order('symbol1', 1.0, 1, OrderDirection.SELL, OrderType.LMT)
+            broker.create_order('symbol2', 1.0, 2, OrderDirection.SELL, OrderType.LMT)
+
+
+def _symbol(symbol_id: str) -> Symbol:
+    return Symbol(id=symbol_id, minimum_tick_size=0.01, multiplier=10, commission_fee=1.0, commission_rate=0.0,
+                  margin_rate=0.1, upper_limit=0.1, lower_limit=-0.1)
+
+
+# symbol2 has no bars in its second trading hour.
+def _symbol_bar_data(symbol_id: str, timeframe: str) -> BarStore:
+    store: BarStore = _bar_data(timeframe)
+    if symbol_id == 'symbol1':
+        return store
+    minutes: np.ndarray = (store.columns['datetime'] - store.columns['datetime'][0]) // np.timedelta64(1, 'm')
+    return BarStore(columns={name: column[(minutes < 60) | (minutes >= 120)] for name, column in store.columns.items()})
+
+
+def _bar_data(timeframe: str) -> BarStore:
+    step = 15 if timeframe == '15m' else 1
+    bar_count = 240 // step
+    close = 10.0 + np.sin(np.arange(bar_count) / 7.0)
+    return BarStore.from_dict({
+        'datetime': [datetime(2024, 1, 1) + timedelta(minutes=step * i) for i in range(bar_count)],
+        'open': close, 'high': close + 0.5, 'low': close - 0.5, 'close': close, 'volume': np.full(bar_count, 100.0),
+        'percent_change': np.zeros(bar_count), 'bid': close - 0.1, 'ask': close + 0.1})
+
+
+class TestGeneralTestEngineService(unittest.TestCase):
+    def setUp(self):
+        self.market_data_service = Mock(spec=MarketDataService)
+        self.market_data_service.get_symbol.side_effect = _symbol
+        self.market_data_service.get_bar_data.side_effect = (
+            lambda symbol_id, timeframe, start_date, end_date: _symbol_bar_data(symbol_id, timeframe))
+
+    def _get_test_config(self, **kwargs):
+        return TestConfig(token='token', symbol_id='symbol1', start_date=datetime(2024, 1, 1),
+                          end_date=datetime(2024, 1, 2), timeframe='15m', initial_equity=1000.0, cache_dir=None,
+                          **kwargs)
+
+    def _run_test(self, fast_forward: bool, strategy_constructor=RoundTripStrategy, symbol_ids=None, profile=False,
+                  order_table=False, journal=False, spill_dir=None):
+        test_config = self._get_test_config(fast_forward=fast_forward, symbol_ids=symbol_ids, profile=profile,
+                                            order_table=order_table, journal=journal, spill_dir=spill_dir,
+                                            history_chunk_size=16)
+        service = GeneralTestEngineService(market_data_service=self.market_data_service)
+        service._replay_bar = Mock(wraps=service._replay_bar)
+        return service.run_test(test_config, strategy_constructor), service._replay_bar.call_count
+
+    def test_fast_forward_skips_bars_without_changing_results(self):
+        result, replayed_bar_count = self._run_test(fast_forward=True)
+        expected, expected_replayed_bar_count = self._run_test(fast_forward=False)
+
+        np.testing.assert_array_equal(result.balance_history, expected.balance_history)
+        np.testing.assert_array_equal(result.equity_history, expected.equity_history)
+        self.assertEqual([order.execution_price for order in result.order_history],
+                         [order.execution_price for order in expected.order_history])
+        self.assertEqual(len(result.balance_history), 226)
+        self.assertLess(replayed_bar_count * 4, expected_replayed_bar_count)
+
+    def test_fast_forward_stops_at_forced_close(self):
+        result, replayed_bar_count = self._run_test(fast_forward=True, strategy_constructor=LeveredStrategy)
+        expected, expected_replayed_bar_count = self._run_test(fast_forward=False, strategy_constructor=LeveredStrategy)
+
+        np.testing.assert_array_equal(result.balance_history, expected.balance_history)
+        np.testing.assert_array_equal(result.equity_history, expected.equity_history)
+        self.assertEqual([(order.direction, order.execution_price) for order in result.order_history],
+                         [(order.direction, order.execution_price) for order in expected.order_history])
+        # Forced closes fill between strategy bars.
+        self.assertTrue(any(order.updated_at.minute % 15 != 0 for order in result.order_history))
+        self.assertLess(replayed_bar_count * 2, expected_replayed_bar_count)
+
+    def test_portfolio_trades_each_symbol_on_its_own_bars(self):
+        result, _ = self._run_test(fast_forward=True, strategy_constructor=PortfolioStrategy,
+                                   symbol_ids=['symbol1', 'symbol2'])
+        expected, _ = self._run_test(fast_forward=False, strategy_constructor=PortfolioStrategy,
+                                     symbol_ids=['symbol1', 'symbol2'])
+
+        np.testing.assert_array_equal(result.balance_history, expected.balance_history)
+        np.testing.assert_array_equal(result.equity_history, expected.equity_history)
+        fills = [(order.symbol_id, order.direction, order.updated_at.hour * 60 + order.updated_at.minute)
+                 for order in result.order_history]
+        # The symbol2 order placed at minute 60 waits for its session to reopen at minute 120.
+        self.assertEqual(fills, [('symbol1', OrderDirection.BUY, 0), ('symbol2', OrderDirection.BUY, 120),
+                                 ('symbol1', OrderDirection.SELL, 135), ('symbol2', OrderDirection.SELL, 135)])
+        # While both positions are open the balance marks each of them to its own close.
+        close = _bar_data('1m').columns['close']
+        buy_prices = [order.execution_price for order in result.order_history[:2]]
+        self.assertAlmostEqual(result.balance_history[125] - result.equity_history[125],
+                               (close[126] - buy_prices[0]) * 10 + (close[126] - buy_prices[1]) * 2 * 10)
+        self.assertEqual(len(result.balance_history), 226)
+
+    def test_startup_fetches_bar_data_concurrently(self):
+        # Each fetch waits for the other three, fetching one at a time would break the barrier.
+        barrier = threading.Barrier(4, timeout=5)
+
+        def get_bar_data(symbol_id, timeframe, start_date, end_date):
+            barrier.wait()
+            return _symbol_bar_data(symbol_id, timeframe)
+
+        self.market_data_service.get_bar_data.side_effect = get_bar_data
+        result, _ = self._run_test(fast_forward=True, strategy_constructor=PortfolioStrategy,
+                                   symbol_ids=['symbol1', 'symbol2'])
+
+        self.assertEqual(self.market_data_service.get_bar_data.call_count, 4)
+        self.assertEqual(len(result.order_history), 4)
+
+    def test_profile_times_stages_without_changing_results(self):
+        result, _ = self._run_test(fast_forward=False, profile=True)
+        expected, _ = self._run_test(fast_forward=False)
+
+        np.testing.assert_array_equal(result.balance_history, expected.balance_history)
+        self.assertIsNone(expected.stage_timings)
+        timings = result.stage_timings
+        self.assertEqual(timings['strategy.on_bar'].call_count, 16)
+        self.assertEqual(timings['exchange_api.match_and_clear_all_orders'].call_count, 16)
+        self.assertEqual(timings['data_api.update_on_bar'].call_count, len(result.balance_history))
+        self.assertEqual(timings['broker_api.create_order'].call_count, 2)
+        self.assertIn('risk_service.validate_new_order_risk', timings)
+        self.assertEqual(sum(timings['strategy.on_bar'].histogram), 16)
+
+    def test_journal_is_opt_in(self):
+        result, _ = self._run_test(fast_forward=True)
+        self.assertEqual(len(result.events), 0)
+
+    def test_journal_records_order_events(self):
+        result, _ = self._run_test(fast_forward=True, journal=True)
+
+        events = result.events
+        self.assertEqual(list(events['event']), [EventType.ORDER_CREATED, EventType.ORDER_MATCHED,
+                                                 EventType.ORDER_CREATED, EventType.ORDER_MATCHED,
+                                                 EventType.ORDER_CLEARED])
+        self.assertEqual(list(events['order_id']), [0, 0, 1, 1, 1])
+        self.assertEqual(list(events['amount'][[0, 2]]), [1, -1])
+        self.assertEqual(list(events['price'][[1, 3]]),
+                         [order.execution_price for order in result.order_history])
+        # Events are stamped with the 1m bar they happened on.
+        self.assertEqual(list(events['bar_index'][[1, 3]]), [15, 30])
+
+    def test_spill_dir_keeps_results(self):
+        for fast_forward in (True, False):
+            with tempfile.TemporaryDirectory() as spill_dir:
+                result, _ = self._run_test(fast_forward=fast_forward, strategy_constructor=LeveredStrategy,
+                                           symbol_ids=['symbol2'], spill_dir=spill_dir)
+                expected, _ = self._run_test(fast_forward=fast_forward, strategy_constructor=LeveredStrategy,
+                                             symbol_ids=['symbol2'])
+
+                self.assertIsInstance(result.balance_history, np.memmap)
+                np.testing.assert_array_equal(result.balance_history, expected.balance_history)
+                np.testing.assert_array_equal(result.equity_history, expected.equity_history)
+                self.assertEqual([(order.direction, order.execution_price) for order in result.order_history],
+                                 [(order.direction, order.execution_price) for order in expected.order_history])
+                run_dir, = os.listdir(spill_dir)
+                self.assertEqual(sorted(os.listdir(os.path.join(spill_dir, run_dir, 'bars'))),
+                                 ['symbol1', 'symbol2'])
+                del result
+
+    def test_order_table_keeps_results(self):
+        result, _ = self._run_test(fast_forward=True, strategy_constructor=LeveredStrategy, order_table=True)
+        expected, _ = self._run_test(fast_forward=True, strategy_constructor=LeveredStrategy)
+
+        np.testing.assert_array_equal(result.balance_history, expected.balance_history)
+        np.testing.assert_array_equal(result.equity_history, expected.equity_history)
+        self.assertEqual(list(result.order_history), expected.order_history)
+        columns = result.get_order_columns()
+        expected_columns = expected.get_order_columns()
+        for name in expected_columns:
+            np.testing.assert_array_equal(columns[name], expected_columns[name])
+
+    def test_indicator_cache_is_opt_in_and_injected(self):
+        service = GeneralTestEngineService(market_data_service=self.market_data_service)
+        service.run_test(self._get_test_config(), RoundTripStrategy)
+        self.assertIsNone(service.service_container.data_service.indicator_cache_repository)
+
+        repository = GeneralIndicatorCacheRepository(capacity=4, cache_dir=None)
+        service = GeneralTestEngineService(market_data_service=self.market_data_service,
+                                           indicator_cache_repository=repository)
+        service.run_test(self._get_test_config(), RoundTripStrategy)
+        self.assertIs(service.service_container.data_service.indicator_cache_repository, repository)
+
+        # Engines asked for a cache each keep their own, nothing is shared between them.
+        test_config = self._get_test_config(indicator_cache_size=4)
+        first = GeneralTestEngineService(market_data_service=self.market_data_service)
+        second = GeneralTestEngineService(market_data_service=self.market_data_service)
+        first.run_test(test_config, RoundTripStrategy)
+        second.run_test(test_config, RoundTripStrategy)
+        self.assertIsNotNone(first.indicator_cache_repository)
+        self.assertIsNot(first.indicator_cache_repository, second.indicator_cache_repository)
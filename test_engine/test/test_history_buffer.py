@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from test_engine.history_buffer import HistoryBuffer, BALANCE_FILE_NAME
+
+
+class TestHistoryBuffer(unittest.TestCase):
+    def _fill(self, history: HistoryBuffer) -> None:
+        for index in range(5):
+            history.append(balance=float(index), equity=-float(index))
+        history.extend(balances=np.arange(5.0, 12.0), equity=-5.0)
+        history.append(balance=12.0, equity=-12.0)
+
+    def test_grows_in_memory_without_a_directory(self):
+        history = HistoryBuffer(capacity=2)
+        self._fill(history)
+
+        balances, equities = history.get_histories()
+        np.testing.assert_array_equal(balances, np.arange(13.0))
+        np.testing.assert_array_equal(equities, [0, -1, -2, -3, -4] + [-5] * 7 + [-12])
+
+    def test_spills_full_buffers_to_the_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            history = HistoryBuffer(capacity=3, directory=directory)
+            self._fill(history)
+
+            self.assertEqual(len(history), 13)
+            self.assertEqual(len(history.balances), 3)
+            self.assertEqual(os.path.getsize(os.path.join(directory, BALANCE_FILE_NAME)), 12 * 8)
+            balances, equities = history.get_histories()
+            self.assertIsInstance(balances, np.memmap)
+            np.testing.assert_array_equal(balances, np.arange(13.0))
+            np.testing.assert_array_equal(equities, [0, -1, -2, -3, -4] + [-5] * 7 + [-12])
+            del balances, equities
+
+    def test_empty_history(self):
+        with tempfile.TemporaryDirectory() as directory:
+            balances, equities = HistoryBuffer(capacity=0, directory=directory).get_histories()
+            self.assertEqual((len(balances), len(equities)), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+from test_engine.profiler import StageProfiler, StageTiming, format_stage_timings
+
+
+class Counter:
+    def __init__(self):
+        self.count = 0
+
+    def increment(self, step=1):
+        self.count += step
+        return self.count
+
+
+class TestProfiler(unittest.TestCase):
+    def test_wrapped_methods_are_timed(self):
+        profiler = StageProfiler()
+        counter, untouched = Counter(), Counter()
+        profiler.wrap(instance=counter, prefix='counter')
+
+        self.assertEqual([counter.increment(step=2) for _ in range(3)], [2, 4, 6])
+        untouched.increment()
+        timing = profiler.get_timings()['counter.increment']
+        self.assertEqual(timing.call_count, 3)
+        self.assertNotIn('increment', vars(untouched))
+        self.assertIn('counter.increment', format_stage_timings(timings=profiler.get_timings()))
+
+    def test_quantiles_and_merge(self):
+        timing = StageTiming(name='stage')
+        for elapsed_ns in [100] * 98 + [5000, 9000]:
+            timing.record(elapsed_ns=elapsed_ns)
+        other = StageTiming(name='stage')
+        other.record(elapsed_ns=20000)
+        timing.merge(other=other)
+
+        self.assertEqual(timing.call_count, 101)
+        self.assertEqual(timing.get_quantile_ns(0.5), 128)
+        self.assertEqual(timing.get_quantile_ns(0.99), 16384)
+        self.assertEqual(timing.get_quantile_ns(1.0), 20000)
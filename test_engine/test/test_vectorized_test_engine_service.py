@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+
+from broker.enums import OrderDirection, OrderType
+from data.model import Symbol, TestConfig
+from data.service.market_data_service import MarketDataService
+from data.store.bar_store import BarStore
+from strategy.base_strategy import BaseStrategy
+from strategy.vectorized_strategy import VectorizedStrategy, signals_to_positions
+from test_engine.service.impl.general_test_engine_service import GeneralTestEngineService
+from test_engine.service.impl.vectorized_test_engine_service import VectorizedTestEngineService
+
+
+class LongThenShortStrategy(VectorizedStrategy):
+    def __init__(self, _):
+        pass
+
+    def get_target_positions(self, bar_data: BarStore) -> np.ndarray:
+        return np.array([0, 2, -1, -1])
+
+
+# Trades the same positions as LongThenShortStrategy with marketable limit orders.
+class LongThenShortEventStrategy(BaseStrategy):
+    def __init__(self, _):
+        self.bar_count = 0
+
+    def on_bar(self, broker):
+        self.bar_count += 1
+        if self.bar_count == 2:
+            broker.create_order('symbol1', 1000.0, 2, OrderDirection.BUY, OrderType.LMT)
+        if self.bar_count == 3:
+            broker.create_order('symbol1', 0.5, 3, OrderDirection.SELL, OrderType.LMT)
+
+
+def _bar_data(timeframe: str) -> BarStore:
+    start = datetime(2024, 1, 1)
+    if timeframe == '15m':
+        return BarStore.from_dict({'datetime': [start + timedelta(minutes=15 * i) for i in range(4)],
+                                   'open': [10.0, 11.0, 12.0, 13.0], 'close': [10.0, 11.0, 12.0, 13.0]})
+    minutes = np.arange(60)
+    return BarStore.from_dict({'datetime': [start + timedelta(minutes=int(i)) for i in minutes],
+                               'open': 10.0 + minutes, 'high': 11.0 + minutes, 'low': 9.5 + minutes,
+                               'close': 10.5 + minutes, 'percent_change': np.zeros(60), 'volume': np.full(60, 100)})
+
+
+class TestVectorizedTestEngineService(unittest.TestCase):
+    def setUp(self):
+        self.market_data_service = Mock(spec=MarketDataService)
+        self.market_data_service.get_symbol.return_value = Symbol(id='symbol1', minimum_tick_size=0.5, multiplier=2,
+                                                                  commission_fee=1.0, commission_rate=0.0,
+                                                                  margin_rate=0.1, upper_limit=0.1, lower_limit=-0.1)
+        self.market_data_service.get_bar_data.side_effect = (
+            lambda symbol_id, timeframe, start_date, end_date: _bar_data(timeframe))
+        self.test_config = TestConfig(token='token', symbol_id='symbol1', start_date=datetime(2024, 1, 1),
+                                      end_date=datetime(2024, 1, 2), timeframe='15m', initial_equity=1000.0,
+                                      spread=1, slippage=1, cache_dir=None)
+        self.service = VectorizedTestEngineService(market_data_service=self.market_data_service)
+
+    def test_run_test(self):
+        result = self.service.run_test(self.test_config, LongThenShortStrategy)
+
+        self.assertEqual(len(result.balance_history), 46)
+        self.assertEqual([(order.direction, order.amount, order.execution_price, order.commissions)
+                          for order in result.order_history],
+                         [(OrderDirection.BUY, 2, 26.0, 2.0), (OrderDirection.SELL, 3, 39.0, 3.0)])
+        # Long 2 from bar 15 at 26, marked on the close of the following bar.
+        self.assertAlmostEqual(result.balance_history[15], 1000 - 2 - 2 * 2 * 26 + 2 * 2 * 26.5)
+        self.assertAlmostEqual(result.equity_history[15], 998.0)
+        # Flipped to short 1 at 39 on bar 30: 2 * 2 * 13 realized, 5 commissions paid.
+        self.assertAlmostEqual(result.equity_history[30], 1000 - 5 + 52)
+        self.assertAlmostEqual(result.balance_history[45], 1000 - 5 + 52 - 2 * (56.5 - 39))
+
+    def test_matches_the_event_engine(self):
+        result = self.service.run_test(self.test_config, LongThenShortStrategy)
+        expected = GeneralTestEngineService(market_data_service=self.market_data_service).run_test(
+            self.test_config, LongThenShortEventStrategy)
+
+        self.assertEqual([(order.direction, order.amount, order.execution_price, order.commissions)
+                          for order in result.order_history],
+                         [(order.direction, order.amount, order.execution_price, order.commissions)
+                          for order in expected.order_history])
+        np.testing.assert_allclose(result.balance_history, expected.balance_history)
+        np.testing.assert_allclose(result.equity_history, expected.equity_history)
+
+    def test_signals_to_positions(self):
+        long_entries = np.array([False, True, False, False, True, False])
+        long_exits = np.array([False, False, True, False, True, False])
+        short_entries = np.array([False, False, False, True, False, False])
+        positions = signals_to_positions(long_entries=long_entries, long_exits=long_exits, amount=3,
+                                         short_entries=short_entries)
+        np.testing.assert_array_equal(positions, [0, 3, 0, -3, 3, 3])